@@ -4,21 +4,89 @@
 
 # Django imports
 from django.contrib import admin
+from django.db import transaction
 
 # app imports
 from consumption.models import Record, Resource, Subject
+from consumption.pagination import EstimatedCountPaginator
+from consumption.signals import records_changed
 
 
 @admin.register(Record)
 class RecordAdmin(admin.ModelAdmin):
-    """Provide (most-basic) integration into Django's admin interface."""
+    """Provide integration into Django's admin interface.
+
+    The changelist is meant to stay usable with millions of records:
+
+        - the resources are fetched with the records (``list_select_related``);
+        - the filters (``resource``, ``date_hierarchy``) and the default
+          ordering are backed by the indexes of ``Record``;
+        - the number of records is estimated, see
+          :class:`~consumption.pagination.EstimatedCountPaginator`, and the
+          unfiltered count is not determined at all;
+        - the resource is selected with an autocomplete widget instead of a
+          ``<select>`` of all resources.
+
+    All modifications send :data:`~consumption.signals.records_changed`.
+    """
+
+    list_display = ("timestamp", "reading", "resource")
+    list_select_related = ("resource",)
+    list_filter = ("resource",)
+    date_hierarchy = "timestamp"
+    autocomplete_fields = ("resource",)
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+    def save_model(self, request, obj, form, change):
+        """Save the object and send the signal, including the previous values."""
+        changes = set()
+        if change:
+            changes.update(
+                Record.objects.filter(pk=obj.pk).values_list("resource_id", "timestamp")
+            )
+        super().save_model(request, obj, form, change)
+        changes.add((obj.resource_id, obj.timestamp))
+        records_changed.send(sender=Record, changes=changes)
+
+    def delete_model(self, request, obj):
+        """Delete the object and send the signal."""
+        changes = {(obj.resource_id, obj.timestamp)}
+        super().delete_model(request, obj)
+        records_changed.send(sender=Record, changes=changes)
+
+    def delete_queryset(self, request, queryset):
+        """Delete the objects of the bulk action and send the signal."""
+        with transaction.atomic():
+            changes = set(queryset.values_list("resource_id", "timestamp"))
+            super().delete_queryset(request, queryset)
+            records_changed.send(sender=Record, changes=changes)
 
 
 @admin.register(Resource)
 class ResourceAdmin(admin.ModelAdmin):
-    """Provide (most-basic) integration into Django's admin interface."""
+    """Provide integration into Django's admin interface.
+
+    ``search_fields`` is required to provide the autocomplete widget of
+    :class:`RecordAdmin`.
+    """
+
+    list_display = ("name", "unit", "subject", "record_count", "last_timestamp")
+    list_select_related = ("subject",)
+    list_filter = ("subject",)
+    ordering = ("name", "id")
+    search_fields = ("name", "subject__name")
+    autocomplete_fields = ("subject",)
+    readonly_fields = Resource.SUMMARY_FIELDS
 
 
 @admin.register(Subject)
 class SubjectAdmin(admin.ModelAdmin):
-    """Provide (most-basic) integration into Django's admin interface."""
+    """Provide integration into Django's admin interface.
+
+    ``search_fields`` is required to provide the autocomplete widget of
+    :class:`ResourceAdmin`.
+    """
+
+    ordering = ("name", "id")
+    search_fields = ("name",)
@@ -0,0 +1,472 @@
+# SPDX-License-Identifier: MIT
+
+"""Provide vectorized analytics of a resource's readings.
+
+The readings of a :class:`~consumption.models.resource.Resource` are loaded
+into NumPy arrays with :func:`load_series` and all further calculations are
+performed on these arrays, without looping over
+:class:`~consumption.models.record.Record` instances in Python.
+
+Timestamps are represented as seconds since the epoch (``float64``). Naive
+timestamps (that is: ``USE_TZ = False``) are interpreted as UTC.
+
+This module requires NumPy, which is an optional dependency of the app and
+may be installed with ``pip install django-consumption[analytics]``.
+"""
+
+# Python imports
+from datetime import datetime, timezone
+
+# Django imports
+from django.core.exceptions import ImproperlyConfigured
+from django.db.models import OuterRef, Subquery
+
+# app imports
+from consumption.models.record import Record
+from consumption.models.resource import Resource
+
+try:
+    # external imports
+    import numpy as np
+except ImportError as err:  # pragma: nocover
+    raise ImproperlyConfigured(
+        "consumption.analytics requires NumPy, "
+        "install it with 'pip install django-consumption[analytics]'."
+    ) from err
+
+SECONDS_PER_HOUR = 3600
+"""Convert rates per second to rates per hour."""
+
+SECONDS_PER_DAY = 86400
+"""Convert rates per second to rates per day."""
+
+INTERPOLATION_CHUNK_SIZE = 500
+"""The number of resources (or records) to fetch with one query.
+
+This keeps the number of query parameters below the limits of the database
+backends.
+"""
+
+INTERPOLATION_TARGETS_PER_QUERY = 100
+"""The number of targets to fetch the bracketing records of with one query.
+
+Every target requires two columns, this keeps the number of columns below
+the limits of the database backends (e.g. 1000 on SQLite).
+"""
+
+_EPOCH = datetime(1970, 1, 1)
+
+
+def to_epoch(timestamp):
+    """Convert a ``datetime`` to seconds since the epoch.
+
+    Naive timestamps are interpreted as UTC.
+    """
+    if timestamp.tzinfo is not None:
+        return timestamp.timestamp()
+    return (timestamp - _EPOCH).total_seconds()
+
+
+def from_epoch(seconds, aware=False):
+    """Convert seconds since the epoch to a (naive or aware UTC) ``datetime``."""
+    timestamp = datetime.fromtimestamp(float(seconds), tz=timezone.utc)
+    return timestamp if aware else timestamp.replace(tzinfo=None)
+
+
+def load_series(resource, start=None, end=None):
+    """Load the readings of ``resource`` into NumPy arrays.
+
+    The rows are fetched with ``values_list()``, backed by the
+    ``(resource, timestamp)`` index, and converted into arrays without
+    creating model instances. Archived records (see
+    :mod:`consumption.archive`) are included. If the time range ends within
+    the archive, the arrays may be read-only views of a memory-mapped
+    archive segment.
+
+    Parameters
+    ----------
+    resource : Resource or int
+        The resource (or its ``id``) to load the readings of.
+    start, end : datetime.datetime
+        Optionally limit the series to a time range (inclusive).
+
+    Returns
+    -------
+    tuple
+        Two ``float64`` arrays of equal length, the timestamps (seconds since
+        the epoch, ascending) and the readings.
+    """
+    # app imports
+    from consumption import archive
+
+    archived, queryset = archive.split(getattr(resource, "pk", resource), start, end)
+    rows = list(queryset.order_by("timestamp").values_list("timestamp", "reading"))
+    if not rows:
+        # (views of) the archived records
+        return archived["timestamp"], archived["reading"]
+
+    timestamps = np.fromiter(
+        (to_epoch(timestamp) for timestamp, _ in rows),
+        dtype=np.float64,
+        count=len(rows),
+    )
+    readings = np.fromiter(
+        (reading for _, reading in rows), dtype=np.float64, count=len(rows)
+    )
+    if len(archived):
+        timestamps = np.concatenate((archived["timestamp"], timestamps))
+        readings = np.concatenate((archived["reading"], readings))
+    return timestamps, readings
+
+
+def deltas(readings):
+    """Return the consumption between consecutive readings.
+
+    The result has one element less than ``readings``.
+    """
+    return np.diff(readings)
+
+
+def rates(timestamps, readings, per=SECONDS_PER_HOUR):
+    """Return the consumption rate between consecutive readings.
+
+    The rate of the interval between two readings is reported ``per`` the
+    given number of seconds, e.g. :data:`SECONDS_PER_HOUR` or
+    :data:`SECONDS_PER_DAY`. Intervals without duration result in ``nan``.
+    """
+    durations = np.diff(timestamps)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        result = np.diff(readings) / durations * per
+    result[durations == 0] = np.nan
+    return result
+
+
+def rolling_mean(values, window):
+    """Return the rolling mean of ``values`` over ``window`` elements.
+
+    The result has ``len(values) - window + 1`` elements, the first element
+    being the mean of ``values[:window]``.
+    """
+    if window < 1:
+        raise ValueError("window must be at least 1")
+    if len(values) < window:
+        return np.empty(0, dtype=np.float64)
+
+    sums = np.cumsum(np.concatenate(([0.0], values)))
+    return (sums[window:] - sums[:-window]) / window
+
+
+def cumulative(values):
+    """Return the cumulative sum of ``values``, e.g. of :func:`deltas`."""
+    return np.cumsum(values)
+
+
+def readings_at(timestamps, readings, targets):
+    """Estimate the readings at arbitrary ``targets`` by linear interpolation.
+
+    Targets outside of the range of ``timestamps`` result in ``nan``.
+    """
+    targets = np.asarray(targets, dtype=np.float64)
+    if len(timestamps) == 0:
+        return np.full(targets.shape, np.nan)
+
+    result = np.interp(targets, timestamps, readings)
+    result[(targets < timestamps[0]) | (targets > timestamps[-1])] = np.nan
+    return result
+
+
+def _bracketing_ids(resource_ids, targets):
+    """Return the ``id`` of the records right before and after every target.
+
+    One query per chunk of resources and chunk of targets fetches the ``id``
+    of the last record at or before and the first record at or after every
+    target, with one correlated subquery each, backed by the
+    ``(resource, timestamp)`` index. The chunks of targets keep the number
+    of columns of the result below the limits of the database backends.
+
+    Returns
+    -------
+    tuple
+        Two ``int64`` arrays of shape ``(len(resource_ids), len(targets))``,
+        with ``-1`` if there is no such record (or resource).
+    """
+    before = np.full((len(resource_ids), len(targets)), -1, dtype=np.int64)
+    after = np.full((len(resource_ids), len(targets)), -1, dtype=np.int64)
+    rows_by_id = {resource_id: row for row, resource_id in enumerate(resource_ids)}
+
+    for first in range(0, len(targets), INTERPOLATION_TARGETS_PER_QUERY):
+        last = first + INTERPOLATION_TARGETS_PER_QUERY
+        chunk = targets[first:last]
+        annotations = {}
+        for index, target in enumerate(chunk):
+            records = Record.objects.filter(resource=OuterRef("pk"))
+            annotations["before_{}".format(index)] = Subquery(
+                records.filter(timestamp__lte=target)
+                .order_by("-timestamp")
+                .values("pk")[:1]
+            )
+            annotations["after_{}".format(index)] = Subquery(
+                records.filter(timestamp__gte=target)
+                .order_by("timestamp")
+                .values("pk")[:1]
+            )
+
+        columns = slice(first, first + len(chunk))
+        for offset in range(0, len(resource_ids), INTERPOLATION_CHUNK_SIZE):
+            end = offset + INTERPOLATION_CHUNK_SIZE
+            for pk, *ids in (
+                Resource.objects.filter(pk__in=resource_ids[offset:end])
+                .annotate(**annotations)
+                .values_list("pk", *annotations)
+            ):
+                ids = [-1 if value is None else value for value in ids]
+                before[rows_by_id[pk], columns] = ids[0::2]
+                after[rows_by_id[pk], columns] = ids[1::2]
+
+    return before, after
+
+
+def _bracketing_records(resource_ids, targets):
+    """Return timestamp and reading of the records right before and after every target.
+
+    Returns
+    -------
+    tuple
+        Four ``float64`` arrays of shape ``(len(resource_ids), len(targets))``:
+        the timestamps and readings of the records before and after the
+        targets, ``nan`` if there is no such record.
+    """
+    shape = (len(resource_ids), len(targets))
+    t0, r0, t1, r1 = (np.full(shape, np.nan) for _ in range(4))
+
+    before, after = _bracketing_ids(resource_ids, targets)
+    # ascending, so the chunks are fetched in ascending order, too
+    record_ids = np.unique(
+        np.concatenate((before[before >= 0], after[after >= 0]))
+    ).tolist()
+    rows = []
+    for offset in range(0, len(record_ids), INTERPOLATION_CHUNK_SIZE):
+        end = offset + INTERPOLATION_CHUNK_SIZE
+        rows.extend(
+            Record.objects.filter(pk__in=record_ids[offset:end])
+            .order_by("pk")
+            .values_list("pk", "timestamp", "reading")
+        )
+    pks = np.fromiter((row[0] for row in rows), dtype=np.int64, count=len(rows))
+    timestamps = np.fromiter(
+        (to_epoch(row[1]) for row in rows), dtype=np.float64, count=len(rows)
+    )
+    readings = np.fromiter((row[2] for row in rows), dtype=np.float64, count=len(rows))
+
+    for ids, ts, values in ((before, t0, r0), (after, t1, r1)):
+        found = ids >= 0
+        index = np.searchsorted(pks, ids[found])
+        ts[found] = timestamps[index]
+        values[found] = readings[index]
+    return t0, r0, t1, r1
+
+
+def _merge_archived_brackets(resource_ids, epochs, brackets):
+    """Replace the brackets by archived records, where these are closer to the targets.
+
+    The archive of every resource (see :mod:`consumption.archive`) is
+    searched with ``numpy.searchsorted`` in the memory-mapped file.
+    """
+    # app imports
+    from consumption import archive
+
+    if archive.archive_dir() is None:
+        return
+    t0, r0, t1, r1 = brackets
+    for row, resource_id in enumerate(resource_ids):
+        archived = archive.load(resource_id)
+        if not len(archived):
+            continue
+        timestamps = archived["timestamp"]
+
+        lower = np.searchsorted(timestamps, epochs, side="right") - 1
+        valid = lower >= 0
+        closer = valid.copy()
+        closer[valid] = ~(t0[row, valid] >= timestamps[lower[valid]])
+        t0[row, closer] = timestamps[lower[closer]]
+        r0[row, closer] = archived["reading"][lower[closer]]
+
+        upper = np.searchsorted(timestamps, epochs, side="left")
+        valid = upper < len(timestamps)
+        closer = valid.copy()
+        closer[valid] = ~(t1[row, valid] <= timestamps[upper[valid]])
+        t1[row, closer] = timestamps[upper[closer]]
+        r1[row, closer] = archived["reading"][upper[closer]]
+
+
+def interpolate_readings(resources, targets):
+    """Estimate the readings of many resources at many timestamps.
+
+    The reading at a target is interpolated linearly between the records
+    right before and right after it. Only these records are fetched from the
+    database, using the ``(resource, timestamp)`` index. The interpolation is
+    vectorized: the fetched records are sorted by ``id`` and matched to the
+    brackets with a binary search (``numpy.searchsorted``). Archived records
+    (see :mod:`consumption.archive`) are included.
+
+    Targets outside of the series of a resource result in ``nan``.
+
+    Parameters
+    ----------
+    resources : iterable
+        The resources (or their ``id``).
+    targets : sequence
+        The timestamps (``datetime``) to estimate the readings at.
+
+    Returns
+    -------
+    tuple
+        The ``id`` of the resources (ascending) and the estimated readings,
+        a ``float64`` array of shape ``(len(resources), len(targets))``.
+    """
+    resource_ids = sorted({getattr(resource, "pk", resource) for resource in resources})
+    targets = list(targets)
+    result = np.full((len(resource_ids), len(targets)), np.nan)
+    if not resource_ids or not targets:
+        return np.array(resource_ids, dtype=np.int64), result
+
+    epochs = np.array([to_epoch(target) for target in targets], dtype=np.float64)
+    brackets = _bracketing_records(resource_ids, targets)
+    _merge_archived_brackets(resource_ids, epochs, brackets)
+    t0, r0, t1, r1 = brackets
+
+    found = ~(np.isnan(t0) | np.isnan(t1))
+    t = np.broadcast_to(epochs, result.shape)[found]
+    t0, r0, t1, r1 = t0[found], r0[found], t1[found], r1[found]
+    duration = t1 - t0
+    with np.errstate(divide="ignore", invalid="ignore"):
+        weight = np.where(duration > 0, (t - t0) / duration, 0.0)
+    result[found] = r0 + weight * (r1 - r0)
+    return np.array(resource_ids, dtype=np.int64), result
+
+
+def reading_at(resource, timestamp):
+    """Estimate the reading of one resource at ``timestamp``.
+
+    See :func:`interpolate_readings`, returns ``nan`` if ``timestamp`` is
+    outside of the series.
+    """
+    return float(interpolate_readings([resource], [timestamp])[1][0, 0])
+
+
+def consumption_between(resources, start, end):
+    """Estimate the consumption of many resources between two timestamps.
+
+    This is the typical calculation of a billing period, that does not match
+    the actual readings. See :func:`interpolate_readings`.
+
+    Returns
+    -------
+    tuple
+        The ``id`` of the resources (ascending) and their consumption, with
+        ``nan`` if the period is not completely covered by the series.
+    """
+    resource_ids, readings = interpolate_readings(resources, [start, end])
+    return resource_ids, readings[:, 1] - readings[:, 0]
+
+
+def period_totals(timestamps, readings, edges):
+    """Return the consumption between consecutive ``edges``.
+
+    The readings at the edges are interpolated (see :func:`readings_at`), so
+    the consumption is distributed proportionally if a period boundary falls
+    between two readings. Periods not completely covered by the series result
+    in ``nan``.
+
+    Parameters
+    ----------
+    timestamps, readings : numpy.ndarray
+        The series, as provided by :func:`load_series`.
+    edges : sequence
+        The boundaries of the periods, as seconds since the epoch, ascending.
+
+    Returns
+    -------
+    numpy.ndarray
+        The consumption per period, with ``len(edges) - 1`` elements.
+    """
+    return np.diff(readings_at(timestamps, readings, edges))
+
+
+def lttb(timestamps, readings, threshold):
+    """Downsample a series with the *Largest-Triangle-Three-Buckets* algorithm.
+
+    The algorithm keeps the first and the last point and selects one point
+    of each of ``threshold - 2`` buckets, the one forming the largest
+    triangle with the previously selected point and the average of the next
+    bucket. This preserves the visual shape of the series.
+
+    See Sveinn Steinarsson, *Downsampling Time Series for Visual
+    Representation* (2013).
+
+    Returns
+    -------
+    tuple
+        The downsampled ``(timestamps, readings)``. If the series has no more
+        than ``threshold`` points, it is returned unchanged.
+    """
+    length = len(timestamps)
+    if threshold >= length or threshold < 3:
+        return timestamps, readings
+
+    # the boundaries of the buckets, the last bucket is the last point
+    edges = np.floor(np.arange(threshold - 1) * (length - 2) / (threshold - 2))
+    edges = np.append(edges.astype(np.intp) + 1, length)
+
+    selected = np.empty(threshold, dtype=np.intp)
+    selected[0] = previous = 0
+    for bucket in range(threshold - 2):
+        start, end, next_end = edges[bucket], edges[bucket + 1], edges[bucket + 2]
+        avg_x = timestamps[end:next_end].mean()
+        avg_y = readings[end:next_end].mean()
+
+        areas = np.abs(
+            (timestamps[previous] - avg_x) * (readings[start:end] - readings[previous])
+            - (timestamps[previous] - timestamps[start:end])
+            * (avg_y - readings[previous])
+        )
+        previous = start + int(np.argmax(areas))
+        selected[bucket + 1] = previous
+    selected[-1] = length - 1
+
+    return timestamps[selected], readings[selected]
+
+
+def minmax(timestamps, readings, threshold):
+    """Downsample a series by keeping the minimum and maximum of buckets.
+
+    The series is divided into ``threshold // 2`` buckets of equal size and
+    the lowest and highest reading of each bucket are kept, preserving
+    spikes that may be smoothed away by :func:`lttb`.
+
+    Returns
+    -------
+    tuple
+        The downsampled ``(timestamps, readings)``. If the series has no more
+        than ``threshold`` points, it is returned unchanged.
+    """
+    length = len(timestamps)
+    if threshold >= length or threshold < 2:
+        return timestamps, readings
+
+    edges = np.linspace(0, length, threshold // 2 + 1).astype(np.intp)
+    selected = []
+    for start, end in zip(edges[:-1], edges[1:]):
+        if start == end:
+            continue
+        bucket = readings[start:end]
+        selected.extend(
+            sorted({start + int(np.argmin(bucket)), start + int(np.argmax(bucket))})
+        )
+
+    selected = np.array(selected, dtype=np.intp)
+    return timestamps[selected], readings[selected]
+
+
+DOWNSAMPLING_METHODS = {"lttb": lttb, "minmax": minmax}
+"""The available downsampling functions by name."""
@@ -0,0 +1,11 @@
+# SPDX-License-Identifier: MIT
+
+"""A lightweight JSON API for the app's models.
+
+The API is read-only (see :mod:`consumption.api.views`), except for the
+ingestion of readings (see :mod:`consumption.api.ingest`).
+
+The API is provided with its own URL configuration in
+:mod:`consumption.api.urls` and must be included separately, e.g.
+``path("consumption/api/", include("consumption.api.urls"))``.
+"""
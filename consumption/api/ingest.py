@@ -0,0 +1,265 @@
+# SPDX-License-Identifier: MIT
+
+"""Ingest readings pushed by meters and collectors.
+
+:class:`IngestApiView` accepts batches of readings as JSON and writes them
+with :func:`~consumption.bulk.write_records`, one ``bulk_create()`` per
+request. It is an asynchronous view, so a worker is not blocked while
+requests are received.
+
+Requests are authenticated with a token, provided as
+``Authorization: Bearer <token>``. The body is a JSON object with the key
+``readings``, a list of ``[resource, timestamp, reading]`` lists or
+``{"resource": ..., "timestamp": ..., "reading": ...}`` objects::
+
+    {"readings": [[1, "2026-01-01T12:00:00", 1234.5], ...]}
+
+The batch is validated as a whole. If any reading is invalid, nothing is
+written and the response (``400``) lists the errors by index. Readings with
+an existing resource and timestamp are skipped.
+
+Retries may provide an ``Idempotency-Key`` header. The response of a
+successfully processed request is stored in the cache (see
+:mod:`consumption.cache`) and returned for every later request with the
+same token and key, without processing the readings again. The key is
+reserved (with ``cache.add()``) before the readings are processed, so
+concurrent requests with the same key are rejected (``409``) instead of being
+processed twice. The reservation is released, if the request fails.
+
+Bodies larger than Django's ``DATA_UPLOAD_MAX_MEMORY_SIZE`` are rejected
+(``413``).
+
+The following settings are supported:
+
+    - ``CONSUMPTION_INGEST_TOKENS``: a list of the accepted tokens, the
+      endpoint rejects all requests, if this is empty (the default);
+    - ``CONSUMPTION_INGEST_MAX_READINGS``: the maximum number of readings per
+      request, defaults to ``10000``;
+    - ``CONSUMPTION_INGEST_IDEMPOTENCY_TIMEOUT``: how long the responses are
+      stored for idempotency keys in seconds, defaults to ``86400``.
+"""
+
+# Python imports
+import hashlib
+import hmac
+import json
+import math
+
+# Django imports
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured, RequestDataTooBig
+from django.http import JsonResponse
+from django.utils.decorators import method_decorator
+from django.views import generic
+from django.views.decorators.csrf import csrf_exempt
+
+# external imports
+from asgiref.sync import sync_to_async
+
+# app imports
+from consumption.bulk import ON_CONFLICT_SKIP, write_records
+from consumption.cache import get_cache
+from consumption.models.record import Record
+from consumption.models.resource import Resource
+from consumption.utils import parse_timestamp
+
+MAX_LISTED_ERRORS = 100
+"""The maximum number of errors to include in a response."""
+
+IDEMPOTENCY_RESERVATION_TIMEOUT = 300
+"""How long an ``Idempotency-Key`` is reserved while processing, in seconds.
+
+This limits the time, the key is blocked, if the process fails without
+releasing it.
+"""
+
+_RESERVED = "reserved"
+"""The value of a reserved ``Idempotency-Key``, until its response is stored."""
+
+
+def _authenticate(request):
+    """Return the provided token, if it is one of ``CONSUMPTION_INGEST_TOKENS``."""
+    scheme, _, token = request.headers.get("Authorization", "").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return None
+
+    tokens = getattr(settings, "CONSUMPTION_INGEST_TOKENS", ())
+    if isinstance(tokens, (str, bytes)):
+        # a string would accept every single character of it as token
+        raise ImproperlyConfigured(
+            "CONSUMPTION_INGEST_TOKENS must be a list of tokens, not a string."
+        )
+
+    token = token.strip().encode("utf-8")
+    for accepted in tokens:
+        if hmac.compare_digest(token, str(accepted).encode("utf-8")):
+            return token
+    return None
+
+
+def _parse_reading(value):
+    """Return ``(resource_id, timestamp, reading)`` of one item of ``readings``.
+
+    Raises
+    ------
+    ValueError
+        If the item is invalid.
+    """
+    if isinstance(value, dict):
+        try:
+            value = (value["resource"], value["timestamp"], value["reading"])
+        except KeyError:
+            raise ValueError("Required: resource, timestamp, reading")
+    if not isinstance(value, (list, tuple)) or len(value) != 3:
+        raise ValueError("Required: [resource, timestamp, reading]")
+
+    resource, timestamp, reading = value
+    if isinstance(resource, bool) or not isinstance(resource, int):
+        raise ValueError("Invalid resource: {}".format(resource))
+    if isinstance(reading, bool) or not isinstance(reading, (int, float)):
+        raise ValueError("Invalid reading: {}".format(reading))
+    if not math.isfinite(reading):
+        raise ValueError("Invalid reading: {}".format(reading))
+    return resource, parse_timestamp(timestamp), float(reading)
+
+
+def ingest(readings):
+    """Validate and write a batch of readings (synchronously).
+
+    The existence of the resources is checked with one single query.
+
+    Returns
+    -------
+    tuple
+        The number of accepted readings and a list of ``{"index": ...,
+        "error": ...}`` dicts. Nothing is written, if there are errors.
+    """
+    parsed = []
+    errors = []
+    for index, value in enumerate(readings):
+        try:
+            parsed.append((index, *_parse_reading(value)))
+        except ValueError as err:
+            errors.append({"index": index, "error": str(err)})
+
+    resource_ids = {resource_id for _, resource_id, _, _ in parsed}
+    existing = set(
+        Resource.objects.filter(pk__in=resource_ids).values_list("pk", flat=True)
+    )
+    for index, resource_id, _, _ in parsed:
+        if resource_id not in existing:
+            errors.append(
+                {"index": index, "error": "Unknown resource: {}".format(resource_id)}
+            )
+
+    if errors:
+        return 0, sorted(errors, key=lambda error: error["index"])
+
+    return (
+        write_records(
+            [
+                Record(resource_id=resource_id, timestamp=timestamp, reading=reading)
+                for _, resource_id, timestamp, reading in parsed
+            ],
+            on_conflict=ON_CONFLICT_SKIP,
+        ),
+        [],
+    )
+
+
+def _idempotency_cache_key(token, key):
+    """Return the cache key of an ``Idempotency-Key`` provided with ``token``."""
+    return "consumption:ingest:{}:{}".format(
+        hashlib.sha256(token).hexdigest(), hashlib.sha256(key.encode()).hexdigest()
+    )
+
+
+@method_decorator(csrf_exempt, name="dispatch")
+class IngestApiView(generic.View):
+    """Accept batches of readings, see :mod:`consumption.api.ingest`."""
+
+    http_method_names = ["post"]
+
+    def _idempotency_key(self, request, token):
+        key = request.headers.get("Idempotency-Key")
+        if not key:
+            return None
+        return _idempotency_cache_key(token, key)
+
+    async def post(self, request, *args, **kwargs):
+        """Authenticate the request and process the readings exactly once."""
+        token = _authenticate(request)
+        if token is None:
+            response = JsonResponse({"error": "Invalid token"}, status=401)
+            response["WWW-Authenticate"] = "Bearer"
+            return response
+
+        idempotency_key = self._idempotency_key(request, token)
+        if idempotency_key is None:
+            data, status = await self.process(request)
+            return JsonResponse(data, status=status)
+
+        cache = get_cache()
+        reserved = await sync_to_async(cache.add)(
+            idempotency_key, _RESERVED, IDEMPOTENCY_RESERVATION_TIMEOUT
+        )
+        if not reserved:
+            stored = await sync_to_async(cache.get)(idempotency_key)
+            if not isinstance(stored, dict):
+                return JsonResponse(
+                    {"error": "A request with this Idempotency-Key is in progress"},
+                    status=409,
+                )
+            response = JsonResponse(stored, status=201)
+            response["Idempotent-Replayed"] = "true"
+            return response
+
+        try:
+            data, status = await self.process(request)
+        except BaseException:
+            await sync_to_async(cache.delete)(idempotency_key)
+            raise
+        if status == 201:
+            await sync_to_async(cache.set)(
+                idempotency_key,
+                data,
+                getattr(settings, "CONSUMPTION_INGEST_IDEMPOTENCY_TIMEOUT", 86400),
+            )
+        else:
+            await sync_to_async(cache.delete)(idempotency_key)
+        return JsonResponse(data, status=status)
+
+    async def process(self, request):
+        """Validate and write the readings of ``request``.
+
+        Returns
+        -------
+        tuple
+            The data of the response and its status code.
+        """
+        try:
+            body = json.loads(request.body)
+        except RequestDataTooBig:
+            return {"error": "Request body too large"}, 413
+        except ValueError:
+            return {"error": "Invalid JSON"}, 400
+        if not isinstance(body, dict) or "readings" not in body:
+            return {"error": "Required: {'readings': [...]}"}, 400
+        readings = body["readings"]
+        if not isinstance(readings, list):
+            return {"error": "'readings' must be a list"}, 400
+
+        max_readings = getattr(settings, "CONSUMPTION_INGEST_MAX_READINGS", 10000)
+        if len(readings) > max_readings:
+            return (
+                {"error": "At most {} readings per request".format(max_readings)},
+                413,
+            )
+
+        accepted, errors = await sync_to_async(ingest)(readings)
+        if errors:
+            return (
+                {"error": "Invalid readings", "errors": errors[:MAX_LISTED_ERRORS]},
+                400,
+            )
+        return {"received": len(readings), "accepted": accepted}, 201
@@ -0,0 +1,45 @@
+# SPDX-License-Identifier: MIT
+
+"""URL configuration of the app's JSON API."""
+
+# Django imports
+from django.urls import path
+
+# app imports
+from consumption.api.ingest import IngestApiView
+from consumption.api.views import (
+    RecordDetailApiView,
+    RecordListApiView,
+    ResourceDetailApiView,
+    ResourceListApiView,
+    SubjectDetailApiView,
+    SubjectListApiView,
+)
+
+app_name = "consumption-api"
+"""Define an application namespace for reversing URLs.
+
+See :djangodoc:`URL namespaces <topics/http/urls/#url-namespaces>`.
+"""
+
+urlpatterns = [
+    path("ingest/", IngestApiView.as_view(), name="ingest"),
+    path("subject/", SubjectListApiView.as_view(), name="subject-list"),
+    path(
+        "subject/<int:pk>/",
+        SubjectDetailApiView.as_view(),
+        name="subject-detail",
+    ),
+    path("resource/", ResourceListApiView.as_view(), name="resource-list"),
+    path(
+        "resource/<int:pk>/",
+        ResourceDetailApiView.as_view(),
+        name="resource-detail",
+    ),
+    path("record/", RecordListApiView.as_view(), name="record-list"),
+    path(
+        "record/<int:pk>/",
+        RecordDetailApiView.as_view(),
+        name="record-detail",
+    ),
+]
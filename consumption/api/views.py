@@ -0,0 +1,245 @@
+# SPDX-License-Identifier: MIT
+
+"""Views of the app's read-only JSON API.
+
+All views serialize the results of ``values()`` querysets, so neither model
+instances are created nor templates are rendered. Lists are paginated with
+keyset pagination (see :class:`~consumption.pagination.KeysetPaginator`), so
+the cost of a page does not depend on its depth.
+
+Supported GET parameters:
+
+    - ``fields``: a comma-separated list of the fields to include (sparse
+      field selection), at least one field has to be selected;
+    - ``limit``: the number of objects per page (lists only);
+    - ``after`` / ``before``: the cursors of the adjacent pages, as provided
+      by ``next`` and ``previous`` of the response (lists only);
+    - additional filters, as provided by the specific view.
+"""
+
+# Django imports
+from django.http import JsonResponse
+from django.views import generic
+
+# app imports
+from consumption.models.record import Record
+from consumption.models.resource import Resource
+from consumption.models.subject import Subject
+from consumption.pagination import InvalidCursor, KeysetPaginator
+from consumption.utils import parse_timestamp
+
+
+class ApiError(ValueError):
+    """Raised if a request can not be processed, results in a response with ``400``."""
+
+
+def _parse_int(name, value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        raise ApiError("Invalid value for '{}': {}".format(name, value))
+
+
+class ApiMixin:
+    """Provide the common functionality of all API views."""
+
+    model = None
+    """Required attribute, determining the model to work on."""
+
+    fields = ()
+    """The fields that may be requested with the ``fields`` GET parameter."""
+
+    def get_fields(self):
+        """Determine the requested fields.
+
+        All fields are provided, if ``fields`` is not given.
+
+        Raises
+        ------
+        ApiError
+            If an unknown field or no field at all (e.g. ``?fields=,``) is
+            requested.
+        """
+        requested = self.request.GET.get("fields")
+        if requested is None:
+            return list(self.fields)
+
+        fields = [field.strip() for field in requested.split(",") if field.strip()]
+        if not fields:
+            raise ApiError("Select at least one field")
+        unknown = set(fields) - set(self.fields)
+        if unknown:
+            raise ApiError("Unknown fields: {}".format(", ".join(sorted(unknown))))
+        return fields
+
+    def get_queryset(self):
+        """Provide the base queryset, to be extended by filters."""
+        return self.model.objects.all()
+
+    def get(self, request, *args, **kwargs):
+        """Provide the response, translating :class:`ApiError` to ``400``."""
+        try:
+            return JsonResponse(self.get_data(**kwargs))
+        except ApiError as err:
+            return JsonResponse({"error": str(err)}, status=400)
+        except self.model.DoesNotExist:
+            return JsonResponse({"error": "Not found"}, status=404)
+
+
+class ApiDetailView(ApiMixin, generic.View):
+    """Provide one object of ``model``."""
+
+    def get_data(self, pk):
+        """Fetch the requested fields of the object."""
+        return self.get_queryset().values(*self.get_fields()).get(pk=pk)
+
+
+class ApiListView(ApiMixin, generic.View):
+    """Provide a paginated list of objects of ``model``."""
+
+    ordering = ("id",)
+    """The (unique) keyset to paginate by."""
+
+    descending = False
+    """Walk the keyset from the highest to the lowest value."""
+
+    default_limit = 100
+    """The number of objects per page, if ``limit`` is not provided."""
+
+    max_limit = 1000
+    """The maximum number of objects per page."""
+
+    def filter_queryset(self, queryset):
+        """Apply filters as provided by GET parameters, to be overridden."""
+        return queryset
+
+    def _page_url(self, param, cursor):
+        if cursor is None:
+            return None
+        query = self.request.GET.copy()
+        query.pop("after", None)
+        query.pop("before", None)
+        query[param] = cursor
+        return "{}?{}".format(self.request.path, query.urlencode())
+
+    def get_data(self):
+        """Fetch one page of objects."""
+        fields = self.get_fields()
+        limit = _parse_int("limit", self.request.GET.get("limit", self.default_limit))
+        if not 0 < limit <= self.max_limit:
+            raise ApiError("'limit' must be between 1 and {}".format(self.max_limit))
+
+        queryset = self.filter_queryset(self.get_queryset())
+        # the keyset is required to determine the cursors
+        values = queryset.values(*fields, *set(self.ordering) - set(fields))
+        paginator = KeysetPaginator(values, self.ordering, limit, self.descending)
+        try:
+            page = paginator.get_page(
+                after=self.request.GET.get("after"),
+                before=self.request.GET.get("before"),
+            )
+        except InvalidCursor as err:
+            raise ApiError(str(err))
+
+        return {
+            "results": [{field: row[field] for field in fields} for row in page],
+            "next": self._page_url("after", page.next_cursor),
+            "previous": self._page_url("before", page.previous_cursor),
+        }
+
+
+class SubjectMixin:
+    """Provide the API's representation of :class:`~consumption.models.subject.Subject`."""
+
+    model = Subject
+    """Required attribute, determining the model to work on."""
+
+    fields = ("id", "name")
+    """The fields that may be requested."""
+
+
+class SubjectDetailApiView(SubjectMixin, ApiDetailView):
+    """Provide one :class:`~consumption.models.subject.Subject`."""
+
+
+class SubjectListApiView(SubjectMixin, ApiListView):
+    """Provide a list of :class:`~consumption.models.subject.Subject` instances."""
+
+
+class ResourceMixin:
+    """Provide the API's representation of :class:`~consumption.models.resource.Resource`."""
+
+    model = Resource
+    """Required attribute, determining the model to work on."""
+
+    fields = ("id", "name", "subject", "description", "unit")
+    """The fields that may be requested."""
+
+
+class ResourceDetailApiView(ResourceMixin, ApiDetailView):
+    """Provide one :class:`~consumption.models.resource.Resource`."""
+
+
+class ResourceListApiView(ResourceMixin, ApiListView):
+    """Provide a list of :class:`~consumption.models.resource.Resource` instances.
+
+    The list may be filtered with the ``subject`` GET parameter.
+    """
+
+    def filter_queryset(self, queryset):
+        """Filter by ``subject``."""
+        subject = self.request.GET.get("subject")
+        if subject is not None:
+            queryset = queryset.filter(subject=_parse_int("subject", subject))
+        return queryset
+
+
+class RecordMixin:
+    """Provide the API's representation of :class:`~consumption.models.record.Record`."""
+
+    model = Record
+    """Required attribute, determining the model to work on."""
+
+    fields = ("id", "resource", "timestamp", "reading")
+    """The fields that may be requested."""
+
+
+class RecordDetailApiView(RecordMixin, ApiDetailView):
+    """Provide one :class:`~consumption.models.record.Record`."""
+
+
+class RecordListApiView(RecordMixin, ApiListView):
+    """Provide a list of :class:`~consumption.models.record.Record` instances, newest first.
+
+    The list may be filtered with the ``resource`` and ``subject`` GET
+    parameters and limited to a time range with ``from`` and ``to`` (ISO
+    8601, inclusive).
+    """
+
+    ordering = ("timestamp", "id")
+    """The (unique) keyset to paginate by."""
+
+    descending = True
+    """Provide the newest records first."""
+
+    def filter_queryset(self, queryset):
+        """Filter by ``resource``, ``subject``, ``from`` and ``to``."""
+        params = self.request.GET
+        if params.get("resource") is not None:
+            queryset = queryset.filter(
+                resource=_parse_int("resource", params["resource"])
+            )
+        if params.get("subject") is not None:
+            queryset = queryset.filter(
+                resource__subject=_parse_int("subject", params["subject"])
+            )
+        try:
+            if params.get("from"):
+                queryset = queryset.filter(
+                    timestamp__gte=parse_timestamp(params["from"])
+                )
+            if params.get("to"):
+                queryset = queryset.filter(timestamp__lte=parse_timestamp(params["to"]))
+        except ValueError as err:
+            raise ApiError(str(err))
+        return queryset
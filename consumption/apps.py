@@ -22,3 +22,8 @@ class ConsumptionConfig(AppConfig):
 
     name = "consumption"
     verbose_name = "Consumption"
+
+    def ready(self):
+        """Connect the app's signal receivers."""
+        # app imports
+        from consumption import signals  # noqa: F401
@@ -0,0 +1,339 @@
+# SPDX-License-Identifier: MIT
+
+"""Archive the cold history of resources into per-resource binary files.
+
+:func:`archive` moves the records of a
+:class:`~consumption.models.resource.Resource` older than a cutoff out of the
+database, into NumPy ``.npy`` files in ``CONSUMPTION_ARCHIVE_DIR``. Every
+resource has its own directory of *segments*, each containing a structured
+array of :data:`ARCHIVE_DTYPE`, the timestamps as seconds since the epoch (see
+:func:`consumption.analytics.to_epoch`) and the readings, ordered by
+timestamp. Archiving appends a segment (or replaces the latest one, while it
+is smaller than :data:`ARCHIVE_SEGMENT_SIZE`), so the cost of a run does not
+depend on the size of the existing archive.
+
+Archived records are read back with :func:`load`, which memory-maps the
+segments and returns the requested time range, without any database query.
+:func:`consumption.analytics.load_series`,
+:func:`consumption.analytics.interpolate_readings` and the exports (see
+:mod:`consumption.views.export`) include the archived records transparently.
+
+The database keeps a *skeleton* of every archived day: its first and last
+record and the one with the highest reading (see
+:func:`consumption.retention.representative_ids`). So everything, that is
+calculated in the database with (at least) daily resolution, is not affected
+by archiving: the consumption per day, week, month, quarter and year (see
+:meth:`~consumption.models.record.RecordQuerySet.consumption_by`), the
+consumption since the start of a period (see
+:meth:`~consumption.models.resource.ResourceQuerySet.with_summary`), the
+:class:`~consumption.models.rollup.DailyRollup`'s minimum and maximum and the
+summary of the resource (``record_count`` counts the records in the
+database). Archiving sends :data:`~consumption.signals.records_changed` for
+the deleted records.
+
+Records may be written after their day was archived. They are included by
+:func:`split` (and everything based on it) and are archived by the next run.
+
+The following settings are supported:
+
+    - ``CONSUMPTION_ARCHIVE_DIR``: the directory to store the archive files
+      in, archiving is disabled, if this is not set (the default).
+
+This module requires NumPy, see :mod:`consumption.analytics`.
+"""
+
+# Python imports
+import os
+
+# Django imports
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db import transaction
+
+# app imports
+from consumption.analytics import from_epoch, to_epoch
+from consumption.models.record import Record
+from consumption.models.rollup import _day_range, _record_day
+from consumption.retention import DELETE_CHUNK_SIZE, RESOLUTION_DAY, representative_ids
+from consumption.signals import records_changed
+
+try:
+    # external imports
+    import numpy as np
+except ImportError as err:  # pragma: nocover
+    raise ImproperlyConfigured(
+        "consumption.archive requires NumPy, "
+        "install it with 'pip install django-consumption[analytics]'."
+    ) from err
+
+ARCHIVE_DTYPE = np.dtype([("timestamp", "<f8"), ("reading", "<f8")])
+"""The layout of the archive files."""
+
+ARCHIVE_SEGMENT_SIZE = 100000
+"""The number of records, up to which the latest segment is extended."""
+
+
+def archive_dir():
+    """Return ``CONSUMPTION_ARCHIVE_DIR`` or ``None``, if archiving is disabled."""
+    return getattr(settings, "CONSUMPTION_ARCHIVE_DIR", None) or None
+
+
+def resource_dir(resource_id):
+    """Return the directory of the segments of a resource (which may not exist)."""
+    directory = archive_dir()
+    if directory is None:
+        raise ImproperlyConfigured("CONSUMPTION_ARCHIVE_DIR is not set.")
+    return os.path.join(directory, "resource-{}".format(resource_id))
+
+
+def _segments(resource_id):
+    """Return the paths of the segments of a resource, oldest first."""
+    directory = resource_dir(resource_id)
+    try:
+        names = os.listdir(directory)
+    except FileNotFoundError:
+        return []
+    return [
+        os.path.join(directory, name) for name in sorted(names) if name.endswith(".npy")
+    ]
+
+
+def _merge(parts):
+    """Merge arrays of :data:`ARCHIVE_DTYPE`, each ordered by timestamp.
+
+    Of records with the same timestamp, the one of the latest part is kept.
+    A single part is returned as it is (e.g. a view of a memory-mapped
+    segment).
+    """
+    parts = [part for part in parts if len(part)]
+    if not parts:
+        return np.empty(0, dtype=ARCHIVE_DTYPE)
+    if len(parts) == 1:
+        return parts[0]
+
+    merged = np.concatenate(parts)
+    if all(
+        previous["timestamp"][-1] < part["timestamp"][0]
+        for previous, part in zip(parts, parts[1:])
+    ):
+        return merged
+    merged = merged[np.argsort(merged["timestamp"], kind="stable")]
+    timestamps = merged["timestamp"]
+    return merged[np.append(timestamps[1:] != timestamps[:-1], True)]
+
+
+def load(resource_id, start=None, end=None):
+    """Return the archived records of a resource.
+
+    Parameters
+    ----------
+    resource_id : int
+        The ``id`` of the resource.
+    start, end : datetime.datetime
+        Optionally limit the records to a time range (inclusive).
+
+    Returns
+    -------
+    numpy.ndarray
+        An array of :data:`ARCHIVE_DTYPE`, ordered by timestamp. If the time
+        range is covered by one segment, this is a read-only view of the
+        memory-mapped file. It is empty, if there are no archived records
+        (or archiving is disabled).
+    """
+    if archive_dir() is None:
+        return np.empty(0, dtype=ARCHIVE_DTYPE)
+    return _merge(
+        [
+            _slice(np.load(path, mmap_mode="r"), start, end)
+            for path in _segments(resource_id)
+        ]
+    )
+
+
+def _slice(archived, start, end):
+    """Return the view of ``archived`` in a time range (inclusive)."""
+    timestamps = archived["timestamp"]
+    low = 0 if start is None else np.searchsorted(timestamps, to_epoch(start))
+    high = (
+        len(archived)
+        if end is None
+        else np.searchsorted(timestamps, to_epoch(end), side="right")
+    )
+    return archived[low:high]
+
+
+def _contains(resource_id, epochs):
+    """Return, which of the timestamps ``epochs`` are archived.
+
+    Only the pages of the memory-mapped segments, that are searched, are
+    read.
+    """
+    found = np.zeros(len(epochs), dtype=bool)
+    for path in _segments(resource_id):
+        timestamps = np.load(path, mmap_mode="r")["timestamp"]
+        if not len(timestamps):
+            continue
+        index = np.minimum(np.searchsorted(timestamps, epochs), len(timestamps) - 1)
+        found |= timestamps[index] == epochs
+    return found
+
+
+def _write(path, data):
+    """Write ``data`` to ``path`` atomically, through a temporary file."""
+    partial = "{}.partial".format(path)
+    with open(partial, "wb") as file:
+        np.save(file, data)
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(partial, path)
+
+
+def _remove(path):
+    """Remove a file, that may not exist (anymore)."""
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def _append(resource_id, added):
+    """Write ``added`` as a new segment of a resource.
+
+    If the latest segment is small, it is merged into the new segment.
+
+    Returns
+    -------
+    tuple
+        The path of the new segment and the path of the segment, that is
+        replaced by it (or ``None``).
+    """
+    directory = resource_dir(resource_id)
+    segments = _segments(resource_id)
+    number = 1
+    replaced = None
+    if segments:
+        number = int(os.path.basename(segments[-1])[:-4]) + 1
+        latest = np.load(segments[-1], mmap_mode="r")
+        if len(latest) + len(added) <= ARCHIVE_SEGMENT_SIZE:
+            added = _merge([latest, added])
+            replaced = segments[-1]
+
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, "{:06d}.npy".format(number))
+    _write(path, added)
+    return path, replaced
+
+
+def archive(resource, before):
+    """Move the records of ``resource`` older than ``before`` into its archive.
+
+    ``before`` is aligned to the start of its day. The records, that are not
+    archived yet, are written to a new segment, then the records of their
+    days are deleted from the database, except for the skeleton of every
+    day.
+
+    The segment is written before the transaction, that deletes the records,
+    is committed, and is removed again, if the transaction fails. Records
+    existing in both places (e.g. the skeleton) are merged when reading the
+    archive, see :func:`split`.
+
+    Parameters
+    ----------
+    resource : Resource or int
+        The resource (or its ``id``) to archive the records of.
+    before : datetime.datetime
+        The cutoff.
+
+    Returns
+    -------
+    int
+        The number of archived records.
+    """
+    resource_id = getattr(resource, "pk", resource)
+    cutoff = _day_range(_record_day(before))[0]
+
+    path = replaced = None
+    try:
+        with transaction.atomic():
+            rows = list(
+                Record.objects.filter(resource_id=resource_id, timestamp__lt=cutoff)
+                .order_by("timestamp")
+                .values_list("id", "timestamp", "reading")
+            )
+            added = np.fromiter(
+                ((to_epoch(timestamp), reading) for _, timestamp, reading in rows),
+                dtype=ARCHIVE_DTYPE,
+                count=len(rows),
+            )
+            new = ~_contains(resource_id, added["timestamp"])
+            added = added[new]
+            if not len(added):
+                return 0
+
+            days = {_record_day(rows[index][1]) for index in np.flatnonzero(new)}
+            rows = [row for row in rows if _record_day(row[1]) in days]
+            keep = representative_ids(rows, RESOLUTION_DAY, keep_first=True)
+            removed = [(pk, timestamp) for pk, timestamp, _ in rows if pk not in keep]
+
+            path, replaced = _append(resource_id, added)
+            for offset in range(0, len(removed), DELETE_CHUNK_SIZE):
+                chunk_end = offset + DELETE_CHUNK_SIZE
+                Record.objects.filter(
+                    id__in=[pk for pk, _ in removed[offset:chunk_end]]
+                ).delete()
+            records_changed.send(
+                sender=Record,
+                changes={(resource_id, timestamp) for _, timestamp in removed},
+            )
+    except Exception:
+        if path is not None:
+            _remove(path)
+        raise
+
+    if replaced is not None:
+        transaction.on_commit(lambda: _remove(replaced))
+    return len(added)
+
+
+def split(resource_id, start=None, end=None):
+    """Split the records of a resource in a time range into archived and hot ones.
+
+    Parameters
+    ----------
+    resource_id : int
+        The ``id`` of the resource.
+    start, end : datetime.datetime
+        Optionally limit the records to a time range (inclusive).
+
+    Returns
+    -------
+    tuple
+        The archived records (see :func:`load`) and a queryset of the
+        :class:`~consumption.models.record.Record` instances in the time
+        range, that are younger than the archived ones. The records in the
+        database within the time span of the archived ones (the skeleton and
+        records written after archiving) are merged into the archived
+        records, taking precedence over these.
+    """
+    records = Record.objects.filter(resource_id=resource_id)
+    if start is not None:
+        records = records.filter(timestamp__gte=start)
+    if end is not None:
+        records = records.filter(timestamp__lte=end)
+
+    archived = load(resource_id, start, end)
+    if len(archived):
+        last = from_epoch(archived["timestamp"][-1], aware=settings.USE_TZ)
+        rows = list(
+            records.filter(timestamp__lte=last)
+            .order_by("timestamp")
+            .values_list("timestamp", "reading")
+        )
+        stored = np.fromiter(
+            ((to_epoch(timestamp), reading) for timestamp, reading in rows),
+            dtype=ARCHIVE_DTYPE,
+            count=len(rows),
+        )
+        archived = _merge([archived, stored])
+        records = records.filter(timestamp__gt=last)
+    return archived, records
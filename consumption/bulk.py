@@ -0,0 +1,173 @@
+# SPDX-License-Identifier: MIT
+
+"""Write many :class:`~consumption.models.record.Record` instances at once.
+
+This is the shared implementation of all code paths that create records in
+bulk, e.g. imports and ingestion. It ensures, that the records are written
+in one transaction per batch and that
+:data:`~consumption.signals.records_changed` is sent for every batch. It also
+provides the conversion of the rows of the input into records, shared by the
+``consumption_import`` and ``consumption_ingest`` management commands.
+"""
+
+# Python imports
+import math
+import time
+
+# Django imports
+import django
+from django.db import transaction
+
+# app imports
+from consumption.models.record import Record
+from consumption.models.resource import Resource
+from consumption.signals import records_changed
+from consumption.utils import parse_timestamp
+
+ON_CONFLICT_ERROR = "error"
+"""Raise ``IntegrityError`` if a record with the same resource and timestamp exists."""
+
+ON_CONFLICT_SKIP = "skip"
+"""Keep the existing record, if one with the same resource and timestamp exists."""
+
+ON_CONFLICT_UPDATE = "update"
+"""Update the reading of the existing record (*upsert*)."""
+
+ON_CONFLICT_CHOICES = (ON_CONFLICT_ERROR, ON_CONFLICT_SKIP, ON_CONFLICT_UPDATE)
+"""All supported strategies to handle conflicting records."""
+
+RESOLVER_MISS_TTL = 60.0
+"""The number of seconds to cache unknown resources of :class:`ResourceResolver`."""
+
+
+def write_records(records, on_conflict=ON_CONFLICT_ERROR):
+    """Write a batch of unsaved ``Record`` instances with one ``bulk_create()``.
+
+    Conflicts are determined by the unique constraint on ``(resource,
+    timestamp)``. If the batch itself contains several records with the
+    same resource and timestamp, only the last one is kept.
+
+    Parameters
+    ----------
+    records : list
+        The unsaved instances of :class:`~consumption.models.record.Record`.
+    on_conflict : str
+        One of :data:`~consumption.bulk.ON_CONFLICT_CHOICES`.
+
+    Returns
+    -------
+    int
+        The number of records that were passed to the database.
+
+    Raises
+    ------
+    ValueError
+        If ``on_conflict`` is not supported.
+    """
+    if on_conflict not in ON_CONFLICT_CHOICES:
+        raise ValueError("Unsupported conflict handling: {}".format(on_conflict))
+    if on_conflict == ON_CONFLICT_UPDATE and django.VERSION < (4, 1):
+        raise ValueError("Updating conflicting records requires Django 4.1")
+
+    unique = {}
+    for record in records:
+        unique[(record.resource_id, record.timestamp)] = record
+    if not unique:
+        return 0
+
+    kwargs = {}
+    if on_conflict == ON_CONFLICT_SKIP:
+        kwargs["ignore_conflicts"] = True
+    elif on_conflict == ON_CONFLICT_UPDATE:
+        kwargs["update_conflicts"] = True
+        kwargs["unique_fields"] = ["resource", "timestamp"]
+        kwargs["update_fields"] = ["reading"]
+
+    with transaction.atomic():
+        Record.objects.bulk_create(unique.values(), **kwargs)
+        records_changed.send(sender=Record, changes=set(unique))
+
+    return len(unique)
+
+
+class RowError(ValueError):
+    """Raised if a row of the input can not be converted into a ``Record``."""
+
+
+class ResourceResolver:
+    """Map the ``resource`` value of a row to the ``id`` of a ``Resource``.
+
+    Resolved values are cached, so the memory consumption depends on the
+    number of distinct resources, not on the size of the input. Values, that
+    are unknown (or ambiguous), are looked up again after ``miss_ttl``
+    seconds, so resources created (or renamed) meanwhile are picked up by
+    long-running processes.
+    """
+
+    def __init__(self, lookup, subject_id=None, miss_ttl=RESOLVER_MISS_TTL):
+        self.lookup = lookup
+        self.queryset = Resource.objects.all()
+        if subject_id is not None:
+            self.queryset = self.queryset.filter(subject_id=subject_id)
+        self.miss_ttl = miss_ttl
+        self._cache = {}
+
+    def _resolve(self, value):
+        if self.lookup in ("auto", "id") and value.isdigit():
+            ids = list(self.queryset.filter(id=int(value)).values_list("id", flat=True))
+            if ids or self.lookup == "id":
+                return ids
+        return list(self.queryset.filter(name=value).values_list("id", flat=True))
+
+    def __call__(self, value):  # noqa: D102
+        value = str(value).strip()
+        cached = self._cache.get(value)
+        if cached is None or (len(cached[0]) != 1 and time.monotonic() >= cached[1]):
+            cached = (self._resolve(value), time.monotonic() + self.miss_ttl)
+            self._cache[value] = cached
+
+        ids = cached[0]
+        if not ids:
+            raise RowError("Unknown resource: {}".format(value))
+        if len(ids) > 1:
+            raise RowError("Ambiguous resource name: {}".format(value))
+        return ids[0]
+
+
+def row_to_record(row, resolve):
+    """Convert one row of the input into an unsaved ``Record``.
+
+    Parameters
+    ----------
+    row : dict
+        Provides ``resource``, ``timestamp`` and ``reading``.
+    resolve : ResourceResolver
+        Maps ``resource`` to the ``id`` of a ``Resource``.
+
+    Raises
+    ------
+    RowError
+        If the row is invalid.
+    """
+    if isinstance(row, Exception):
+        raise RowError("Invalid JSON: {}".format(row))
+    try:
+        resource, timestamp, reading = (
+            row["resource"],
+            row["timestamp"],
+            row["reading"],
+        )
+    except (KeyError, TypeError):
+        raise RowError("Missing column, required: resource, timestamp, reading")
+    try:
+        reading = float(reading)
+    except (TypeError, ValueError):
+        raise RowError("Invalid reading: {}".format(reading))
+    if not math.isfinite(reading):
+        raise RowError("Invalid reading: {}".format(reading))
+    try:
+        timestamp = parse_timestamp(timestamp)
+    except ValueError as err:
+        raise RowError(err)
+
+    return Record(resource_id=resolve(resource), timestamp=timestamp, reading=reading)
@@ -0,0 +1,166 @@
+# SPDX-License-Identifier: MIT
+
+"""Provide caching of expensive, object-related computations and fragments.
+
+Every cached value is bound to a *version* of the object it belongs to, e.g.
+a :class:`~consumption.models.resource.Resource`. The version is part of the
+cache key and is replaced whenever the object (or a related object) is
+modified (see the receivers in :mod:`consumption.signals`), so outdated
+values are never read again and simply expire.
+
+The versions are replaced only after the modifying transaction is committed.
+Otherwise, a concurrent request could cache data of the *old* state with
+the *new* version.
+
+The following settings are supported:
+
+    - ``CONSUMPTION_CACHE_ALIAS``: the cache to use, defaults to
+      ``"default"``;
+    - ``CONSUMPTION_CACHE_TIMEOUT``: the timeout of cached values in
+      seconds, defaults to ``3600``.
+"""
+
+# Python imports
+import hashlib
+import uuid
+
+# Django imports
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.views.decorators.http import condition
+
+
+def get_cache():
+    """Return the cache to use, as configured by ``CONSUMPTION_CACHE_ALIAS``."""
+    return caches[getattr(settings, "CONSUMPTION_CACHE_ALIAS", "default")]
+
+
+def get_timeout():
+    """Return the timeout of cached values, as configured by ``CONSUMPTION_CACHE_TIMEOUT``."""
+    return getattr(settings, "CONSUMPTION_CACHE_TIMEOUT", 3600)
+
+
+def _version_key(model_name, pk):
+    return "consumption:version:{}:{}".format(model_name, pk)
+
+
+def get_version(model_name, pk):
+    """Return the current version of an object.
+
+    If the object has no version (yet, or any more, because it got evicted
+    from the cache), a new one is created.
+    """
+    cache = get_cache()
+    key = _version_key(model_name, pk)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, uuid.uuid4().hex, timeout=None)
+        version = cache.get(key)
+    return version
+
+
+def bump_versions(model_name, pks):
+    """Replace the versions of objects, once the current transaction is committed."""
+    keys = [_version_key(model_name, pk) for pk in set(pks)]
+    if not keys:
+        return
+
+    def _bump():
+        get_cache().set_many({key: uuid.uuid4().hex for key in keys}, timeout=None)
+
+    transaction.on_commit(_bump)
+
+
+def make_key(name, model_name, pk, *parts):
+    """Build a cache key for a value of an object, including its current version."""
+    return ":".join(
+        str(part)
+        for part in ("consumption", name, model_name, pk, get_version(model_name, pk))
+        + parts
+    )
+
+
+def get_or_compute(name, model_name, pk, compute, *parts):
+    """Return a cached value of an object, computing and caching it if required.
+
+    Parameters
+    ----------
+    name : str
+        The name of the value.
+    model_name, pk
+        The object the value belongs to.
+    compute : callable
+        Called without arguments to compute the value, if it is not cached.
+    parts
+        Additional parts of the key, e.g. GET parameters the value depends on.
+    """
+    return get_cache().get_or_set(
+        make_key(name, model_name, pk, *parts), compute, get_timeout()
+    )
+
+
+def make_etag(*parts):
+    """Build an ``ETag`` from the string representations of ``parts``."""
+    return hashlib.sha256(
+        "|".join(str(part) for part in parts).encode("utf-8")
+    ).hexdigest()[:32]
+
+
+class CacheVersionMixin:
+    """Provide the current version of a view's object in the rendering context.
+
+    The context provides ``cache_version`` and ``cache_timeout``, to be used
+    for template fragment caching, e.g.
+    ``{% cache cache_timeout "name" object.id cache_version %}``.
+    """
+
+    def get_context_data(self, **kwargs):
+        """Add ``cache_version`` and ``cache_timeout`` to the context."""
+        context = super().get_context_data(**kwargs)
+        context["cache_version"] = get_version(
+            self.object._meta.model_name, self.object.pk
+        )
+        context["cache_timeout"] = get_timeout()
+        return context
+
+
+class ConditionalGetMixin:
+    """Answer conditional ``GET`` requests of a view without rendering it.
+
+    The view provides a cheap ``ETag`` of its object with :meth:`get_etag`.
+    If the request's ``If-None-Match`` matches, ``304 Not Modified`` is
+    returned before the view's queryset is evaluated or its template is
+    rendered. Otherwise, the response is provided with the ``ETag`` header.
+
+    The ``ETag`` has to be derived from the database (e.g. a modification
+    time), not from the cache versions of this module: the cache may be
+    local to a process (or a dummy), so the versions would differ between
+    processes or never change.
+
+    ``Last-Modified`` is not provided: the pages depend on modifications,
+    that do not have a (cheap) modification time, e.g. a renamed resource or
+    a record written with an older timestamp.
+
+    See :djangodoc:`Conditional View Processing <topics/conditional-view-processing/>`.
+    """
+
+    def get_etag(self):
+        """Return the ``ETag`` of the object.
+
+        This may be ``None``, e.g. if the object does not exist. The default
+        does not provide an ``ETag``, so every request is answered with the
+        rendered view.
+        """
+        return None
+
+    def get(self, request, *args, **kwargs):
+        """Return ``304 Not Modified``, if the object did not change."""
+        etag = self.get_etag()
+        view = super().get
+
+        @condition(etag_func=lambda *args, **kwargs: etag)
+        def conditional_get(request, *args, **kwargs):
+            return view(request, *args, **kwargs)
+
+        return conditional_get(request, *args, **kwargs)
@@ -0,0 +1,3 @@
+# SPDX-License-Identifier: MIT
+
+"""The app's management commands."""
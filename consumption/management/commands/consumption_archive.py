@@ -0,0 +1,72 @@
+# SPDX-License-Identifier: MIT
+
+"""Archive old :class:`~consumption.models.record.Record` instances."""
+
+# Python imports
+import time
+from datetime import timedelta
+
+# Django imports
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+# app imports
+from consumption.models import Resource
+
+
+class Command(BaseCommand):
+    """Move the old records of all (or the given) resources into the archive.
+
+    See :mod:`consumption.archive`. Each resource is processed in its own
+    transaction, so the command may be run on a live system.
+    """
+
+    help = "Move records older than the given number of days into the archive."
+
+    def add_arguments(self, parser):  # noqa: D102
+        parser.add_argument(
+            "resource_ids",
+            nargs="*",
+            type=int,
+            help="Only archive the records of these resources.",
+        )
+        parser.add_argument(
+            "--older-than",
+            required=True,
+            type=int,
+            help="Archive the records older than this number of days.",
+        )
+
+    def handle(self, *args, **options):  # noqa: D102
+        if not getattr(settings, "CONSUMPTION_ARCHIVE_DIR", None):
+            raise CommandError("CONSUMPTION_ARCHIVE_DIR is not set.")
+        if options["older_than"] < 1:
+            raise CommandError("--older-than must be at least 1.")
+
+        # app imports
+        from consumption.archive import archive
+
+        resource_ids = Resource.objects.order_by("id").values_list("id", flat=True)
+        if options["resource_ids"]:
+            resource_ids = resource_ids.filter(id__in=options["resource_ids"])
+        resource_ids = list(resource_ids)
+
+        before = timezone.now() - timedelta(days=options["older_than"])
+        started = time.perf_counter()
+        total = 0
+        for resource_id in resource_ids:
+            archived = archive(resource_id, before)
+            total += archived
+            if options["verbosity"] >= 2:
+                self.stdout.write(
+                    "Archived {} records of resource {}".format(archived, resource_id)
+                )
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                "Archived {} records of {} resources in {:.1f}s".format(
+                    total, len(resource_ids), time.perf_counter() - started
+                )
+            )
+        )
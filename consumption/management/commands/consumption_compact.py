@@ -0,0 +1,71 @@
+# SPDX-License-Identifier: MIT
+
+"""Compact old :class:`~consumption.models.record.Record` instances."""
+
+# Python imports
+import time
+
+# Django imports
+from django.core.management.base import BaseCommand
+from django.db.models import Sum
+
+# app imports
+from consumption.models import Resource
+from consumption.retention import compact
+
+
+class Command(BaseCommand):
+    """Compact the records of all (or the given) resources.
+
+    Only resources with a retention policy are processed, see
+    :mod:`consumption.retention`. The records are processed in chunks of
+    days, each chunk in its own transaction, so the command may be run on a
+    live system, e.g. once a day.
+
+    Deleting rows does not necessarily shrink the database files, depending
+    on the database backend (e.g. ``VACUUM`` on PostgreSQL and SQLite).
+    """
+
+    help = "Compact old records according to the retention policy of their resource."
+
+    def add_arguments(self, parser):  # noqa: D102
+        parser.add_argument(
+            "resource_ids",
+            nargs="*",
+            type=int,
+            help="Only compact the records of these resources.",
+        )
+        parser.add_argument(
+            "--chunk-days",
+            default=7,
+            type=int,
+            help="The number of days to process in one transaction.",
+        )
+
+    def handle(self, *args, **options):  # noqa: D102
+        resources = Resource.objects.filter(retention_raw_days__isnull=False).order_by(
+            "id"
+        )
+        if options["resource_ids"]:
+            resources = resources.filter(id__in=options["resource_ids"])
+
+        started = time.perf_counter()
+        total = 0
+        processed = 0
+        for resource in resources.iterator():
+            removed = compact(resource, chunk_days=options["chunk_days"])
+            total += removed
+            processed += 1
+            if options["verbosity"] >= 2:
+                self.stdout.write("Removed {} records of {}".format(removed, resource))
+
+        # the summaries are refreshed by ``records_changed``, so the number of
+        # the remaining records is available without counting the table
+        kept = resources.aggregate(kept=Sum("record_count"))["kept"] or 0
+        self.stdout.write(
+            self.style.SUCCESS(
+                "Removed {} records of {} resources ({} kept) in {:.1f}s".format(
+                    total, processed, kept, time.perf_counter() - started
+                )
+            )
+        )
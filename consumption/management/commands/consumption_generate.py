@@ -0,0 +1,186 @@
+# SPDX-License-Identifier: MIT
+
+"""Generate synthetic, but realistic data for development and benchmarking."""
+
+# Python imports
+import math
+import random
+import time
+from datetime import timedelta
+
+# Django imports
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+# app imports
+from consumption.bulk import ON_CONFLICT_SKIP, write_records
+from consumption.cache import bump_versions
+from consumption.models import Record, Resource, Subject
+from consumption.models.resource import ResourceChoiceField
+
+PROFILES = (
+    # (name, unit, mean consumption per day, seasonal amplitude)
+    ("Electricity", "kWh", 9.0, 0.2),
+    ("Gas", "m³", 4.0, 0.9),
+    ("Water", "m³", 0.35, 0.1),
+    ("Heat", "MWh", 0.04, 0.95),
+    ("Solar yield", "kWh", 11.0, -0.7),
+)
+"""The kinds of generated resources.
+
+The seasonal amplitude determines the variation over the year, positive
+values peak in winter, negative values in summer.
+"""
+
+
+def _daily_factor(timestamp, amplitude):
+    """Return the relative consumption at ``timestamp``, averaging to ``1``.
+
+    Combines a seasonal (peaking on January 1st for positive amplitudes) and
+    a diurnal variation (low during the night).
+    """
+    season = math.cos(2 * math.pi * timestamp.timetuple().tm_yday / 365.25)
+    hour = timestamp.hour + timestamp.minute / 60
+    daytime = 1 - 0.5 * math.cos(2 * math.pi * (hour - 3) / 24)
+    return max(0.0, 1 + amplitude * season) * daytime
+
+
+def generate_readings(profile, start, interval, count, rng):
+    """Yield ``count`` ``(timestamp, reading)`` tuples of a cumulative meter.
+
+    The readings start at a random value and increase according to the
+    profile (see :data:`PROFILES`) with some noise. The timestamps have a
+    jitter of up to a quarter of ``interval``, which keeps them unique.
+    """
+    _, _, per_day, amplitude = profile
+    per_interval = per_day * interval.total_seconds() / 86400
+    max_jitter = interval.total_seconds() / 4
+
+    reading = rng.uniform(100, 10000)
+    for i in range(count):
+        timestamp = start + i * interval
+        yield (
+            timestamp + timedelta(seconds=int(rng.uniform(0, max_jitter))),
+            round(reading, 3),
+        )
+        reading += (
+            per_interval * _daily_factor(timestamp, amplitude) * rng.uniform(0.5, 1.5)
+        )
+
+
+class Command(BaseCommand):
+    """Generate subjects, resources and their history of readings.
+
+    The records are written in batches with
+    :func:`~consumption.bulk.write_records`, so the rollup and all cached
+    values are updated just as for real data. The history ends *now*, so
+    ``--records 17520 --interval 60`` generates two years of hourly readings
+    per resource.
+
+    The generated data is deterministic for a given ``--seed``.
+    """
+
+    help = "Generate synthetic subjects, resources and records."
+
+    def add_arguments(self, parser):  # noqa: D102
+        parser.add_argument(
+            "--subjects",
+            default=10,
+            type=int,
+            help="The number of subjects to generate.",
+        )
+        parser.add_argument(
+            "--resources",
+            default=len(PROFILES),
+            type=int,
+            help="The number of resources to generate per subject.",
+        )
+        parser.add_argument(
+            "--records",
+            default=17520,
+            type=int,
+            help="The number of records to generate per resource.",
+        )
+        parser.add_argument(
+            "--interval",
+            default=60,
+            type=int,
+            help="The interval between two readings in minutes.",
+        )
+        parser.add_argument(
+            "--seed",
+            default=0,
+            type=int,
+            help="Seed of the random number generator.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            default=10000,
+            type=int,
+            help="The number of records to write in one transaction.",
+        )
+
+    def handle(self, *args, **options):  # noqa: D102
+        if min(options["subjects"], options["records"], options["interval"]) < 1:
+            raise CommandError("--subjects, --records and --interval must be positive.")
+
+        rng = random.Random(options["seed"])
+        interval = timedelta(minutes=options["interval"])
+        start = timezone.now().replace(second=0, microsecond=0) - (
+            options["records"] * interval
+        )
+        batch_size = options["batch_size"]
+
+        started = time.perf_counter()
+        subjects = [
+            Subject.objects.create(name="Subject {}".format(i + 1))
+            for i in range(options["subjects"])
+        ]
+        resources = Resource.objects.bulk_create(
+            [
+                Resource(
+                    name="{} {}".format(PROFILES[i % len(PROFILES)][0], i + 1),
+                    unit=PROFILES[i % len(PROFILES)][1],
+                    subject=subject,
+                )
+                for subject in subjects
+                for i in range(options["resources"])
+            ]
+        )
+        # bulk_create() provides primary keys only on some databases
+        if resources and resources[0].pk is None:
+            resources = list(
+                Resource.objects.filter(subject__in=subjects).order_by("id")
+            )
+        # bulk_create() does not send ``post_save``, so the cached values are
+        # invalidated explicitly, see consumption.signals
+        bump_versions("resource", [ResourceChoiceField.CACHE_PK])
+        bump_versions("subject", [subject.pk for subject in subjects])
+
+        total = 0
+        for index, resource in enumerate(resources):
+            profile = PROFILES[index % len(PROFILES)]
+            batch = []
+            for timestamp, reading in generate_readings(
+                profile, start, interval, options["records"], rng
+            ):
+                batch.append(
+                    Record(resource=resource, timestamp=timestamp, reading=reading)
+                )
+                if len(batch) >= batch_size:
+                    total += write_records(batch, on_conflict=ON_CONFLICT_SKIP)
+                    batch = []
+            total += write_records(batch, on_conflict=ON_CONFLICT_SKIP)
+            if options["verbosity"] >= 2:
+                self.stdout.write("Generated resource {}".format(resource))
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                "Generated {} subjects, {} resources and {} records in {:.1f}s".format(
+                    len(subjects),
+                    len(resources),
+                    total,
+                    time.perf_counter() - started,
+                )
+            )
+        )
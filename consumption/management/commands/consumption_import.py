@@ -0,0 +1,158 @@
+# SPDX-License-Identifier: MIT
+
+"""Import :class:`~consumption.models.record.Record` instances from a file."""
+
+# Python imports
+import csv
+import json
+import sys
+import time
+
+# Django imports
+from django.core.management.base import BaseCommand, CommandError
+from django.db import IntegrityError
+
+# app imports
+from consumption.bulk import (
+    ON_CONFLICT_CHOICES,
+    ON_CONFLICT_SKIP,
+    ResourceResolver,
+    RowError,
+    row_to_record,
+    write_records,
+)
+
+FORMAT_CSV = "csv"
+FORMAT_JSONL = "jsonl"
+
+
+def _read_csv(stream):
+    """Yield the rows of a CSV file as dicts, with a header row."""
+    yield from csv.DictReader(stream)
+
+
+def _read_jsonl(stream):
+    """Yield the rows of a JSON lines file as dicts, skipping empty lines."""
+    for line in stream:
+        line = line.strip()
+        if line:
+            try:
+                yield json.loads(line)
+            except ValueError as err:
+                yield err
+
+
+class Command(BaseCommand):
+    """Import records from a CSV or JSON lines file.
+
+    Every row has to provide ``resource`` (the ``id`` or the ``name`` of a
+    :class:`~consumption.models.resource.Resource`), ``timestamp`` (ISO 8601)
+    and ``reading``.
+
+    The input is streamed row by row and written in batches, each batch with
+    one ``bulk_create()`` in its own transaction, so the memory consumption
+    is independent of the size of the input. Invalid rows are reported and
+    skipped.
+    """
+
+    help = "Import records from a CSV or JSON lines file."
+
+    def add_arguments(self, parser):  # noqa: D102
+        parser.add_argument(
+            "file", help="The file to import, use '-' to read from stdin."
+        )
+        parser.add_argument(
+            "--format",
+            choices=[FORMAT_CSV, FORMAT_JSONL],
+            help="The format of the input. Determined by the file extension, "
+            "if omitted.",
+        )
+        parser.add_argument(
+            "--resource-by",
+            choices=["auto", "id", "name"],
+            default="auto",
+            help="How to look up the resource of a row.",
+        )
+        parser.add_argument(
+            "--subject",
+            type=int,
+            help="Only look up resources of this subject.",
+        )
+        parser.add_argument(
+            "--on-duplicate",
+            choices=ON_CONFLICT_CHOICES,
+            default=ON_CONFLICT_SKIP,
+            help="How to handle records with an existing resource and timestamp.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            default=5000,
+            type=int,
+            help="The number of records to write in one transaction.",
+        )
+
+    def _get_format(self, options):
+        if options["format"]:
+            return options["format"]
+        if options["file"].endswith((".jsonl", ".ndjson")):
+            return FORMAT_JSONL
+        if options["file"].endswith(".csv"):
+            return FORMAT_CSV
+        raise CommandError("Unable to determine the format, provide --format.")
+
+    def _import(self, stream, reader, options):
+        resolve = ResourceResolver(options["resource_by"], options["subject"])
+        batch_size = options["batch_size"]
+        on_duplicate = options["on_duplicate"]
+
+        processed = 0
+        valid = 0
+        invalid = 0
+        batch = []
+        started = time.perf_counter()
+        for line_number, row in enumerate(reader(stream), start=1):
+            processed += 1
+            try:
+                batch.append(row_to_record(row, resolve))
+            except RowError as err:
+                invalid += 1
+                self.stderr.write("Row {}: {}".format(line_number, err))
+                continue
+
+            if len(batch) >= batch_size:
+                valid += write_records(batch, on_conflict=on_duplicate)
+                batch = []
+                if options["verbosity"] >= 2:
+                    self.stdout.write(
+                        "{} rows ({:.0f} rows/s)".format(
+                            processed, processed / (time.perf_counter() - started)
+                        )
+                    )
+        valid += write_records(batch, on_conflict=on_duplicate)
+
+        return processed, valid, invalid, time.perf_counter() - started
+
+    def handle(self, *args, **options):  # noqa: D102
+        reader = _read_jsonl if self._get_format(options) == FORMAT_JSONL else _read_csv
+        try:
+            if options["file"] == "-":
+                result = self._import(sys.stdin, reader, options)
+            else:
+                with open(options["file"], newline="", encoding="utf-8") as stream:
+                    result = self._import(stream, reader, options)
+        except (csv.Error, IntegrityError, OSError, ValueError) as err:
+            raise CommandError(err)
+
+        processed, valid, invalid, duration = result
+        self.stdout.write(
+            self.style.SUCCESS(
+                "Processed {} rows ({} valid, {} invalid) in {:.1f}s, "
+                "{:.0f} rows/s".format(
+                    processed,
+                    valid,
+                    invalid,
+                    duration,
+                    processed / duration if duration else 0,
+                )
+            )
+        )
@@ -0,0 +1,388 @@
+# SPDX-License-Identifier: MIT
+
+"""Continuously ingest :class:`~consumption.models.record.Record` instances from a stream."""
+
+# Python imports
+import json
+import os
+import queue
+import signal
+import socketserver
+import sys
+import threading
+import time
+
+# Django imports
+from django.core.management.base import BaseCommand, CommandError
+from django.db import (
+    DatabaseError,
+    DataError,
+    IntegrityError,
+    InterfaceError,
+    OperationalError,
+    close_old_connections,
+)
+
+# app imports
+from consumption.bulk import (
+    ON_CONFLICT_CHOICES,
+    ON_CONFLICT_SKIP,
+    ResourceResolver,
+    RowError,
+    row_to_record,
+    write_records,
+)
+
+_EOF = object()
+"""Put into the queue when the input stream is exhausted."""
+
+MAX_RETRY_DELAY = 30
+"""The maximum delay between two attempts to write a batch in seconds."""
+
+
+class _LineHandler(socketserver.StreamRequestHandler):
+    """Put every line of a socket connection into the server's queue."""
+
+    def handle(self):
+        for line in self.rfile:
+            if not self.server.accept(line.decode("utf-8", errors="replace")):
+                break
+
+
+class _LineServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+class Command(BaseCommand):
+    """Ingest a continuous stream of readings, e.g. from a collector daemon.
+
+    The input is provided as JSON lines (see ``consumption_import``) on
+    stdin, through a file or named pipe, or through connections to a Unix
+    socket (``--socket``).
+
+    The readings are buffered and written with
+    :func:`~consumption.bulk.write_records`, when either ``--batch-size``
+    readings are buffered or the oldest buffered reading is
+    ``--flush-interval`` seconds old.
+
+    Lines are passed from the reading thread(s) to the writer through a
+    bounded queue (``--max-pending``). If the database is slow (or
+    unavailable), the queue fills up and the readers block, so the input is
+    not consumed any faster than it is written (back-pressure). Writes, that
+    failed for a transient reason (e.g. a lost connection), are retried with
+    an increasing delay, keeping the buffer. Batches, that are rejected by
+    the database (e.g. duplicates with ``--on-duplicate=error``), are dumped
+    to stderr as JSON lines and ingestion continues.
+
+    ``SIGINT`` and ``SIGTERM`` stop the worker gracefully: no further lines
+    are read, all pending lines (including the ones the readers are
+    currently passing on) are written and the command exits. Lines not yet
+    read remain in the pipe or socket.
+    """
+
+    help = "Continuously ingest records from a stream of JSON lines."
+
+    def add_arguments(self, parser):  # noqa: D102
+        parser.add_argument(
+            "source",
+            nargs="?",
+            default="-",
+            help="The file or named pipe to read, defaults to stdin ('-').",
+        )
+        parser.add_argument(
+            "--socket",
+            help="Listen on this Unix socket instead of reading 'source'.",
+        )
+        parser.add_argument(
+            "--resource-by",
+            choices=["auto", "id", "name"],
+            default="auto",
+            help="How to look up the resource of a line.",
+        )
+        parser.add_argument(
+            "--subject",
+            type=int,
+            help="Only look up resources of this subject.",
+        )
+        parser.add_argument(
+            "--on-duplicate",
+            choices=ON_CONFLICT_CHOICES,
+            default=ON_CONFLICT_SKIP,
+            help="How to handle records with an existing resource and timestamp.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            default=1000,
+            type=int,
+            help="Write, when this number of readings is buffered.",
+        )
+        parser.add_argument(
+            "--flush-interval",
+            default=1.0,
+            type=float,
+            help="Write, when the oldest buffered reading is this many seconds old.",
+        )
+        parser.add_argument(
+            "--max-pending",
+            default=10000,
+            type=int,
+            help="The number of lines to accept before blocking the input.",
+        )
+        parser.add_argument(
+            "--report-interval",
+            default=60.0,
+            type=float,
+            help="Report the throughput every this many seconds, 0 to disable.",
+        )
+
+    def _start_reader(self, options):
+        """Start reading the input in a (daemon) thread."""
+        if options["socket"]:
+            server = _LineServer(options["socket"], _LineHandler)
+            server.accept = self._accept
+            self._server = server
+            target = server.serve_forever
+        else:
+            if options["source"] == "-":
+                stream = sys.stdin
+            else:
+                stream = open(options["source"], encoding="utf-8")
+
+            def target():
+                try:
+                    for line in stream:
+                        if not self._accept(line):
+                            break
+                finally:
+                    self._accept(_EOF)
+
+        threading.Thread(target=target, daemon=True).start()
+
+    def _accept(self, line):
+        """Pass a line, that was read, to the writer (called by the readers).
+
+        The line is put into the queue, blocking while it is full. Once the
+        writer has drained the queue for the last time, lines are dumped to
+        stderr instead, so a line that was read is never lost silently.
+
+        Returns ``False``, if the reader should stop reading.
+        """
+        with self._lock:
+            if self._closed:
+                if line is not _EOF:
+                    self.stderr.write("Not ingested: {}".format(line.rstrip("\n")))
+                return False
+            self._passing += 1
+        try:
+            self.lines.put(line)
+        finally:
+            with self._lock:
+                self._passing -= 1
+        return not self.stop.is_set()
+
+    def _drain(self):
+        """Return all pending lines and close the queue, while stopping.
+
+        Lines are collected until the queue is empty and no reader is
+        passing on a line, so a reader blocked by the full queue does not
+        lose the line it holds.
+        """
+        pending = []
+        while True:
+            try:
+                pending.append(self.lines.get(timeout=0.05))
+                continue
+            except queue.Empty:
+                pass
+            with self._lock:
+                if not self._passing and self.lines.empty():
+                    self._closed = True
+                    return pending
+
+    def _request_stop(self, signum, frame):
+        self.stop.set()
+
+    def _dump(self, batch):
+        """Write the readings of ``batch`` to stderr, as JSON lines."""
+        for record in batch:
+            self.stderr.write(
+                json.dumps(
+                    {
+                        "resource": record.resource_id,
+                        "timestamp": record.timestamp.isoformat(),
+                        "reading": record.reading,
+                    }
+                )
+            )
+
+    def _flush(self, batch, options):
+        """Write the batch, retrying transient errors until it succeeds.
+
+        Batches rejected by the database (``IntegrityError`` or
+        ``DataError``) are not retried, as they would fail again, but dumped
+        to stderr. While stopping, the batch is given up after a few
+        attempts.
+        """
+        attempt = 0
+        while True:
+            close_old_connections()
+            started = time.perf_counter()
+            try:
+                write_records(batch, on_conflict=options["on_duplicate"])
+            except (DataError, IntegrityError) as err:
+                self.stats["rejected"] += len(batch)
+                self.stderr.write(
+                    "Rejected {} readings ({}), dumping them:".format(len(batch), err)
+                )
+                self._dump(batch)
+                return
+            except (InterfaceError, OperationalError) as err:
+                attempt += 1
+                if self.stop.is_set() and attempt >= 3:
+                    raise
+                delay = min(2**attempt, MAX_RETRY_DELAY)
+                self.stderr.write(
+                    "Writing {} readings failed ({}), retrying in {}s".format(
+                        len(batch), err, delay
+                    )
+                )
+                time.sleep(delay)
+                continue
+
+            latency = time.perf_counter() - started
+            self.stats["flushes"] += 1
+            self.stats["written"] += len(batch)
+            self.stats["flush_time"] += latency
+            self.stats["max_flush"] = max(self.stats["max_flush"], latency)
+            if self.verbosity >= 2:
+                self.stdout.write(
+                    "Wrote {} readings in {:.1f}ms".format(len(batch), latency * 1000)
+                )
+            return
+
+    def _report(self, started, final=False):
+        stats = self.stats
+        duration = time.perf_counter() - started
+        message = (
+            "{} readings written ({} invalid, {} rejected) in {:.1f}s, "
+            "{:.0f} readings/s, {} flushes, flush latency {:.1f}ms avg, "
+            "{:.1f}ms max".format(
+                stats["written"],
+                stats["invalid"],
+                stats["rejected"],
+                duration,
+                stats["written"] / duration if duration else 0,
+                stats["flushes"],
+                (
+                    stats["flush_time"] / stats["flushes"] * 1000
+                    if stats["flushes"]
+                    else 0
+                ),
+                stats["max_flush"] * 1000,
+            )
+        )
+        self.stdout.write(self.style.SUCCESS(message) if final else message)
+
+    def _parse(self, line, resolve):
+        line = line.strip()
+        if not line:
+            return None
+        try:
+            row = json.loads(line)
+        except ValueError as err:
+            row = err
+        try:
+            return row_to_record(row, resolve)
+        except RowError as err:
+            self.stats["invalid"] += 1
+            self.stderr.write("Invalid line ({}): {}".format(err, line[:200]))
+            return None
+
+    def handle(self, *args, **options):  # noqa: D102
+        if options["batch_size"] < 1 or options["flush_interval"] <= 0:
+            raise CommandError("--batch-size and --flush-interval must be positive.")
+
+        self.verbosity = options["verbosity"]
+        self.lines = queue.Queue(maxsize=options["max_pending"])
+        self.stop = threading.Event()
+        self.stats = {
+            "written": 0,
+            "invalid": 0,
+            "rejected": 0,
+            "flushes": 0,
+            "flush_time": 0.0,
+            "max_flush": 0.0,
+        }
+        self._server = None
+        self._lock = threading.Lock()
+        self._passing = 0
+        self._closed = False
+        resolve = ResourceResolver(options["resource_by"], options["subject"])
+
+        signal.signal(signal.SIGINT, self._request_stop)
+        signal.signal(signal.SIGTERM, self._request_stop)
+        try:
+            self._start_reader(options)
+        except OSError as err:
+            raise CommandError(err)
+
+        started = last_report = time.perf_counter()
+        flush_interval = options["flush_interval"]
+        report_interval = options["report_interval"]
+        batch = []
+        oldest = None
+        exhausted = False
+        while not exhausted:
+            now = time.perf_counter()
+            timeout = (
+                flush_interval if oldest is None else oldest + flush_interval - now
+            )
+            try:
+                line = self.lines.get(timeout=max(timeout, 0))
+            except queue.Empty:
+                line = None
+
+            if self.stop.is_set():
+                # drain the lines, that were already accepted
+                pending = [line] if line is not None else []
+                lines, exhausted = pending + self._drain(), True
+            else:
+                lines = [line] if line is not None else []
+
+            for line in lines:
+                if line is _EOF:
+                    exhausted = True
+                    continue
+                record = self._parse(line, resolve)
+                if record is not None:
+                    batch.append(record)
+                    if oldest is None:
+                        oldest = time.perf_counter()
+
+            now = time.perf_counter()
+            if batch and (
+                exhausted
+                or len(batch) >= options["batch_size"]
+                or now - oldest >= flush_interval
+            ):
+                try:
+                    self._flush(batch, options)
+                except DatabaseError as err:
+                    self._dump(batch)
+                    raise CommandError(
+                        "Unable to write {} readings, dumped to stderr: {}".format(
+                            len(batch), err
+                        )
+                    )
+                batch = []
+                oldest = None
+
+            if report_interval and now - last_report >= report_interval:
+                self._report(started)
+                last_report = now
+
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            os.unlink(options["socket"])
+        self._report(started, final=True)
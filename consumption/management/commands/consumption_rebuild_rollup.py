@@ -0,0 +1,62 @@
+# SPDX-License-Identifier: MIT
+
+"""Rebuild the :class:`~consumption.models.rollup.DailyRollup` table from scratch."""
+
+# Python imports
+import time
+
+# Django imports
+from django.core.management.base import BaseCommand
+
+# app imports
+from consumption.models import DailyRollup, Resource
+
+
+class Command(BaseCommand):
+    """Rebuild the daily rollup of all (or the given) resources.
+
+    The resources are processed in chunks, each chunk in its own transaction,
+    so the command may be run on a live system.
+    """
+
+    help = "Rebuild the daily rollup of records from scratch."
+
+    def add_arguments(self, parser):  # noqa: D102
+        parser.add_argument(
+            "resource_ids",
+            nargs="*",
+            type=int,
+            help="Only rebuild the rollup of these resources.",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            default=10,
+            type=int,
+            help="The number of resources to process in one transaction.",
+        )
+
+    def handle(self, *args, **options):  # noqa: D102
+        resource_ids = Resource.objects.order_by("id").values_list("id", flat=True)
+        if options["resource_ids"]:
+            resource_ids = resource_ids.filter(id__in=options["resource_ids"])
+        resource_ids = list(resource_ids)
+
+        chunk_size = options["chunk_size"]
+        started = time.perf_counter()
+        total = 0
+        for offset in range(0, len(resource_ids), chunk_size):
+            end = offset + chunk_size
+            chunk = resource_ids[offset:end]
+            total += DailyRollup.objects.rebuild(chunk)
+            if options["verbosity"] >= 2:
+                self.stdout.write(
+                    "Rebuilt resources {}-{}".format(offset + 1, offset + len(chunk))
+                )
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                "Rebuilt {} rollup rows of {} resources in {:.1f}s".format(
+                    total, len(resource_ids), time.perf_counter() - started
+                )
+            )
+        )
@@ -0,0 +1,67 @@
+# SPDX-License-Identifier: MIT
+
+"""Recompute the denormalized summary of records of :class:`~consumption.models.resource.Resource`."""
+
+# Python imports
+import time
+
+# Django imports
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+# app imports
+from consumption.models import Resource
+
+
+class Command(BaseCommand):
+    """Repair the summary of records of all (or the given) resources.
+
+    The summary is maintained whenever records are modified by the app, so
+    this is only required if records were modified bypassing the app, e.g.
+    with raw SQL. The records are counted exactly, not from the rollup.
+
+    The resources are processed in chunks, each chunk in its own transaction,
+    so the command may be run on a live system.
+    """
+
+    help = "Recompute the summary of records of resources."
+
+    def add_arguments(self, parser):  # noqa: D102
+        parser.add_argument(
+            "resource_ids",
+            nargs="*",
+            type=int,
+            help="Only refresh the summary of these resources.",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            default=100,
+            type=int,
+            help="The number of resources to process in one transaction.",
+        )
+
+    def handle(self, *args, **options):  # noqa: D102
+        resource_ids = Resource.objects.order_by("id").values_list("id", flat=True)
+        if options["resource_ids"]:
+            resource_ids = resource_ids.filter(id__in=options["resource_ids"])
+        resource_ids = list(resource_ids)
+
+        chunk_size = options["chunk_size"]
+        started = time.perf_counter()
+        for offset in range(0, len(resource_ids), chunk_size):
+            end = offset + chunk_size
+            chunk = resource_ids[offset:end]
+            with transaction.atomic():
+                Resource.objects.filter(id__in=chunk).refresh_summary(exact=True)
+            if options["verbosity"] >= 2:
+                self.stdout.write(
+                    "Refreshed resources {}-{}".format(offset + 1, offset + len(chunk))
+                )
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                "Refreshed the summary of {} resources in {:.1f}s".format(
+                    len(resource_ids), time.perf_counter() - started
+                )
+            )
+        )
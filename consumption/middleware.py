@@ -0,0 +1,241 @@
+# SPDX-License-Identifier: MIT
+
+"""Provide (opt-in) instrumentation of requests.
+
+:class:`InstrumentationMiddleware` measures the wall time and the database
+queries of every request and reports them through the app's logger, e.g.::
+
+    GET /consumption/resource/1/ (consumption:resource-detail) 200: 12.4ms,
+    3 queries in 1.9ms, 0 duplicates
+
+Requests with duplicate queries (the same SQL executed more than once, usually
+once per object because of a missing
+``select_related()``/``prefetch_related()``) are logged with level
+``WARNING``, all others with ``INFO``. The metrics are provided as
+``extra={"instrumentation": {...}}`` to the log record, so they may be
+processed by structured log handlers.
+
+The middleware is activated by adding it to the project's ``MIDDLEWARE``
+setting, as early as possible::
+
+    MIDDLEWARE = [
+        "consumption.middleware.InstrumentationMiddleware",
+        ...
+    ]
+
+The following settings are supported:
+
+    - ``CONSUMPTION_INSTRUMENTATION_SERVER_TIMING``: add the metrics as
+      ``Server-Timing`` header to the response, so they are shown in the
+      browser's developer tools, defaults to ``False``.
+
+The queries are intercepted with
+:djangodoc:`database instrumentation <topics/db/instrumentation/>` instead of
+``DEBUG``'s query log, so only counters (and the distinct SQL statements) are
+kept. The execute wrapper is installed once per connection and records the
+queries into the metrics of the current context (a
+:class:`~contextvars.ContextVar`), so the queries of an asynchronous request,
+that are run by ``sync_to_async()`` in other threads, are included. The
+middleware supports both, synchronous and asynchronous requests.
+The body of streaming responses (e.g. exports) is generated after the
+middleware returned, so it is not included in the measurement.
+"""
+
+# Python imports
+import asyncio
+import logging
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+# Django imports
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+# external imports
+from asgiref.sync import sync_to_async
+
+# app imports
+from consumption.apps import logger
+
+
+class QueryMetrics:
+    """Count and time the queries passed through it, as database execute wrapper.
+
+    See :func:`instrumented` for usage.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.duplicates = 0
+        self._seen = set()
+
+    def __call__(self, execute, sql, params, many, context):  # noqa: D102
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - started
+            self.count += 1
+            if sql in self._seen:
+                self.duplicates += 1
+            else:
+                self._seen.add(sql)
+
+
+_current_metrics = ContextVar("consumption_query_metrics", default=None)
+"""The :class:`QueryMetrics` of the current context, if it is instrumented."""
+
+
+def _execute_wrapper(execute, sql, params, many, context):
+    """Pass the query to the :class:`QueryMetrics` of the current context."""
+    metrics = _current_metrics.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    return metrics(execute, sql, params, many, context)
+
+
+def _install(connection):
+    """Install :func:`_execute_wrapper` on ``connection``, if not done yet.
+
+    The wrapper is inserted as the innermost one, so it does not interfere
+    with the (stacked) wrappers of ``connection.execute_wrapper()``.
+    """
+    if _execute_wrapper not in connection.execute_wrappers:
+        connection.execute_wrappers.insert(0, _execute_wrapper)
+
+
+def install():
+    """Install the execute wrapper on the connections of the current thread."""
+    for connection in connections.all():
+        _install(connection)
+
+
+@receiver(connection_created, dispatch_uid="consumption_instrumentation")
+def _install_on_connect(sender, connection, **kwargs):
+    """Install the execute wrapper on new connections of any thread."""
+    _install(connection)
+
+
+@contextmanager
+def instrumented():
+    """Measure the queries on all database connections within the block.
+
+    This includes the queries of other threads, that run within a copy of
+    the current context (e.g. by ``sync_to_async()``), given that the
+    execute wrapper is installed on their connections, see :func:`install`.
+
+    Yields
+    ------
+    QueryMetrics
+        Provides ``count``, ``duration`` (in seconds) and ``duplicates`` of
+        the queries, after the block is left.
+    """
+    install()
+    metrics = QueryMetrics()
+    token = _current_metrics.set(metrics)
+    try:
+        yield metrics
+    finally:
+        _current_metrics.reset(token)
+
+
+class InstrumentationMiddleware:
+    """Report the wall time and the database queries of every request.
+
+    See :mod:`consumption.middleware` for details.
+    """
+
+    sync_capable = True
+    """The middleware supports synchronous requests."""
+
+    async_capable = True
+    """The middleware supports asynchronous requests."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.server_timing = getattr(
+            settings, "CONSUMPTION_INSTRUMENTATION_SERVER_TIMING", False
+        )
+        self.async_mode = asyncio.iscoroutinefunction(get_response)
+        if self.async_mode:
+            # mark the middleware as coroutine function, like Django's
+            # ``MiddlewareMixin``, so it is called in async mode
+            self._is_coroutine = asyncio.coroutines._is_coroutine
+
+    def __call__(self, request):  # noqa: D102
+        if self.async_mode:
+            return self.__acall__(request)
+        started = time.perf_counter()
+        with instrumented() as queries:
+            response = self.get_response(request)
+        return self.report(request, response, started, queries)
+
+    async def __acall__(self, request):
+        """Handle ``request`` in async mode.
+
+        The synchronous parts of the request (e.g. the views) are run in the
+        thread of ``sync_to_async()``, so the execute wrapper is installed on
+        its connections first.
+        """
+        await sync_to_async(install)()
+        started = time.perf_counter()
+        with instrumented() as queries:
+            response = await self.get_response(request)
+        return self.report(request, response, started, queries)
+
+    def report(self, request, response, started, queries):
+        """Log the metrics of ``request`` and return ``response``.
+
+        Parameters
+        ----------
+        request : django.http.HttpRequest
+            The request.
+        response : django.http.HttpResponse
+            The response to ``request``.
+        started : float
+            The start of the request, as given by :func:`time.perf_counter`.
+        queries : QueryMetrics
+            The queries of the request.
+        """
+        duration = time.perf_counter() - started
+
+        view = getattr(request.resolver_match, "view_name", None)
+        metrics = {
+            "method": request.method,
+            "path": request.path,
+            "view": view,
+            "status": response.status_code,
+            "duration_ms": round(duration * 1000, 3),
+            "queries": queries.count,
+            "queries_ms": round(queries.duration * 1000, 3),
+            "duplicates": queries.duplicates,
+        }
+        logger.log(
+            logging.WARNING if queries.duplicates else logging.INFO,
+            "%s %s (%s) %s: %.1fms, %d queries in %.1fms, %d duplicates",
+            request.method,
+            request.path,
+            view,
+            response.status_code,
+            metrics["duration_ms"],
+            queries.count,
+            metrics["queries_ms"],
+            queries.duplicates,
+            extra={"instrumentation": metrics},
+        )
+
+        if self.server_timing:
+            response["Server-Timing"] = (
+                'total;dur={:.1f}, db;dur={:.1f};desc="{} queries, '
+                '{} duplicates"'.format(
+                    metrics["duration_ms"],
+                    metrics["queries_ms"],
+                    queries.count,
+                    queries.duplicates,
+                )
+            )
+        return response
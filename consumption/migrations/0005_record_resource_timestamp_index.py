@@ -0,0 +1,17 @@
+# Generated by Django 4.1.13 on 2026-10-17 20:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('consumption', '0004_alter_record_options'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='record',
+            index=models.Index(fields=['resource', 'timestamp'], name='consumption_record_res_ts_idx'),
+        ),
+    ]
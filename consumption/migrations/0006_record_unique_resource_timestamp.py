@@ -0,0 +1,39 @@
+# Generated by Django 4.1.13 on 2026-10-17 20:35
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def check_duplicate_records(apps, schema_editor):
+    """Abort with a meaningful message if existing records violate the constraint.
+
+    The constraint is provided in a dedicated migration, so that existing
+    installations may clean up their data before applying it.
+    """
+    Record = apps.get_model('consumption', 'Record')
+    duplicates = (
+        Record.objects.values('resource', 'timestamp')
+        .annotate(num=Count('id'))
+        .filter(num__gt=1)
+        .count()
+    )
+    if duplicates:
+        raise RuntimeError(
+            '{} (resource, timestamp) combinations have more than one Record. '
+            'Remove the duplicates before applying this migration.'.format(duplicates)
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('consumption', '0005_record_resource_timestamp_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(check_duplicate_records, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='record',
+            constraint=models.UniqueConstraint(fields=('resource', 'timestamp'), name='consumption_record_unique_res_ts'),
+        ),
+    ]
@@ -0,0 +1,120 @@
+# Generated by Django 4.1.13 on 2026-10-17 20:37
+
+from django.db import migrations, models
+from django.db.models import Count, Max, Min
+from django.db.models.functions import TruncDate
+import django.db.models.deletion
+
+POPULATE_CHUNK_SIZE = 10
+"""The number of resources to aggregate the records of with one query."""
+
+
+def populate_rollup(apps, schema_editor):
+    """Aggregate the existing records into the rollup, in chunks of resources.
+
+    This is the equivalent of the ``consumption_rebuild_rollup`` management
+    command, which can not be used here, as it relies on the current models.
+    """
+    DailyRollup = apps.get_model("consumption", "DailyRollup")
+    Record = apps.get_model("consumption", "Record")
+    Resource = apps.get_model("consumption", "Resource")
+
+    resource_ids = list(Resource.objects.order_by("id").values_list("id", flat=True))
+    for offset in range(0, len(resource_ids), POPULATE_CHUNK_SIZE):
+        end = offset + POPULATE_CHUNK_SIZE
+        aggregated = (
+            Record.objects.filter(resource_id__in=resource_ids[offset:end])
+            .order_by()
+            .annotate(day=TruncDate("timestamp"))
+            .values("resource", "day")
+            .annotate(
+                reading_min=Min("reading"),
+                reading_max=Max("reading"),
+                record_count=Count("id"),
+            )
+        )
+        DailyRollup.objects.bulk_create(
+            (
+                DailyRollup(
+                    resource_id=values["resource"],
+                    day=values["day"],
+                    reading_min=values["reading_min"],
+                    reading_max=values["reading_max"],
+                    record_count=values["record_count"],
+                )
+                for values in aggregated.iterator()
+            ),
+            batch_size=1000,
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("consumption", "0006_record_unique_resource_timestamp"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="DailyRollup",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "day",
+                    models.DateField(
+                        help_text="The day this rollup summarizes", verbose_name="Day"
+                    ),
+                ),
+                (
+                    "reading_min",
+                    models.FloatField(
+                        help_text="The lowest reading of the day",
+                        verbose_name="Minimum Reading",
+                    ),
+                ),
+                (
+                    "reading_max",
+                    models.FloatField(
+                        help_text="The highest reading of the day",
+                        verbose_name="Maximum Reading",
+                    ),
+                ),
+                (
+                    "record_count",
+                    models.PositiveIntegerField(
+                        help_text="The number of records of the day",
+                        verbose_name="Number of Records",
+                    ),
+                ),
+                (
+                    "resource",
+                    models.ForeignKey(
+                        help_text="The resource this rollup summarizes",
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to="consumption.resource",
+                        verbose_name="Resource Instance",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Daily Rollup",
+                "verbose_name_plural": "Daily Rollups",
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="dailyrollup",
+            constraint=models.UniqueConstraint(
+                fields=("resource", "day"),
+                name="consumption_dailyrollup_unique_res_day",
+            ),
+        ),
+        migrations.RunPython(populate_rollup, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.1.13 on 2026-10-17 20:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("consumption", "0007_dailyrollup"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="record",
+            index=models.Index(fields=["timestamp"], name="consumption_record_ts_idx"),
+        ),
+    ]
@@ -0,0 +1,61 @@
+# Generated by Django 4.1.13 on 2026-10-17 20:52
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def populate_summary(apps, schema_editor):
+    """Compute the summary of records of all existing resources."""
+    Record = apps.get_model("consumption", "Record")
+    Resource = apps.get_model("consumption", "Resource")
+
+    records = Record.objects.filter(resource=OuterRef("pk"))
+    first = records.order_by("timestamp")
+    last = records.order_by("-timestamp")
+    count = records.order_by().values("resource").annotate(count=Count("id"))
+    Resource.objects.update(
+        first_timestamp=Subquery(first.values("timestamp")[:1]),
+        last_timestamp=Subquery(last.values("timestamp")[:1]),
+        last_reading=Subquery(last.values("reading")[:1]),
+        record_count=Coalesce(Subquery(count.values("count")), 0),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("consumption", "0008_record_timestamp_index"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="resource",
+            name="first_timestamp",
+            field=models.DateTimeField(
+                editable=False, null=True, verbose_name="First Record"
+            ),
+        ),
+        migrations.AddField(
+            model_name="resource",
+            name="last_reading",
+            field=models.FloatField(
+                editable=False, null=True, verbose_name="Latest Reading"
+            ),
+        ),
+        migrations.AddField(
+            model_name="resource",
+            name="last_timestamp",
+            field=models.DateTimeField(
+                editable=False, null=True, verbose_name="Latest Record"
+            ),
+        ),
+        migrations.AddField(
+            model_name="resource",
+            name="record_count",
+            field=models.PositiveIntegerField(
+                default=0, editable=False, verbose_name="Number of Records"
+            ),
+        ),
+        migrations.RunPython(populate_summary, migrations.RunPython.noop),
+    ]
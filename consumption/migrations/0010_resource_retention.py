@@ -0,0 +1,33 @@
+# Generated by Django 4.1.13 on 2026-10-17 20:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("consumption", "0009_resource_summary"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="resource",
+            name="retention_hourly_days",
+            field=models.PositiveIntegerField(
+                blank=True,
+                help_text="Keep hourly resolution up to this number of days, then compact records to daily resolution. Leave empty to keep hourly resolution.",
+                null=True,
+                verbose_name="Keep hourly resolution (days)",
+            ),
+        ),
+        migrations.AddField(
+            model_name="resource",
+            name="retention_raw_days",
+            field=models.PositiveIntegerField(
+                blank=True,
+                help_text="Keep all records for this number of days, then compact them. Leave empty to keep all records.",
+                null=True,
+                verbose_name="Keep raw records (days)",
+            ),
+        ),
+    ]
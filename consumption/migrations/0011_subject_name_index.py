@@ -0,0 +1,17 @@
+# Generated by Django 4.1.13 on 2026-10-17 21:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("consumption", "0010_resource_retention"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="subject",
+            index=models.Index(fields=["name"], name="consumption_subject_name_idx"),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.1.13 on 2026-10-17 21:15
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("consumption", "0011_subject_name_index"),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="record",
+            name="consumption_record_res_ts_idx",
+        ),
+    ]
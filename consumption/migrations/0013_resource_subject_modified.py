@@ -0,0 +1,23 @@
+# Generated by Django 4.1.13 on 2026-10-17 21:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("consumption", "0012_remove_record_resource_timestamp_index"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="resource",
+            name="modified",
+            field=models.DateTimeField(auto_now=True, verbose_name="Last Modified"),
+        ),
+        migrations.AddField(
+            model_name="subject",
+            name="modified",
+            field=models.DateTimeField(auto_now=True, verbose_name="Last Modified"),
+        ),
+    ]
@@ -9,4 +9,5 @@ are enhanced/augmented with model-related stuff like managers and model forms.
 # local imports
 from .record import Record  # noqa: F401
 from .resource import Resource  # noqa: F401
+from .rollup import DailyRollup  # noqa: F401
 from .subject import Subject  # noqa: F401
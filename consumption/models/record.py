@@ -5,11 +5,104 @@
 # Django imports
 from django import forms
 from django.db import models
+from django.db.models import F, Max, Window
+from django.db.models.functions import Lag, Trunc
 from django.urls import reverse
 from django.utils.translation import gettext_lazy as _
 
 # app imports
-from consumption.models.resource import Resource
+from consumption.models.resource import Resource, ResourceChoiceField
+
+CONSUMPTION_PERIODS = ("hour", "day", "week", "month", "quarter", "year")
+"""The periods that are supported for aggregating consumption."""
+
+
+def consumption_per_bucket(queryset, bucket, reading):
+    """Aggregate cumulative readings into per-bucket consumption.
+
+    This is the generic implementation of
+    :meth:`RecordQuerySet.consumption_by() <consumption.models.record.RecordQuerySet.consumption_by>`
+    and may be applied to any queryset that provides cumulative readings per
+    ``resource``.
+
+    Parameters
+    ----------
+    queryset : django.db.models.QuerySet
+        The queryset to aggregate.
+    bucket : django.db.models.Expression
+        The expression determining the bucket of a row, e.g. a ``Trunc()``
+        expression on a timestamp.
+    reading : str
+        The name of the field providing the cumulative reading.
+
+    Returns
+    -------
+    django.db.models.QuerySet
+        A ``values()`` queryset providing ``resource``, ``period``,
+        ``reading`` (the highest reading of the bucket) and ``consumption``.
+    """
+    return (
+        queryset.order_by()
+        .annotate(period=bucket)
+        .values("resource", "period")
+        .annotate(last_reading=Max(reading))
+        .annotate(
+            consumption=F("last_reading")
+            - Window(
+                expression=Lag("last_reading"),
+                partition_by=[F("resource")],
+                order_by=F("period").asc(),
+            )
+        )
+        .values("resource", "period", "consumption", reading=F("last_reading"))
+        .order_by("resource", "period")
+    )
+
+
+class RecordQuerySet(models.QuerySet):
+    """Provide app-specific queries for :class:`~consumption.models.record.Record`."""
+
+    def consumption_by(self, period, tz=None):
+        """Calculate the consumption per ``period``, grouped by resource.
+
+        As :attr:`Record.reading <consumption.models.record.Record.reading>`
+        provides *cumulative* meter values, the consumption of a period is the
+        difference between the highest reading of the period and the highest
+        reading of the preceding period (that actually has records). The
+        calculation is performed completely inside the database, using
+        ``Trunc()`` and the ``Lag()`` window function, in one single query.
+
+        The consumption of the first period of every resource is ``None``, as
+        there is no preceding reading. To get the consumption for a given
+        range of periods, include the period *before* the range while
+        filtering the queryset.
+
+        Parameters
+        ----------
+        period : str
+            One of :data:`~consumption.models.record.CONSUMPTION_PERIODS`.
+        tz : datetime.tzinfo
+            The timezone to determine the period boundaries in. Only effective
+            if Django's ``USE_TZ`` is enabled, defaults to the current timezone.
+
+        Returns
+        -------
+        django.db.models.QuerySet
+            A ``values()`` queryset, each item providing ``resource`` (the
+            ``id`` of the resource), ``period`` (the start of the period),
+            ``reading`` and ``consumption``.
+
+        Raises
+        ------
+        ValueError
+            If ``period`` is not supported.
+        """
+        if period not in CONSUMPTION_PERIODS:
+            raise ValueError("Unsupported period: {}".format(period))
+
+        return consumption_per_bucket(
+            self, Trunc("timestamp", period, tzinfo=tz), "reading"
+        )
 
 
 class Record(models.Model):
@@ -35,11 +128,32 @@ class Record(models.Model):
     )
     """Date and Time of the record."""
 
+    objects = RecordQuerySet.as_manager()
+
     class Meta:  # noqa: D106
         app_label = "consumption"
         verbose_name = _("Record")
         verbose_name_plural = _("Records")
         ordering = ["-timestamp"]
+        indexes = [
+            # Supports the default ordering and date-based filtering across
+            # all resources, e.g. in the admin's changelist.
+            models.Index(fields=["timestamp"], name="consumption_record_ts_idx"),
+        ]
+        constraints = [
+            # A resource can not have two different readings at the very
+            # same time. This enables bulk operations to skip (or update)
+            # existing records instead of doing check-then-insert.
+            # The constraint is added in a dedicated migration, so existing
+            # installations may clean up duplicates before applying it.
+            # Its index also supports the most common access pattern: the
+            # records of one resource, ordered by (or filtered on) their
+            # timestamp.
+            models.UniqueConstraint(
+                fields=["resource", "timestamp"],
+                name="consumption_record_unique_res_ts",
+            ),
+        ]
 
     def __str__(self):  # noqa: D105
         return "{}: {} ({}, {})".format(
@@ -55,7 +169,12 @@ class Record(models.Model):
 
 
 class RecordForm(forms.ModelForm):
-    """Get and validate input for creating and updating ``Record`` instances."""
+    """Get and validate input for creating and updating ``Record`` instances.
+
+    The resource is selected with
+    :class:`~consumption.models.resource.ResourceChoiceField`, which provides
+    its (cached) choices grouped by subject without additional queries.
+    """
 
     template_name = "consumption/forms/generic.html"
     """This template will be used to render the form.
@@ -67,3 +186,115 @@ class RecordForm(forms.ModelForm):
     class Meta:  # noqa: D106
         model = Record
         fields = "__all__"
+        field_classes = {"resource": ResourceChoiceField}
+
+
+class RecordBulkTimestampForm(forms.Form):
+    """Get and validate the shared timestamp of a bulk entry of ``Record`` instances."""
+
+    template_name = "consumption/forms/generic.html"
+    """This template will be used to render the form."""
+
+    timestamp = forms.DateTimeField(
+        help_text=_("Date and Time of all records"),
+        label=_("Date/Time of the records"),
+    )
+
+
+class RecordBulkEntryForm(RecordForm):
+    """Get and validate the reading of one resource during a bulk entry.
+
+    The resource is identified by its ``id`` in a hidden field and resolved
+    from the resources of the subject, as provided by the formset (see
+    :class:`~consumption.models.record.BaseRecordBulkEntryFormSet`), so a
+    reading is never assigned to another resource, even if the resources of
+    the subject were modified in the meantime. The timestamp is provided by
+    :class:`~consumption.models.record.RecordBulkTimestampForm`, so no
+    queries are required to validate a single form.
+
+    As these forms are *extra* forms of the formset, forms without a reading
+    are not validated at all and simply skipped.
+    """
+
+    resource = forms.IntegerField(widget=forms.HiddenInput)
+    """The ``id`` of the resource of the reading."""
+
+    class Meta(RecordForm.Meta):  # noqa: D106
+        fields = ["reading"]
+
+    def __init__(self, *args, resources, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.resources = resources
+        try:
+            self.resource = resources.get(int(self["resource"].value()))
+        except (TypeError, ValueError):
+            self.resource = None
+        if self.resource is not None:
+            self.fields["reading"].label = "{} ({})".format(
+                self.resource.name, self.resource.unit
+            )
+
+    def has_changed(self):
+        """Only a reading makes the form changed, the resource is always provided."""
+        return "reading" in self.changed_data
+
+    def clean_resource(self):
+        """Resolve the resource from the resources of the subject."""
+        resource = self.resources.get(self.cleaned_data["resource"])
+        if resource is None:
+            raise forms.ValidationError(
+                _("The resource is not available anymore, reload the page."),
+                code="invalid_resource",
+            )
+        self.instance.resource = resource
+        return resource.pk
+
+
+class BaseRecordBulkEntryFormSet(forms.BaseFormSet):
+    """Provide one :class:`~consumption.models.record.RecordBulkEntryForm` per resource."""
+
+    def __init__(self, *args, resources, **kwargs):
+        self.resources = list(resources)
+        super().__init__(*args, **kwargs)
+
+    def total_form_count(self):
+        """Provide one form per resource, or one per submitted form."""
+        if self.is_bound:
+            return super().total_form_count()
+        return len(self.resources)
+
+    def get_form_kwargs(self, index):
+        """Provide the resources of the subject and the resource of the form."""
+        kwargs = super().get_form_kwargs(index)
+        kwargs["resources"] = {resource.pk: resource for resource in self.resources}
+        if not self.is_bound and index is not None:
+            kwargs["initial"] = {"resource": self.resources[index].pk}
+        return kwargs
+
+    def clean(self):
+        """Require at least one reading, at most one per resource."""
+        super().clean()
+        if not any(form.has_changed() for form in self.forms):
+            raise forms.ValidationError(_("Provide at least one reading."))
+        resource_ids = [
+            form.instance.resource_id
+            for form in self.forms
+            if form.cleaned_data.get("reading") is not None
+        ]
+        if len(resource_ids) != len(set(resource_ids)):
+            raise forms.ValidationError(_("Provide one reading per resource."))
+
+    def get_records(self, timestamp):
+        """Return unsaved ``Record`` instances for all forms with a reading."""
+        records = []
+        for form in self.forms:
+            if form.cleaned_data.get("reading") is not None:
+                form.instance.timestamp = timestamp
+                records.append(form.instance)
+        return records
+
+
+RecordBulkEntryFormSet = forms.formset_factory(
+    RecordBulkEntryForm, formset=BaseRecordBulkEntryFormSet, extra=0
+)
+"""The formset to enter the readings of several resources at once."""
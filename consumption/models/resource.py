@@ -4,14 +4,100 @@
 
 # Django imports
 from django import forms
+from django.core.exceptions import ValidationError
 from django.db import models
+from django.db.models import Count, F, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
 from django.urls import reverse
+from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 
 # app imports
+from consumption.cache import get_or_compute
 from consumption.models.subject import Subject
 
 
+class ResourceQuerySet(models.QuerySet):
+    """Provide app-specific queries for :class:`~consumption.models.resource.Resource`."""
+
+    def with_summary(self, since):
+        """Annotate every resource with its consumption since ``since``.
+
+        The consumption is the difference between the latest reading and the
+        last reading before ``since`` (or the first reading after ``since``,
+        if there is no previous reading). It is provided by correlated
+        subqueries, backed by the ``(resource, timestamp)`` index of
+        :class:`~consumption.models.record.Record`, so the number of queries
+        does not depend on the number of resources.
+
+        The other values of the summary are fields of
+        :class:`~consumption.models.resource.Resource`, see
+        :meth:`refresh_summary`.
+        """
+        # app imports
+        from consumption.models.record import Record
+
+        records = Record.objects.filter(resource=OuterRef("pk"))
+        before = records.filter(timestamp__lt=since).order_by("-timestamp")
+        after = records.filter(timestamp__gte=since).order_by("timestamp")
+
+        return self.annotate(
+            consumption=F("last_reading")
+            - Coalesce(
+                Subquery(before.values("reading")[:1]),
+                Subquery(after.values("reading")[:1]),
+            ),
+        )
+
+    def refresh_summary(self, exact=False):
+        """Recompute the summary of records of the resources.
+
+        The summary (``first_timestamp``, ``last_timestamp``,
+        ``last_reading`` and ``record_count``) is updated with one single
+        ``UPDATE`` of correlated subqueries, which also sets ``modified``. The timestamps and the reading
+        are determined with the ``(resource, timestamp)`` index of
+        :class:`~consumption.models.record.Record`.
+
+        Parameters
+        ----------
+        exact : bool
+            Count the records themselves. By default, the (cheaper) sum of
+            the :class:`~consumption.models.rollup.DailyRollup` is used. The
+            rollup is complete once the migrations are applied
+            (``0007_dailyrollup`` populates it) and is maintained for every
+            modification by the app.
+
+        Returns
+        -------
+        int
+            The number of updated resources.
+        """
+        # app imports
+        from consumption.models.record import Record
+        from consumption.models.rollup import DailyRollup
+
+        records = Record.objects.filter(resource=OuterRef("pk"))
+        first = records.order_by("timestamp")
+        last = records.order_by("-timestamp")
+        if exact:
+            count = records.order_by().values("resource").annotate(count=Count("id"))
+        else:
+            count = (
+                DailyRollup.objects.filter(resource=OuterRef("pk"))
+                .order_by()
+                .values("resource")
+                .annotate(count=Sum("record_count"))
+            )
+
+        return self.update(
+            first_timestamp=Subquery(first.values("timestamp")[:1]),
+            last_timestamp=Subquery(last.values("timestamp")[:1]),
+            last_reading=Subquery(last.values("reading")[:1]),
+            record_count=Coalesce(Subquery(count.values("count")), 0),
+            modified=timezone.now(),
+        )
+
+
 class Resource(models.Model):
     """Represent a resource consumed by a :class:`~consumption.models.subject.Subject`."""
 
@@ -44,6 +130,93 @@ class Resource(models.Model):
     )
     """The unit of measurement for this resource."""
 
+    retention_raw_days = models.PositiveIntegerField(
+        null=True,
+        blank=True,
+        help_text=_(
+            "Keep all records for this number of days, then compact them. "
+            "Leave empty to keep all records."
+        ),
+        verbose_name=_("Keep raw records (days)"),
+    )
+    """Keep all records for this number of days (see :mod:`consumption.retention`)."""
+
+    retention_hourly_days = models.PositiveIntegerField(
+        null=True,
+        blank=True,
+        help_text=_(
+            "Keep hourly resolution up to this number of days, then compact "
+            "records to daily resolution. Leave empty to keep hourly resolution."
+        ),
+        verbose_name=_("Keep hourly resolution (days)"),
+    )
+    """Keep hourly resolution up to this age in days (see :mod:`consumption.retention`)."""
+
+    first_timestamp = models.DateTimeField(
+        null=True,
+        editable=False,
+        verbose_name=_("First Record"),
+    )
+    """The timestamp of the oldest record (denormalized, see :attr:`SUMMARY_FIELDS`)."""
+
+    last_timestamp = models.DateTimeField(
+        null=True,
+        editable=False,
+        verbose_name=_("Latest Record"),
+    )
+    """The timestamp of the newest record (denormalized, see :attr:`SUMMARY_FIELDS`)."""
+
+    last_reading = models.FloatField(
+        null=True,
+        editable=False,
+        verbose_name=_("Latest Reading"),
+    )
+    """The reading of the newest record (denormalized, see :attr:`SUMMARY_FIELDS`)."""
+
+    record_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name=_("Number of Records"),
+    )
+    """The number of records (denormalized, see :attr:`SUMMARY_FIELDS`)."""
+
+    modified = models.DateTimeField(
+        auto_now=True,
+        verbose_name=_("Last Modified"),
+    )
+    """The time of the latest modification of the resource or its records.
+
+    This is updated by :meth:`save` and whenever the summary of records is
+    refreshed, see
+    :meth:`ResourceQuerySet.refresh_summary() <consumption.models.resource.ResourceQuerySet.refresh_summary>`.
+    It is used to validate conditional requests, see
+    :class:`~consumption.cache.ConditionalGetMixin`.
+    """
+
+    SUMMARY_FIELDS = (
+        "first_timestamp",
+        "last_timestamp",
+        "last_reading",
+        "record_count",
+    )
+    """The denormalized summary of the resource's records.
+
+    These fields are updated whenever records are modified (see
+    :data:`~consumption.signals.records_changed`) by
+    :meth:`ResourceQuerySet.refresh_summary() <consumption.models.resource.ResourceQuerySet.refresh_summary>`
+    and may be repaired with the ``consumption_refresh_summary`` management
+    command. They are never written by :meth:`save`.
+    """
+
+    RETENTION_FIELDS = ("retention_raw_days", "retention_hourly_days")
+    """The retention policy of the resource's records.
+
+    Compacting deletes records irrevocably, so the policy is only editable in
+    the admin, not by :class:`ResourceForm`.
+    """
+
+    objects = ResourceQuerySet.as_manager()
+
     class Meta:  # noqa: D106
         app_label = "consumption"
         verbose_name = _("Resource")
@@ -51,9 +224,42 @@ class Resource(models.Model):
 
     def __str__(self):  # noqa: D105
         return "{} ({}, {}) [{}]".format(
-            self.name, self.unit, self.subject.id, self.id
+            self.name, self.unit, self.subject_id, self.id
         )  # pragma: nocover
 
+    def clean(self):
+        """Validate the retention policy."""
+        if (
+            self.retention_hourly_days is not None
+            and self.retention_raw_days is not None
+            and self.retention_hourly_days < self.retention_raw_days
+        ):
+            raise ValidationError(
+                {
+                    "retention_hourly_days": _(
+                        "Must not be shorter than the retention of raw records."
+                    )
+                }
+            )
+        if self.retention_hourly_days is not None and self.retention_raw_days is None:
+            raise ValidationError(
+                {"retention_raw_days": _("Required to compact records.")}
+            )
+
+    def save(self, *args, **kwargs):
+        """Save the instance, without overwriting its summary of records.
+
+        The summary may have been updated since the instance was loaded, e.g.
+        by an import running concurrently to editing the resource.
+        """
+        if not self._state.adding and kwargs.get("update_fields") is None:
+            kwargs["update_fields"] = [
+                field.name
+                for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in self.SUMMARY_FIELDS
+            ]
+        super().save(*args, **kwargs)
+
     def get_absolute_url(self):
         """Return the absolute URL for instances of this model.
 
@@ -74,4 +280,69 @@ class ResourceForm(forms.ModelForm):
 
     class Meta:  # noqa: D106
         model = Resource
-        fields = "__all__"
+        exclude = Resource.RETENTION_FIELDS
+
+
+class ResourceChoiceIterator:
+    """Lazily provide the choices of :class:`ResourceChoiceField`.
+
+    The choices are determined when the widget is rendered, not when the
+    form is instantiated (like Django's ``ModelChoiceIterator``).
+    """
+
+    def __init__(self, field):
+        self.field = field
+
+    def __iter__(self):  # noqa: D105
+        if self.field.empty_label is not None:
+            yield ("", self.field.empty_label)
+        yield from self.field.get_grouped_choices()
+
+
+class ResourceChoiceField(forms.ModelChoiceField):
+    """Select a :class:`~consumption.models.resource.Resource`, grouped by subject.
+
+    The choices are fetched with one single query, joining the subjects,
+    and rendered as ``<optgroup>`` per subject. As they are required for
+    every rendering of every form, they are cached (see
+    :mod:`consumption.cache`) and invalidated whenever a resource or a subject
+    is modified (see :mod:`consumption.signals`).
+    """
+
+    CACHE_PK = "all"
+    """The pseudo primary key of the cached choices of *all* resources."""
+
+    def __init__(self, queryset, **kwargs):
+        super().__init__(queryset.select_related("subject"), **kwargs)
+
+    def _build_choices(self):
+        choices = []
+        rows = self.queryset.order_by(
+            "subject__name", "subject_id", "name"
+        ).values_list("id", "name", "unit", "subject_id", "subject__name")
+        current_subject = None
+        for resource_id, name, unit, subject_id, subject_name in rows:
+            if subject_id != current_subject:
+                current_subject = subject_id
+                choices.append((subject_name, []))
+            choices[-1][1].append((resource_id, "{} ({})".format(name, unit)))
+        return choices
+
+    def get_grouped_choices(self):
+        """Return the choices as ``(subject name, [(id, label), ...])`` tuples.
+
+        Only the choices of *all* resources are cached. Choices of a
+        filtered (or sliced) queryset, e.g. by ``limit_choices_to``, are
+        fetched on every rendering.
+        """
+        query = self.queryset.query
+        if self.get_limit_choices_to() or query.has_filters() or query.is_sliced:
+            return self._build_choices()
+        return get_or_compute("choices", "resource", self.CACHE_PK, self._build_choices)
+
+    def _get_choices(self):
+        if hasattr(self, "_choices"):
+            return self._choices
+        return ResourceChoiceIterator(self)
+
+    choices = property(_get_choices, forms.ChoiceField._set_choices)
@@ -0,0 +1,235 @@
+# SPDX-License-Identifier: MIT
+
+"""Provide the app's rollup of records per resource and day."""
+
+# Python imports
+from datetime import datetime, time, timedelta
+
+# Django imports
+from django.conf import settings
+from django.db import models, transaction
+from django.db.models import Count, DateField, Max, Min, Q
+from django.db.models.functions import Trunc, TruncDate
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+
+# app imports
+from consumption.models.record import Record, consumption_per_bucket
+from consumption.models.resource import Resource
+
+ROLLUP_PERIODS = ("day", "week", "month", "quarter", "year")
+"""The periods that are supported for aggregating the rollup."""
+
+
+def _day_range(day):
+    """Return the (inclusive) start and (exclusive) end of ``day`` as datetimes.
+
+    The boundaries are determined in the current timezone, matching the
+    behaviour of Django's ``TruncDate()``.
+    """
+    start = datetime.combine(day, time.min)
+    end = start + timedelta(days=1)
+    if settings.USE_TZ:
+        tz = timezone.get_current_timezone()
+        start = timezone.make_aware(start, tz)
+        end = timezone.make_aware(end, tz)
+    return start, end
+
+
+def _record_day(timestamp):
+    """Return the day of ``timestamp``, as determined by ``TruncDate()``."""
+    if settings.USE_TZ and timezone.is_aware(timestamp):
+        return timezone.localtime(timestamp).date()
+    return timestamp.date()
+
+
+def _collapse_days(days):
+    """Collapse a set of days into ``(first, last)`` ranges of consecutive days."""
+    ranges = []
+    for day in sorted(days):
+        if ranges and day - ranges[-1][1] == timedelta(days=1):
+            ranges[-1] = (ranges[-1][0], day)
+        else:
+            ranges.append((day, day))
+    return ranges
+
+
+def _aggregate_records(queryset):
+    """Aggregate a ``Record`` queryset into rollup values per resource and day."""
+    return (
+        queryset.order_by()
+        .annotate(day=TruncDate("timestamp"))
+        .values("resource", "day")
+        .annotate(
+            reading_min=Min("reading"),
+            reading_max=Max("reading"),
+            record_count=Count("id"),
+        )
+    )
+
+
+class DailyRollupQuerySet(models.QuerySet):
+    """Provide app-specific queries for :class:`~consumption.models.rollup.DailyRollup`."""
+
+    def consumption_by(self, period):
+        """Calculate the consumption per ``period``, grouped by resource.
+
+        This is the equivalent of
+        :meth:`RecordQuerySet.consumption_by() <consumption.models.record.RecordQuerySet.consumption_by>`,
+        but operates on the (much smaller) rollup table. Periods are
+        determined by the days of the rollup, so periods shorter than one
+        day are not supported.
+
+        Raises
+        ------
+        ValueError
+            If ``period`` is not supported.
+        """
+        if period not in ROLLUP_PERIODS:
+            raise ValueError("Unsupported period: {}".format(period))
+
+        return consumption_per_bucket(
+            self, Trunc("day", period, output_field=DateField()), "reading_max"
+        )
+
+
+class DailyRollupManager(models.Manager.from_queryset(DailyRollupQuerySet)):
+    """Maintain the rollup table."""
+
+    REFRESH_CHUNK_SIZE = 100
+    """The maximum number of day ranges to refresh with one query."""
+
+    def _build(self, aggregated):
+        """Provide unsaved rollup instances from aggregated record values."""
+        return [
+            self.model(
+                resource_id=values["resource"],
+                day=values["day"],
+                reading_min=values["reading_min"],
+                reading_max=values["reading_max"],
+                record_count=values["record_count"],
+            )
+            for values in aggregated
+        ]
+
+    def refresh(self, changes):
+        """Recalculate the buckets affected by changed records.
+
+        Only the buckets (that is: the combination of resource and day)
+        provided by ``changes`` are touched. Every bucket is recalculated from
+        the raw records of that day, which is backed by the
+        ``(resource, timestamp)`` index of
+        :class:`~consumption.models.record.Record`.
+
+        Parameters
+        ----------
+        changes : iterable
+            ``(resource_id, timestamp)`` tuples of created, updated or deleted
+            records.
+        """
+        days_by_resource = {}
+        for resource_id, ts in changes:
+            days_by_resource.setdefault(resource_id, set()).add(_record_day(ts))
+
+        ranges = [
+            (resource_id, first, last)
+            for resource_id, days in days_by_resource.items()
+            for first, last in _collapse_days(days)
+        ]
+        for offset in range(0, len(ranges), self.REFRESH_CHUNK_SIZE):
+            end = offset + self.REFRESH_CHUNK_SIZE
+            self._refresh_ranges(ranges[offset:end])
+
+    def _refresh_ranges(self, ranges):
+        """Recalculate the buckets of ``(resource_id, first_day, last_day)`` ranges."""
+        record_filter = Q()
+        rollup_filter = Q()
+        for resource_id, first, last in ranges:
+            record_filter |= Q(
+                resource_id=resource_id,
+                timestamp__gte=_day_range(first)[0],
+                timestamp__lt=_day_range(last)[1],
+            )
+            rollup_filter |= Q(resource_id=resource_id, day__range=(first, last))
+
+        rollups = self._build(_aggregate_records(Record.objects.filter(record_filter)))
+
+        with transaction.atomic():
+            self.filter(rollup_filter).delete()
+            self.bulk_create(rollups)
+
+    def rebuild(self, resource_ids):
+        """Rebuild the rollup of the given resources from scratch.
+
+        Returns the number of created rollup rows.
+        """
+        rollups = self._build(
+            _aggregate_records(
+                Record.objects.filter(resource_id__in=resource_ids)
+            ).iterator()
+        )
+
+        with transaction.atomic():
+            self.filter(resource_id__in=resource_ids).delete()
+            self.bulk_create(rollups, batch_size=1000)
+
+        return len(rollups)
+
+
+class DailyRollup(models.Model):
+    """Summarize the :class:`~consumption.models.record.Record` instances of one day.
+
+    The rollup is maintained incrementally whenever records are created,
+    updated or deleted through the app (see :mod:`consumption.signals`) and
+    may be rebuilt with the ``consumption_rebuild_rollup`` management command.
+    """
+
+    resource = models.ForeignKey(
+        to=Resource,
+        on_delete=models.CASCADE,
+        help_text=_("The resource this rollup summarizes"),
+        verbose_name=_("Resource Instance"),
+    )
+    """The resource this rollup summarizes."""
+
+    day = models.DateField(
+        help_text=_("The day this rollup summarizes"),
+        verbose_name=_("Day"),
+    )
+    """The day this rollup summarizes."""
+
+    reading_min = models.FloatField(
+        help_text=_("The lowest reading of the day"),
+        verbose_name=_("Minimum Reading"),
+    )
+    """The lowest reading of the day."""
+
+    reading_max = models.FloatField(
+        help_text=_("The highest reading of the day"),
+        verbose_name=_("Maximum Reading"),
+    )
+    """The highest reading of the day."""
+
+    record_count = models.PositiveIntegerField(
+        help_text=_("The number of records of the day"),
+        verbose_name=_("Number of Records"),
+    )
+    """The number of records of the day."""
+
+    objects = DailyRollupManager()
+
+    class Meta:  # noqa: D106
+        app_label = "consumption"
+        verbose_name = _("Daily Rollup")
+        verbose_name_plural = _("Daily Rollups")
+        constraints = [
+            models.UniqueConstraint(
+                fields=["resource", "day"],
+                name="consumption_dailyrollup_unique_res_day",
+            ),
+        ]
+
+    def __str__(self):  # noqa: D105
+        return "{}: {} - {} ({})".format(
+            self.day, self.reading_min, self.reading_max, self.resource_id
+        )  # pragma: nocover
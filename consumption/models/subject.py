@@ -19,10 +19,25 @@ class Subject(models.Model):
     )
     """The human-readable identifier for instances of this class."""
 
+    modified = models.DateTimeField(
+        auto_now=True,
+        verbose_name=_("Last Modified"),
+    )
+    """The time of the latest modification of the subject.
+
+    This is used to validate conditional requests, see
+    :class:`~consumption.cache.ConditionalGetMixin`.
+    """
+
     class Meta:  # noqa: D106
         app_label = "consumption"
         verbose_name = _("Subject")
         verbose_name_plural = _("Subjects")
+        indexes = [
+            # Supports the ordering by and the (prefix) search for the name,
+            # e.g. in the list of subjects.
+            models.Index(fields=["name"], name="consumption_subject_name_idx"),
+        ]
 
     def __str__(self):  # noqa: D105
         return "{} ({})".format(self.name, self.id)  # pragma: nocover
@@ -0,0 +1,239 @@
+# SPDX-License-Identifier: MIT
+
+"""Provide keyset (cursor) pagination for large, ordered querysets.
+
+Django's built-in :class:`~django.core.paginator.Paginator` relies on
+``OFFSET``/``LIMIT`` and on a ``COUNT(*)`` of the whole result set. Both
+become increasingly expensive as the underlying table grows, because the
+database has to walk (and discard) every row before the requested page.
+
+Keyset pagination instead remembers the sort key of the last (or first) row
+of the current page and asks the database for the rows *after* (or *before*)
+that key. With a matching index, fetching page *N* costs the same as fetching
+the first page.
+
+Where numbered pages are required (e.g. in Django's admin), the
+:class:`EstimatedCountPaginator` at least avoids the ``COUNT(*)``.
+"""
+
+# Python imports
+import base64
+import binascii
+import json
+from datetime import datetime
+
+# Django imports
+from django.core.paginator import Paginator
+from django.db import DatabaseError, connections
+from django.db.models import Q, QuerySet
+from django.utils.functional import cached_property
+
+
+class InvalidCursor(ValueError):
+    """Raised if a provided cursor can not be decoded."""
+
+
+def encode_cursor(values):
+    """Encode a tuple of sort key values into an opaque, URL-safe string.
+
+    Supported value types are :class:`datetime.datetime` and :class:`int`.
+    """
+    parts = []
+    for value in values:
+        if isinstance(value, datetime):
+            parts.append("d{}".format(value.isoformat()))
+        else:
+            parts.append("i{}".format(int(value)))
+    raw = "|".join(parts).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor):
+    """Decode a cursor as provided by :func:`encode_cursor`.
+
+    Raises
+    ------
+    InvalidCursor
+        If the cursor is malformed.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        raw = base64.urlsafe_b64decode(padded.encode("ascii")).decode("utf-8")
+        values = []
+        for part in raw.split("|"):
+            kind, value = part[0], part[1:]
+            if kind == "d":
+                values.append(datetime.fromisoformat(value))
+            elif kind == "i":
+                values.append(int(value))
+            else:
+                raise InvalidCursor("Unknown cursor value type: {}".format(kind))
+    except (binascii.Error, IndexError, UnicodeError, ValueError) as err:
+        raise InvalidCursor("Malformed cursor: {}".format(cursor)) from err
+
+    return tuple(values)
+
+
+def _keyset_filter(fields, values, descending):
+    """Build the ``Q`` object selecting all rows *after* ``values``.
+
+    For the fields ``(a, b)`` in descending order, this results in
+    ``a < va OR (a = va AND b < vb)``, which is the portable formulation of a
+    row value comparison.
+    """
+    lookup = "lt" if descending else "gt"
+    condition = Q()
+    for index, field in enumerate(fields):
+        term = Q(**{"{}__{}".format(field, lookup): values[index]})
+        for previous_index in range(index):
+            term &= Q(**{fields[previous_index]: values[previous_index]})
+        condition |= term
+    return condition
+
+
+class KeysetPage:
+    """One page of results as provided by :class:`KeysetPaginator`."""
+
+    def __init__(self, object_list, next_cursor, previous_cursor):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __iter__(self):  # noqa: D105
+        return iter(self.object_list)
+
+    def __len__(self):  # noqa: D105
+        return len(self.object_list)
+
+    def has_next(self):
+        """Return ``True`` if there is a page after this one."""
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        """Return ``True`` if there is a page before this one."""
+        return self.previous_cursor is not None
+
+
+class KeysetPaginator:
+    """Paginate a queryset by a (unique) tuple of fields.
+
+    Parameters
+    ----------
+    queryset : django.db.models.QuerySet
+        The queryset to paginate. Any existing ordering is replaced.
+    fields : tuple of str
+        The fields to order by. The last field must make the ordering unique,
+        e.g. the primary key.
+    per_page : int
+        The number of objects per page.
+    descending : bool
+        Walk the results from the highest to the lowest key.
+    """
+
+    def __init__(self, queryset, fields, per_page, descending=True):
+        self.queryset = queryset
+        self.fields = tuple(fields)
+        self.per_page = per_page
+        self.descending = descending
+
+    def _ordering(self, descending):
+        prefix = "-" if descending else ""
+        return ["{}{}".format(prefix, field) for field in self.fields]
+
+    def _key(self, obj):
+        if isinstance(obj, dict):
+            return tuple(obj[field] for field in self.fields)
+        return tuple(getattr(obj, field) for field in self.fields)
+
+    def get_page(self, after=None, before=None):
+        """Return the :class:`KeysetPage` following ``after`` or preceding ``before``.
+
+        Both ``after`` and ``before`` are encoded cursors. If neither is
+        provided, the first page is returned.
+
+        Raises
+        ------
+        InvalidCursor
+            If the provided cursor can not be decoded.
+        """
+        backwards = before is not None
+        cursor = before if backwards else after
+
+        # walking backwards means inverting the direction of the query
+        descending = self.descending != backwards
+        queryset = self.queryset.order_by(*self._ordering(descending))
+        if cursor is not None:
+            queryset = queryset.filter(
+                _keyset_filter(self.fields, decode_cursor(cursor), descending)
+            )
+
+        # fetch one additional row to determine if there are more results
+        rows = list(queryset[: self.per_page + 1])
+        has_more = len(rows) > self.per_page
+        rows = rows[: self.per_page]
+
+        if backwards:
+            rows.reverse()
+            has_next, has_previous = True, has_more
+        else:
+            has_next, has_previous = has_more, cursor is not None
+
+        next_cursor = None
+        previous_cursor = None
+        if rows:
+            if has_next:
+                next_cursor = encode_cursor(self._key(rows[-1]))
+            if has_previous:
+                previous_cursor = encode_cursor(self._key(rows[0]))
+
+        return KeysetPage(rows, next_cursor, previous_cursor)
+
+
+class EstimatedCountPaginator(Paginator):
+    """Paginate with an estimated instead of an exact number of objects.
+
+    On PostgreSQL, the number of objects is taken from the query planner's
+    estimate (``EXPLAIN``), which is based on the table's statistics and
+    does not touch the rows. This works for filtered querysets, too.
+
+    The exact ``COUNT(*)`` is used, if the estimate is below
+    :attr:`estimate_threshold` (the count is cheap then and an exact number
+    is expected), if the database is not PostgreSQL or if ``object_list`` is
+    not a queryset.
+
+    The estimate may be off, so the last page may be empty or some objects may
+    be unreachable by page number. This is considered acceptable for
+    browsing huge tables.
+    """
+
+    estimate_threshold = 100000
+    """Use the exact count, if the estimate is below this number."""
+
+    def _estimate(self):
+        queryset = self.object_list
+        if not isinstance(queryset, QuerySet):
+            return None
+
+        connection = connections[queryset.db]
+        if connection.vendor != "postgresql":
+            return None
+
+        sql, params = queryset.order_by().query.sql_with_params()
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute("EXPLAIN (FORMAT JSON) {}".format(sql), params)
+                plan = cursor.fetchone()[0]
+        except DatabaseError:  # pragma: nocover
+            return None
+
+        if isinstance(plan, str):  # pragma: nocover
+            plan = json.loads(plan)
+        return int(plan[0]["Plan"]["Plan Rows"])
+
+    @cached_property
+    def count(self):
+        """Return the (estimated) number of objects."""
+        estimate = self._estimate()
+        if estimate is not None and estimate >= self.estimate_threshold:
+            return estimate
+        return super().count
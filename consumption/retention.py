@@ -0,0 +1,193 @@
+# SPDX-License-Identifier: MIT
+
+"""Compact old records according to the retention policy of their resource.
+
+The policy of a :class:`~consumption.models.resource.Resource` is provided by
+``retention_raw_days`` and ``retention_hourly_days``, e.g. *keep raw records
+for 90 days, then hourly, then daily* (``90`` and ``365``):
+
+    - records younger than ``retention_raw_days`` are kept;
+    - older records are reduced to *hourly* buckets, up to an age of
+      ``retention_hourly_days`` (if set);
+    - even older records are reduced to *daily* buckets.
+
+Of every bucket, only the *representative* records are kept: the last record
+and the one with the highest reading. For cumulative meters, this is one
+single record per bucket (e.g. one of four for an hour of 15-minute readings,
+one of 96 for a day). The consumption of a bucket is determined by its
+highest reading (see
+:meth:`~consumption.models.record.RecordQuerySet.consumption_by`) and buckets
+are aligned to hours and days (in the current timezone, like all other
+aggregations of the app), so the consumption per day, week, month, quarter
+and year (and the :class:`~consumption.models.rollup.DailyRollup`'s maximum)
+do not change. The rollup's minimum of compacted days does change.
+
+The records of a resource are processed in chunks of days, each chunk in its
+own transaction, sending :data:`~consumption.signals.records_changed` for the
+deleted records. Compaction is idempotent.
+"""
+
+# Python imports
+from datetime import timedelta
+
+# Django imports
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+# app imports
+from consumption.models.record import Record
+from consumption.models.rollup import _day_range, _record_day
+from consumption.signals import records_changed
+
+RESOLUTION_HOUR = "hour"
+RESOLUTION_DAY = "day"
+
+DELETE_CHUNK_SIZE = 500
+"""The maximum number of records to delete with one query."""
+
+
+def _bucket(timestamp, resolution):
+    """Return the bucket of ``timestamp``, in the current timezone."""
+    if resolution == RESOLUTION_DAY:
+        return _record_day(timestamp)
+    if settings.USE_TZ and timezone.is_aware(timestamp):
+        timestamp = timezone.localtime(timestamp)
+    return timestamp.replace(minute=0, second=0, microsecond=0)
+
+
+def representative_ids(rows, resolution, keep_first=False):
+    """Return the ``id`` of the records to keep.
+
+    Parameters
+    ----------
+    rows : iterable
+        ``(id, timestamp, reading)`` tuples, ordered by timestamp.
+    resolution : str
+        ``"hour"`` or ``"day"``.
+    keep_first : bool
+        Keep the first record of every bucket, too (used by
+        :func:`consumption.archive.archive`).
+
+    Returns
+    -------
+    set
+        Of every bucket, the ``id`` of the last and the highest reading (and
+        the first one).
+    """
+    keep = set()
+    current = last = high = None
+    for pk, timestamp, reading in rows:
+        bucket = _bucket(timestamp, resolution)
+        if bucket != current:
+            if current is not None:
+                keep.update((last, high[0]))
+            current = bucket
+            high = (pk, reading)
+            if keep_first:
+                keep.add(pk)
+        if reading > high[1]:
+            high = (pk, reading)
+        last = pk
+    if current is not None:
+        keep.update((last, high[0]))
+    return keep
+
+
+def _compact_range(resource_id, start, end, resolution):
+    """Compact the records of one resource in ``[start, end)`` in one transaction.
+
+    ``start`` and ``end`` have to be aligned to the buckets.
+    """
+    with transaction.atomic():
+        rows = list(
+            Record.objects.filter(
+                resource_id=resource_id, timestamp__gte=start, timestamp__lt=end
+            )
+            .order_by("timestamp")
+            .values_list("id", "timestamp", "reading")
+        )
+        keep = representative_ids(rows, resolution)
+        removed = [(pk, timestamp) for pk, timestamp, _ in rows if pk not in keep]
+        if not removed:
+            return 0
+
+        for offset in range(0, len(removed), DELETE_CHUNK_SIZE):
+            chunk_end = offset + DELETE_CHUNK_SIZE
+            Record.objects.filter(
+                id__in=[pk for pk, _ in removed[offset:chunk_end]]
+            ).delete()
+        records_changed.send(
+            sender=Record,
+            changes={(resource_id, timestamp) for _, timestamp in removed},
+        )
+    return len(removed)
+
+
+def _compact_tier(resource_id, end, resolution, chunk_days, start=None):
+    """Compact the records of one resource older than ``end`` (and not older than ``start``)."""
+    records = Record.objects.filter(resource_id=resource_id, timestamp__lt=end)
+    if start is not None:
+        records = records.filter(timestamp__gte=start)
+    first = records.order_by("timestamp").values_list("timestamp", flat=True).first()
+    if first is None:
+        return 0
+
+    removed = 0
+    day = _record_day(first)
+    last_day = _record_day(end)
+    while day <= last_day:
+        chunk_start = max(_day_range(day)[0], start) if start else _day_range(day)[0]
+        next_day = day + timedelta(days=chunk_days)
+        chunk_end = min(_day_range(next_day)[0], end)
+        removed += _compact_range(resource_id, chunk_start, chunk_end, resolution)
+        day = next_day
+    return removed
+
+
+def _aligned(timestamp, resolution):
+    """Return the start of the bucket of ``timestamp``."""
+    if resolution == RESOLUTION_DAY:
+        return _day_range(_record_day(timestamp))[0]
+    return _bucket(timestamp, RESOLUTION_HOUR)
+
+
+def compact(resource, now=None, chunk_days=7):
+    """Compact the records of ``resource`` according to its retention policy.
+
+    Parameters
+    ----------
+    resource : Resource
+        The resource to compact the records of.
+    now : datetime.datetime
+        The reference time of the policy, defaults to now.
+    chunk_days : int
+        The number of days to process in one transaction.
+
+    Returns
+    -------
+    int
+        The number of deleted records.
+    """
+    if resource.retention_raw_days is None:
+        return 0
+    if chunk_days < 1:
+        raise ValueError("chunk_days must be at least 1")
+
+    now = now or timezone.now()
+    # the tiers end at a bucket boundary, so no bucket is compacted partially
+    hourly_end = _aligned(
+        now - timedelta(days=resource.retention_raw_days), RESOLUTION_HOUR
+    )
+    if resource.retention_hourly_days is None:
+        return _compact_tier(resource.pk, hourly_end, RESOLUTION_HOUR, chunk_days)
+
+    daily_end = _aligned(
+        now - timedelta(days=resource.retention_hourly_days), RESOLUTION_DAY
+    )
+    removed = _compact_tier(resource.pk, daily_end, RESOLUTION_DAY, chunk_days)
+    if hourly_end > daily_end:
+        removed += _compact_tier(
+            resource.pk, hourly_end, RESOLUTION_HOUR, chunk_days, start=daily_end
+        )
+    return removed
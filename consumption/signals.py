@@ -0,0 +1,120 @@
+# SPDX-License-Identifier: MIT
+
+"""Provide the app's custom signals and their receivers.
+
+Changes to :class:`~consumption.models.record.Record` instances are
+**not** tracked with Django's model signals. Connecting receivers to
+``pre_delete``/``post_delete`` of ``Record`` would disable Django's *fast
+delete*, so deleting a resource would load every single one of its records.
+Besides, bulk operations (e.g. ``bulk_create()``) do not send model signals
+at all.
+
+Instead, all code paths of the app that create, update or delete records
+send :data:`records_changed` explicitly, once per operation.
+
+Changes to :class:`~consumption.models.resource.Resource` and
+:class:`~consumption.models.subject.Subject` instances are tracked with
+Django's model signals.
+"""
+
+# Python imports
+import shutil
+
+# Django imports
+from django.conf import settings
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import Signal, receiver
+
+# app imports
+from consumption.cache import bump_versions
+from consumption.models.resource import Resource, ResourceChoiceField
+from consumption.models.rollup import DailyRollup
+from consumption.models.subject import Subject
+
+records_changed = Signal()
+"""Sent after :class:`~consumption.models.record.Record` instances were changed.
+
+The signal provides the keyword argument ``changes``, a set of
+``(resource_id, timestamp)`` tuples. For updated records, both the previous
+and the current values are included.
+
+The signal is sent inside of the transaction that modified the records.
+"""
+
+
+@receiver(records_changed)
+def refresh_daily_rollup(sender, changes, **kwargs):
+    """Update the affected buckets of :class:`~consumption.models.rollup.DailyRollup`."""
+    DailyRollup.objects.refresh(changes)
+
+
+@receiver(records_changed)
+def refresh_resource_summary(sender, changes, **kwargs):
+    """Update the summary of records of the affected resources.
+
+    The summary includes the number of records, as provided by
+    :class:`~consumption.models.rollup.DailyRollup`. This receiver has to be
+    connected after :func:`refresh_daily_rollup`, as receivers are called in
+    the order they were connected.
+    """
+    Resource.objects.filter(
+        pk__in={resource_id for resource_id, _ in changes}
+    ).refresh_summary()
+
+
+@receiver(records_changed)
+def bump_cache_versions_of_records(sender, changes, **kwargs):
+    """Invalidate the cached values of the affected resources and subjects."""
+    resource_ids = {resource_id for resource_id, _ in changes}
+    bump_versions("resource", resource_ids)
+    bump_versions(
+        "subject",
+        Resource.objects.filter(id__in=resource_ids).values_list(
+            "subject_id", flat=True
+        ),
+    )
+
+
+@receiver(pre_save, sender=Resource)
+def capture_previous_subject(sender, instance, **kwargs):
+    """Remember the previous subject of a resource, to invalidate it, too."""
+    instance._previous_subject_id = None
+    if instance.pk is not None:
+        instance._previous_subject_id = (
+            Resource.objects.filter(pk=instance.pk)
+            .values_list("subject_id", flat=True)
+            .first()
+        )
+
+
+@receiver(post_save, sender=Resource)
+@receiver(post_delete, sender=Resource)
+def bump_cache_versions_of_resource(sender, instance, **kwargs):
+    """Invalidate the cached values of a resource and its subject."""
+    bump_versions("resource", [instance.pk, ResourceChoiceField.CACHE_PK])
+    bump_versions(
+        "subject",
+        {instance.subject_id, getattr(instance, "_previous_subject_id", None)} - {None},
+    )
+
+
+@receiver(post_delete, sender=Resource)
+def delete_archive_of_resource(sender, instance, **kwargs):
+    """Delete the archive files of a resource, see :mod:`consumption.archive`."""
+    if not getattr(settings, "CONSUMPTION_ARCHIVE_DIR", None):
+        return
+
+    # app imports
+    from consumption.archive import resource_dir
+
+    path = resource_dir(instance.pk)
+    transaction.on_commit(lambda: shutil.rmtree(path, ignore_errors=True))
+
+
+@receiver(post_save, sender=Subject)
+@receiver(post_delete, sender=Subject)
+def bump_cache_version_of_subject(sender, instance, **kwargs):
+    """Invalidate the cached values of a subject (and the names in resource choices)."""
+    bump_versions("subject", [instance.pk])
+    bump_versions("resource", [ResourceChoiceField.CACHE_PK])
@@ -0,0 +1,90 @@
+/**
+ * Load the binary series of a resource, as provided by the app's
+ * ``ResourceSeriesView`` (``resource/<id>/series/``).
+ *
+ * The payload is wrapped in typed arrays without copying or parsing it. See
+ * the view's documentation for the layout of the payload.
+ */
+
+const MAGIC = "CTS1";
+const VERSION = 1;
+const HEADER_SIZE = 16;
+
+export interface Series {
+  /** Seconds since the epoch, ascending. */
+  timestamps: Float64Array;
+  readings: Float32Array | Float64Array;
+}
+
+/** Typed arrays use the platform's byte order, the payload is little-endian. */
+const LITTLE_ENDIAN = new Uint8Array(new Uint16Array([1]).buffer)[0] === 1;
+
+function readFloats(
+  view: DataView,
+  offset: number,
+  count: number,
+  size: number,
+): Float32Array | Float64Array {
+  const result = size === 4 ? new Float32Array(count) : new Float64Array(count);
+  for (let index = 0; index < count; index++) {
+    result[index] =
+      size === 4
+        ? view.getFloat32(offset + index * size, true)
+        : view.getFloat64(offset + index * size, true);
+  }
+  return result;
+}
+
+/** Wrap a binary payload in typed arrays. */
+export function parseSeries(buffer: ArrayBuffer): Series {
+  if (buffer.byteLength < HEADER_SIZE) {
+    throw new Error("Invalid series: truncated header");
+  }
+
+  const view = new DataView(buffer);
+  const magic = String.fromCharCode(
+    view.getUint8(0),
+    view.getUint8(1),
+    view.getUint8(2),
+    view.getUint8(3),
+  );
+  if (magic !== MAGIC || view.getUint8(4) !== VERSION) {
+    throw new Error("Invalid series: unsupported format");
+  }
+
+  const readingSize = view.getUint8(5);
+  const count = view.getUint32(8, true);
+  const readingsOffset = HEADER_SIZE + count * 8;
+  if (
+    (readingSize !== 4 && readingSize !== 8) ||
+    buffer.byteLength !== readingsOffset + count * readingSize
+  ) {
+    throw new Error("Invalid series: unexpected length");
+  }
+
+  if (!LITTLE_ENDIAN) {
+    return {
+      timestamps: readFloats(view, HEADER_SIZE, count, 8) as Float64Array,
+      readings: readFloats(view, readingsOffset, count, readingSize),
+    };
+  }
+  return {
+    timestamps: new Float64Array(buffer, HEADER_SIZE, count),
+    readings:
+      readingSize === 4
+        ? new Float32Array(buffer, readingsOffset, count)
+        : new Float64Array(buffer, readingsOffset, count),
+  };
+}
+
+/** Fetch and parse the series from ``url``. */
+export async function loadSeries(
+  url: string,
+  init?: RequestInit,
+): Promise<Series> {
+  const response = await fetch(url, init);
+  if (!response.ok) {
+    throw new Error(`Loading the series failed: ${response.status}`);
+  }
+  return parseSeries(await response.arrayBuffer());
+}
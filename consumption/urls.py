@@ -6,16 +6,23 @@
 from django.urls import path
 
 # app imports
+from consumption.views.export import (
+    ResourceRecordExportView,
+    SubjectRecordExportView,
+)
 from consumption.views.record import (
+    RecordBulkCreateView,
     RecordCreateView,
     RecordDeleteView,
     RecordDetailView,
     RecordUpdateView,
 )
 from consumption.views.resource import (
+    ResourceChartDataView,
     ResourceCreateView,
     ResourceDeleteView,
     ResourceDetailView,
+    ResourceSeriesView,
     ResourceUpdateView,
 )
 from consumption.views.subject import (
@@ -47,6 +54,11 @@ urlpatterns = [
         SubjectDeleteView.as_view(),
         name="subject-delete",
     ),
+    path(
+        "subject/<int:subject_id>/export/<str:export_format>/",
+        SubjectRecordExportView.as_view(),
+        name="subject-export",
+    ),
     # Resource-related URLs
     path("resource/create/", ResourceCreateView.as_view(), name="resource-create"),
     path(
@@ -54,6 +66,21 @@ urlpatterns = [
         ResourceDetailView.as_view(),
         name="resource-detail",
     ),
+    path(
+        "resource/<int:resource_id>/chart-data/",
+        ResourceChartDataView.as_view(),
+        name="resource-chart-data",
+    ),
+    path(
+        "resource/<int:resource_id>/series/",
+        ResourceSeriesView.as_view(),
+        name="resource-series",
+    ),
+    path(
+        "resource/<int:resource_id>/export/<str:export_format>/",
+        ResourceRecordExportView.as_view(),
+        name="resource-export",
+    ),
     path(
         "resource/<int:resource_id>/update/",
         ResourceUpdateView.as_view(),
@@ -71,6 +98,11 @@ urlpatterns = [
         RecordCreateView.as_view(),
         name="record-create",
     ),
+    path(
+        "record/create/subject/<int:subject_id>/",
+        RecordBulkCreateView.as_view(),
+        name="record-bulk-create",
+    ),
     path(
         "record/<int:record_id>/",
         RecordDetailView.as_view(),
@@ -0,0 +1,69 @@
+# SPDX-License-Identifier: MIT
+
+"""Provide utility functions, that are used throughout the app."""
+
+# Python imports
+from datetime import timedelta
+
+# Django imports
+from django.conf import settings
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+
+def parse_timestamp(value):
+    """Parse an ISO 8601 timestamp, matching the project's ``USE_TZ`` setting.
+
+    Naive values are interpreted in the current timezone, if ``USE_TZ`` is
+    enabled. Aware values are converted to naive ones, if it is disabled.
+
+    Raises
+    ------
+    ValueError
+        If ``value`` is not a valid timestamp.
+    """
+    try:
+        timestamp = parse_datetime(str(value).strip())
+    except ValueError:
+        timestamp = None
+    if timestamp is None:
+        raise ValueError("Invalid timestamp: {}".format(value))
+
+    if settings.USE_TZ and timezone.is_naive(timestamp):
+        timestamp = timezone.make_aware(timestamp)
+    elif not settings.USE_TZ and timezone.is_aware(timestamp):
+        timestamp = timezone.make_naive(timestamp)
+    return timestamp
+
+
+def period_start(period, now=None):
+    """Return the start of the current ``period`` (``day``, ``week``, ``month`` or ``year``).
+
+    The period is determined in the current timezone, if ``USE_TZ`` is
+    enabled. Weeks start on Monday.
+
+    Raises
+    ------
+    ValueError
+        If ``period`` is not supported.
+    """
+    if now is None:
+        now = timezone.now()
+    if settings.USE_TZ:
+        now = timezone.localtime(now)
+
+    start = now.replace(hour=0, minute=0, second=0, microsecond=0)
+    if period == "day":
+        pass
+    elif period == "week":
+        start -= timedelta(days=start.weekday())
+    elif period == "month":
+        start = start.replace(day=1)
+    elif period == "year":
+        start = start.replace(month=1, day=1)
+    else:
+        raise ValueError("Unsupported period: {}".format(period))
+
+    if settings.USE_TZ:
+        start = timezone.make_aware(start.replace(tzinfo=None))
+    return start
@@ -0,0 +1,225 @@
+# SPDX-License-Identifier: MIT
+
+"""Views to export :class:`~consumption.models.record.Record` instances."""
+
+# Python imports
+import csv
+import json
+
+# Django imports
+from django.conf import settings
+from django.http import Http404, HttpResponseBadRequest, StreamingHttpResponse
+from django.shortcuts import get_object_or_404
+from django.views import generic
+
+# app imports
+from consumption.models.record import Record
+from consumption.models.resource import Resource
+from consumption.models.subject import Subject
+from consumption.utils import parse_timestamp
+
+EXPORT_FORMATS = {
+    "csv": "text/csv",
+    "jsonl": "application/x-ndjson",
+}
+"""The supported export formats and their content types."""
+
+EXPORT_COLUMNS = ("resource", "timestamp", "reading")
+"""The exported columns.
+
+These match the input of the ``consumption_import`` management command.
+"""
+
+
+class _Echo:
+    """Implement the ``write()`` method of a file-like object.
+
+    ``csv.writer`` requires a file-like object to write to. Returning the
+    value instead of buffering it allows streaming the output.
+    """
+
+    def write(self, value):
+        return value
+
+
+def _csv_lines(rows):
+    writer = csv.writer(_Echo())
+    yield writer.writerow(EXPORT_COLUMNS)
+    for resource_id, timestamp, reading in rows:
+        yield writer.writerow((resource_id, timestamp.isoformat(), reading))
+
+
+def _jsonl_lines(rows):
+    for resource_id, timestamp, reading in rows:
+        yield "{}\n".format(
+            json.dumps(
+                {
+                    "resource": resource_id,
+                    "timestamp": timestamp.isoformat(),
+                    "reading": reading,
+                }
+            )
+        )
+
+
+def _chunked(lines, size):
+    """Join ``size`` lines into one chunk, to reduce the per-chunk overhead."""
+    chunk = []
+    for line in lines:
+        chunk.append(line)
+        if len(chunk) >= size:
+            yield "".join(chunk)
+            chunk = []
+    if chunk:
+        yield "".join(chunk)
+
+
+class RecordExportView(generic.View):
+    """Stream the records of an object as CSV or JSON lines.
+
+    The records are fetched with ``values_list()`` and ``iterator()``, so
+    neither model instances are created nor the complete result is loaded
+    into memory.
+
+    The export may be limited to a time range by providing ``from`` and/or
+    ``to`` as GET parameters (ISO 8601, inclusive).
+
+    This is the generic implementation, see
+    :class:`~consumption.views.export.ResourceRecordExportView` and
+    :class:`~consumption.views.export.SubjectRecordExportView`.
+    """
+
+    model = None
+    """The model of the object to export the records of."""
+
+    pk_url_kwarg = None
+    """The keyword argument as provided in :mod:`consumption.urls`."""
+
+    record_filter = None
+    """The lookup to filter :class:`~consumption.models.record.Record` by the object."""
+
+    resource_filter = None
+    """The lookup to filter :class:`~consumption.models.resource.Resource` by the object."""
+
+    chunk_size = 2000
+    """The number of rows to fetch from the database at once."""
+
+    def _parse_range(self):
+        """Return the time range filters as provided by the GET parameters."""
+        filters = {}
+        for param, lookup in (("from", "timestamp__gte"), ("to", "timestamp__lte")):
+            value = self.request.GET.get(param)
+            if not value:
+                continue
+            filters[lookup] = parse_timestamp(value)
+        return filters
+
+    def get_rows(self, obj, filters):
+        """Provide the exported rows as ``(resource_id, timestamp, reading)`` tuples.
+
+        The ordering by resource and timestamp is backed by the
+        ``(resource, timestamp)`` index. If ``CONSUMPTION_ARCHIVE_DIR`` is
+        set, archived records are included, see :meth:`get_archived_rows`.
+        """
+        if getattr(settings, "CONSUMPTION_ARCHIVE_DIR", None):
+            return self.get_archived_rows(obj, filters)
+        return (
+            Record.objects.filter(**{self.record_filter: obj.pk}, **filters)
+            .order_by("resource", "timestamp")
+            .values_list("resource_id", "timestamp", "reading")
+            .iterator(chunk_size=self.chunk_size)
+        )
+
+    def get_archived_rows(self, obj, filters):
+        """Provide the exported rows, including archived records.
+
+        The resources are processed one by one, the archived records are
+        read from the memory-mapped archive files (see
+        :mod:`consumption.archive`), followed by the records in the database.
+        """
+        # app imports
+        from consumption import archive
+        from consumption.analytics import from_epoch
+
+        resource_ids = (
+            Resource.objects.filter(**{self.resource_filter: obj.pk})
+            .order_by("id")
+            .values_list("id", flat=True)
+        )
+        for resource_id in resource_ids:
+            archived, records = archive.split(
+                resource_id,
+                filters.get("timestamp__gte"),
+                filters.get("timestamp__lte"),
+            )
+            for offset in range(0, len(archived), self.chunk_size):
+                end = offset + self.chunk_size
+                for timestamp, reading in archived[offset:end].tolist():
+                    yield (
+                        resource_id,
+                        from_epoch(timestamp, aware=settings.USE_TZ),
+                        reading,
+                    )
+            yield from (
+                records.order_by("timestamp")
+                .values_list("resource_id", "timestamp", "reading")
+                .iterator(chunk_size=self.chunk_size)
+            )
+
+    def get(self, request, *args, **kwargs):
+        """Stream the export."""
+        export_format = kwargs["export_format"]
+        if export_format not in EXPORT_FORMATS:
+            raise Http404("Unsupported export format")
+
+        obj = get_object_or_404(
+            self.model.objects.only("pk"), pk=kwargs[self.pk_url_kwarg]
+        )
+        try:
+            filters = self._parse_range()
+        except ValueError as err:
+            return HttpResponseBadRequest(str(err))
+
+        rows = self.get_rows(obj, filters)
+        lines = _csv_lines(rows) if export_format == "csv" else _jsonl_lines(rows)
+
+        response = StreamingHttpResponse(
+            _chunked(lines, self.chunk_size),
+            content_type=EXPORT_FORMATS[export_format],
+        )
+        response["Content-Disposition"] = 'attachment; filename="{}-{}.{}"'.format(
+            self.model._meta.model_name, obj.pk, export_format
+        )
+        return response
+
+
+class ResourceRecordExportView(RecordExportView):
+    """Stream the records of one :class:`~consumption.models.resource.Resource`."""
+
+    model = Resource
+    """Required attribute, determining the model to work on."""
+
+    pk_url_kwarg = "resource_id"
+    """The keyword argument as provided in :mod:`consumption.urls`."""
+
+    record_filter = "resource"
+    """Filter the records by their resource."""
+
+    resource_filter = "pk"
+    """Filter the resources by the resource itself."""
+
+
+class SubjectRecordExportView(RecordExportView):
+    """Stream the records of all resources of a :class:`~consumption.models.subject.Subject`."""
+
+    model = Subject
+    """Required attribute, determining the model to work on."""
+
+    pk_url_kwarg = "subject_id"
+    """The keyword argument as provided in :mod:`consumption.urls`."""
+
+    record_filter = "resource__subject"
+    """Filter the records by the subject of their resource."""
+
+    resource_filter = "subject"
+    """Filter the resources by their subject."""
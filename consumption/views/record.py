@@ -4,14 +4,57 @@
 
 # Django imports
 from django.contrib.auth.mixins import LoginRequiredMixin
+from django.db import IntegrityError, transaction
+from django.shortcuts import redirect
 from django.urls import reverse_lazy
+from django.utils.translation import gettext_lazy as _
 from django.views import generic
 
 # app imports
-from consumption.models.record import Record, RecordForm
+from consumption.bulk import write_records
+from consumption.models.record import (
+    Record,
+    RecordBulkEntryFormSet,
+    RecordBulkTimestampForm,
+    RecordForm,
+)
+from consumption.models.subject import Subject
+from consumption.signals import records_changed
+
+
+class RecordsChangedMixin:
+    """Send :data:`~consumption.signals.records_changed` after modifying a ``Record``.
+
+    The previous values of an existing
+    :class:`~consumption.models.record.Record` instance are captured while
+    fetching the object, so that updates may be tracked for the previous
+    *and* the current resource and timestamp.
+
+    The actual modification and sending the signal are performed in one
+    transaction.
+    """
+
+    def get_object(self, queryset=None):
+        """Capture the resource and timestamp of the unmodified object."""
+        obj = super().get_object(queryset=queryset)
+        self._previous_record = (obj.resource_id, obj.timestamp)
+        return obj
+
+    def form_valid(self, form):
+        """Perform the modification and send the signal."""
+        with transaction.atomic():
+            response = super().form_valid(form)
+
+            changes = {getattr(self, "_previous_record", None)}
+            if self.object.pk is not None:
+                changes.add((self.object.resource_id, self.object.timestamp))
+            changes.discard(None)
+            records_changed.send(sender=Record, changes=changes)
+
+        return response
 
 
-class RecordCreateView(LoginRequiredMixin, generic.CreateView):
+class RecordCreateView(LoginRequiredMixin, RecordsChangedMixin, generic.CreateView):
     """Generic class-based view to add :class:`~consumption.models.record.Record` objects.
 
     While this view requires a valid *login*, there is no check of permissions
@@ -82,6 +125,114 @@ class RecordCreateView(LoginRequiredMixin, generic.CreateView):
         )
 
 
+class RecordBulkCreateView(
+    LoginRequiredMixin, generic.detail.SingleObjectMixin, generic.FormView
+):
+    """Add :class:`~consumption.models.record.Record` objects for all resources of a subject.
+
+    While this view requires a valid *login*, there is no check of permissions
+    (as of now), meaning: every (authenticated) user is able to create
+    :class:`~consumption.models.record.Record` objects.
+
+    The view lists all :class:`~consumption.models.resource.Resource`
+    instances of a :class:`~consumption.models.subject.Subject` with one
+    shared timestamp (see
+    :class:`~consumption.models.record.RecordBulkTimestampForm` and
+    :data:`~consumption.models.record.RecordBulkEntryFormSet`). All readings
+    are validated at once and written with one ``bulk_create()`` in one
+    transaction.
+
+    After successfully creating the records the user will be redirected to
+    the URL of :class:`~consumption.views.subject.SubjectDetailView`.
+
+    Uses the template ``templates/consumption/record_bulk_create.html``.
+    """
+
+    model = Subject
+    """Required attribute, determining the model to work on."""
+
+    form_class = RecordBulkTimestampForm
+    """The form providing the shared timestamp."""
+
+    context_object_name = "subject_instance"
+    """Provide a semantic name for the built-in context."""
+
+    pk_url_kwarg = "subject_id"
+    """The keyword argument as provided in :mod:`consumption.urls`."""
+
+    template_name = "consumption/record_bulk_create.html"
+    """The template to render."""
+
+    def get_formset(self):
+        """Provide the formset with one form per resource of the subject."""
+        kwargs = {"resources": self.object.resource_set.order_by("name")}
+        if self.request.method == "POST":
+            kwargs["data"] = self.request.POST
+        return RecordBulkEntryFormSet(**kwargs)
+
+    def get_context_data(self, **kwargs):
+        """Add the formset to the context."""
+        if "formset" not in kwargs:
+            kwargs["formset"] = self.get_formset()
+        return super().get_context_data(**kwargs)
+
+    def get(self, request, *args, **kwargs):  # noqa: D102
+        self.object = self.get_object()
+        return super().get(request, *args, **kwargs)
+
+    def post(self, request, *args, **kwargs):
+        """Validate the shared timestamp and all readings at once."""
+        self.object = self.get_object()
+        form = self.get_form()
+        formset = self.get_formset()
+        if form.is_valid() and formset.is_valid():
+            return self.form_valid(form, formset)
+        return self.render_to_response(
+            self.get_context_data(form=form, formset=formset)
+        )
+
+    def form_valid(self, form, formset):
+        """Write all records at once.
+
+        Existing records with the same resource and timestamp are detected
+        with one query and reported as errors of the respective forms.
+        """
+        timestamp = form.cleaned_data["timestamp"]
+        records = formset.get_records(timestamp)
+
+        existing = set(
+            Record.objects.filter(
+                resource__in=[record.resource_id for record in records],
+                timestamp=timestamp,
+            ).values_list("resource_id", flat=True)
+        )
+        for bulk_form in formset.forms:
+            if bulk_form.instance.resource_id in existing:
+                bulk_form.add_error(
+                    "reading", _("There is already a record for this timestamp.")
+                )
+
+        if not existing:
+            try:
+                write_records(records)
+            except IntegrityError:
+                form.add_error(
+                    None, _("The records were modified concurrently, try again.")
+                )
+            else:
+                return redirect(self.get_success_url())
+
+        return self.render_to_response(
+            self.get_context_data(form=form, formset=formset)
+        )
+
+    def get_success_url(self):  # pragma: nocover
+        """Redirect to the *parent* :class:`~consumption.models.subject.Subject`."""
+        return reverse_lazy(
+            "consumption:subject-detail", kwargs={"subject_id": self.object.id}
+        )
+
+
 class RecordDetailView(generic.DetailView):
     """Provide the details of :class:`~consumption.models.record.Record` instances.
 
@@ -98,7 +249,7 @@ class RecordDetailView(generic.DetailView):
     """The keyword argument as provided in :mod:`consumption.urls`."""
 
 
-class RecordUpdateView(LoginRequiredMixin, generic.UpdateView):
+class RecordUpdateView(LoginRequiredMixin, RecordsChangedMixin, generic.UpdateView):
     """Generic class-based view to update :class:`~consumption.models.record.Record` objects.
 
     While this view requires a valid *login*, there is no check of permissions
@@ -135,7 +286,7 @@ class RecordUpdateView(LoginRequiredMixin, generic.UpdateView):
     """Uses the template ``templates/consumption/record_update.html``."""
 
 
-class RecordDeleteView(LoginRequiredMixin, generic.DeleteView):
+class RecordDeleteView(LoginRequiredMixin, RecordsChangedMixin, generic.DeleteView):
     """Generic class-based view to delete :class:`~consumption.models.record.Record` objects.
 
     While this view requires a valid *login*, there is no check of permissions
@@ -2,13 +2,38 @@
 
 """Views related to the :class:`~consumption.models.resource.Resource` model."""
 
+# Python imports
+import struct
+
 # Django imports
 from django.contrib.auth.mixins import LoginRequiredMixin
+from django.http import Http404, HttpResponse, JsonResponse
 from django.urls import reverse_lazy
+from django.utils.translation import gettext_lazy as _
 from django.views import generic
 
 # app imports
+from consumption.cache import (
+    CacheVersionMixin,
+    ConditionalGetMixin,
+    get_or_compute,
+    make_etag,
+)
 from consumption.models.resource import Resource, ResourceForm
+from consumption.pagination import InvalidCursor, KeysetPaginator
+from consumption.utils import parse_timestamp
+
+SERIES_MAGIC = b"CTS1"
+"""Identify the binary payload of :class:`ResourceSeriesView`."""
+
+SERIES_VERSION = 1
+"""The version of the binary payload of :class:`ResourceSeriesView`."""
+
+SERIES_HEADER_FORMAT = "<4sBB2xI4x"
+"""The ``struct`` format of the header of the binary payload."""
+
+SERIES_HEADER_SIZE = struct.calcsize(SERIES_HEADER_FORMAT)
+"""The size of the header in bytes, a multiple of eight."""
 
 
 class ResourceCreateView(LoginRequiredMixin, generic.CreateView):
@@ -42,9 +67,12 @@ class ResourceCreateView(LoginRequiredMixin, generic.CreateView):
     """Uses the template ``templates/consumption/resource_create.html``."""
 
 
-class ResourceDetailView(generic.DetailView):
+class ResourceDetailView(ConditionalGetMixin, CacheVersionMixin, generic.DetailView):
     """Provide the details of :class:`~consumption.models.resource.Resource` instances.
 
+    Conditional requests are answered with ``304 Not Modified``, see
+    :meth:`get_etag`.
+
     Uses the template ``templates/consumption/resource_detail.html``.
     """
 
@@ -57,18 +85,36 @@ class ResourceDetailView(generic.DetailView):
     pk_url_kwarg = "resource_id"
     """The keyword argument as provided in :mod:`consumption.urls`."""
 
+    records_per_page = 50
+    """The number of :class:`~consumption.models.record.Record` instances per page.
+
+    As with any other class attribute, this may be overridden by passing
+    ``records_per_page`` to ``as_view()`` in the URL configuration.
+    """
+
+    def get_etag(self):
+        """Provide the ``ETag`` of the resource.
+
+        The ``ETag`` is derived from the modification times of the resource
+        (which includes any modification of its records) and its subject,
+        fetched with one query by primary key.
+        """
+        modified = (
+            Resource.objects.filter(pk=self.kwargs[self.pk_url_kwarg])
+            .values_list("modified", "subject__modified")
+            .first()
+        )
+        if modified is None:
+            return None
+        return make_etag(*modified)
+
     def get_queryset(self):
         """Optimize database queries.
 
         Override to the default implementation of ``get_queryset()`` to
         select the referenced instance of
         :class:`~consumption.models.subject.Subject` (referenced by
-        :attr:`Resource.subject <consumption.models.resource.Resource.subject>`)
-        and prefetch all associated instances of
-        :class:`~consumption.models.record.Record` (that is: all instances of
-        :class:`~consumption.models.record.Record` that reference this instance
-        of :class:`~consumption.models.resource.Resource` by their
-        :attr:`~consumption.models.record.Record.resource` attribute).
+        :attr:`Resource.subject <consumption.models.resource.Resource.subject>`).
 
         Warning
         -------
@@ -78,33 +124,209 @@ class ResourceDetailView(generic.DetailView):
         :class:`~consumption.models.subject.Subject` instance will be easily
         accessible by using ``resource_instance.subject`` in the template).
 
-        See
+        The associated instances of :class:`~consumption.models.record.Record`
+        are **not** prefetched, as this would load the resource's complete
+        history. See
         :meth:`~consumption.views.resource.ResourceDetailView.get_context_data`
         for that.
         """
-        return (
-            super()
-            .get_queryset()
-            .select_related("subject")
-            .prefetch_related("record_set")
-        )
+        return super().get_queryset().select_related("subject")
 
     def get_context_data(self, **kwargs):
-        """Add a list of related ``Record`` instances to the context.
-
-        :meth:`~consumption.views.resource.ResourceDetailView.get_queryset`
-        will optimize the database access, but the list of
-        :class:`~consumption.models.record.Record` instances must still be
-        added to the rendering context.
+        """Add one page of related ``Record`` instances to the context.
+
+        The records are paginated using keyset pagination on
+        ``(timestamp, id)`` (see :class:`~consumption.pagination.KeysetPaginator`),
+        newest first. The page is determined by the ``after`` or ``before``
+        GET parameters, which are the cursors as provided in the context as
+        ``records_next_cursor`` and ``records_previous_cursor``. The requested
+        cursors are provided as ``records_after`` and ``records_before``, to
+        identify the page, e.g. in the key of a cached template fragment.
+
+        The page is cached, bound to the version of the resource (see
+        :mod:`consumption.cache`).
         """
         context = super().get_context_data(**kwargs)
 
         if self.object:
-            context["records"] = self.object.record_set.all()
+            after = self.request.GET.get("after")
+            before = self.request.GET.get("before")
+            paginator = KeysetPaginator(
+                self.object.record_set.all(),
+                ("timestamp", "id"),
+                self.records_per_page,
+            )
+            try:
+                page = get_or_compute(
+                    "records-page",
+                    "resource",
+                    self.object.pk,
+                    lambda: paginator.get_page(after=after, before=before),
+                    self.records_per_page,
+                    after,
+                    before,
+                )
+            except InvalidCursor:
+                raise Http404(_("Invalid page cursor"))
+
+            context["records"] = page.object_list
+            context["records_page"] = page
+            context["records_next_cursor"] = page.next_cursor
+            context["records_previous_cursor"] = page.previous_cursor
+            context["records_after"] = after
+            context["records_before"] = before
 
         return context
 
 
+class ResourceChartDataView(generic.detail.BaseDetailView):
+    """Provide the downsampled series of a :class:`~consumption.models.resource.Resource` as JSON.
+
+    The series is loaded with :func:`consumption.analytics.load_series` and
+    downsampled to at most ``points`` points (GET parameter), using
+    :func:`~consumption.analytics.lttb` (default) or
+    :func:`~consumption.analytics.minmax` (GET parameter ``method``). The
+    payload stays small, regardless of the length of the resource's history.
+
+    The series may be limited to a time range by providing ``from`` and/or
+    ``to`` as GET parameters (ISO 8601, inclusive), which is applied in the
+    database query.
+
+    The response provides ``timestamps`` (seconds since the epoch) and
+    ``readings`` as two arrays of equal length.
+
+    Requires NumPy, see :mod:`consumption.analytics`.
+    """
+
+    model = Resource
+    """Required attribute, determining the model to work on."""
+
+    pk_url_kwarg = "resource_id"
+    """The keyword argument as provided in :mod:`consumption.urls`."""
+
+    default_points = 300
+    """The number of points, if ``points`` is not provided.
+
+    This must not exceed :attr:`max_points`.
+    """
+
+    max_points = 2000
+    """The maximum number of points that may be requested."""
+
+    def get_queryset(self):
+        """Only fetch the fields that are actually required."""
+        return super().get_queryset().only("id", "unit")
+
+    def get_series(self):
+        """Load and downsample the series, as requested by the GET parameters.
+
+        Raises
+        ------
+        ValueError
+            If the GET parameters are invalid.
+        """
+        # app imports
+        from consumption import analytics
+
+        params = self.request.GET
+        points = int(params.get("points", self.default_points))
+        if not 3 <= points <= self.max_points:
+            raise ValueError(
+                "'points' must be between 3 and {}".format(self.max_points)
+            )
+        try:
+            downsample = analytics.DOWNSAMPLING_METHODS[params.get("method", "lttb")]
+        except KeyError:
+            raise ValueError("Unsupported method: {}".format(params["method"]))
+
+        start = parse_timestamp(params["from"]) if params.get("from") else None
+        end = parse_timestamp(params["to"]) if params.get("to") else None
+
+        timestamps, readings = analytics.load_series(self.object.id, start, end)
+        return downsample(timestamps, readings, points)
+
+    def render_to_response(self, context):
+        """Provide the series as JSON, instead of rendering a template."""
+        try:
+            timestamps, readings = self.get_series()
+        except ValueError as err:
+            return JsonResponse({"error": str(err)}, status=400)
+
+        return JsonResponse(
+            {
+                "resource": self.object.id,
+                "unit": self.object.unit,
+                "timestamps": timestamps.tolist(),
+                "readings": readings.tolist(),
+            }
+        )
+
+
+class ResourceSeriesView(ResourceChartDataView):
+    """Provide the series of a :class:`~consumption.models.resource.Resource` as binary payload.
+
+    The payload may be wrapped in typed arrays in the browser without any
+    parsing, see ``static/_src/ts/series.ts``. It consists of (all values
+    little-endian):
+
+        - a header of :data:`SERIES_HEADER_SIZE` bytes: the magic bytes
+          ``CTS1``, the version of the format (``uint8``), the size of a
+          reading in bytes (``uint8``, ``4`` or ``8``), two reserved bytes,
+          the number of points (``uint32``) and four reserved bytes;
+        - the timestamps (seconds since the epoch) as ``float64``;
+        - the readings as ``float32`` or ``float64`` (GET parameter
+          ``dtype``, defaults to ``float32``, which is sufficient for
+          charts, but keeps only about seven significant digits).
+
+    The header keeps both arrays aligned to eight bytes. The GET parameters
+    of :class:`ResourceChartDataView` are supported, with higher limits of
+    ``points``, as the payload is more compact. Series with more points are
+    always downsampled, the complete series of a resource is provided by the
+    exports (see :mod:`consumption.views.export`).
+    """
+
+    default_points = 10000
+    """The number of points, if ``points`` is not provided."""
+
+    max_points = 100000
+    """The maximum number of points that may be requested."""
+
+    dtypes = {"float32": "<f4", "float64": "<f8"}
+    """The supported values of the ``dtype`` GET parameter."""
+
+    def render_to_response(self, context):
+        """Provide the series as binary payload, instead of rendering a template."""
+        dtype = self.request.GET.get("dtype", "float32")
+        try:
+            if dtype not in self.dtypes:
+                raise ValueError("Unsupported dtype: {}".format(dtype))
+            timestamps, readings = self.get_series()
+        except ValueError as err:
+            return JsonResponse({"error": str(err)}, status=400)
+
+        # external imports
+        import numpy as np
+
+        readings = np.asarray(readings, dtype=self.dtypes[dtype])
+        header = struct.pack(
+            SERIES_HEADER_FORMAT,
+            SERIES_MAGIC,
+            SERIES_VERSION,
+            readings.itemsize,
+            len(timestamps),
+        )
+        return HttpResponse(
+            b"".join(
+                (
+                    header,
+                    np.asarray(timestamps, dtype="<f8").tobytes(),
+                    readings.tobytes(),
+                )
+            ),
+            content_type="application/octet-stream",
+        )
+
+
 class ResourceUpdateView(LoginRequiredMixin, generic.UpdateView):
     """Generic class-based view to update :class:`~consumption.models.resource.Resource` objects.
 
@@ -2,13 +2,26 @@
 
 """Views related to the :class:`~consumption.models.subject.Subject` model."""
 
+# Python imports
+from urllib.parse import urlencode
+
 # Django imports
 from django.contrib.auth.mixins import LoginRequiredMixin
+from django.db.models import Count, F, Max, Sum
+from django.db.models.functions import Coalesce
 from django.urls import reverse_lazy
 from django.views import generic
 
 # app imports
+from consumption.cache import (
+    CacheVersionMixin,
+    ConditionalGetMixin,
+    get_or_compute,
+    make_etag,
+)
+from consumption.models.resource import Resource
 from consumption.models.subject import Subject, SubjectForm
+from consumption.utils import period_start
 
 
 class SubjectCreateView(LoginRequiredMixin, generic.CreateView):
@@ -42,9 +55,12 @@ class SubjectCreateView(LoginRequiredMixin, generic.CreateView):
     """Uses the template ``templates/consumption/subject_create.html``."""
 
 
-class SubjectDetailView(generic.DetailView):
+class SubjectDetailView(ConditionalGetMixin, CacheVersionMixin, generic.DetailView):
     """Provide the details of :class:`~consumption.models.subject.Subject` instances.
 
+    Conditional requests are answered with ``304 Not Modified``, see
+    :meth:`get_etag`.
+
     Uses the template ``templates/consumption/subject_detail.html``.
     """
 
@@ -57,9 +73,84 @@ class SubjectDetailView(generic.DetailView):
     pk_url_kwarg = "subject_id"
     """The keyword argument as provided in :mod:`consumption.urls`."""
 
+    dashboard_period = "month"
+    """The period to determine the *current* consumption for.
+
+    See :func:`consumption.utils.period_start` for the supported values.
+    """
+
+    def get_etag(self):
+        """Provide the ``ETag`` of the subject.
+
+        The ``ETag`` is derived from the modification time of the subject,
+        the latest modification time and the number of its resources
+        (fetched with one query) and the start of the dashboard's period.
+        """
+        summary = (
+            Subject.objects.filter(pk=self.kwargs[self.pk_url_kwarg])
+            .annotate(latest=Max("resource__modified"), resources=Count("resource"))
+            .values_list("modified", "latest", "resources")
+            .first()
+        )
+        if summary is None:
+            return None
+        return make_etag(period_start(self.dashboard_period).isoformat(), *summary)
+
+    def get_resources(self, since):
+        """Provide the overview of all resources of the subject.
+
+        The overview is fetched with one single query, see
+        :meth:`ResourceQuerySet.with_summary() <consumption.models.resource.ResourceQuerySet.with_summary>`.
+        """
+        return list(
+            Resource.objects.filter(subject=self.object)
+            .with_summary(since)
+            .order_by("name")
+            .values(
+                "id",
+                "name",
+                "unit",
+                "last_reading",
+                "last_timestamp",
+                "record_count",
+                "consumption",
+            )
+        )
+
+    def get_context_data(self, **kwargs):
+        """Add the overview of the subject's resources to the context.
+
+        The overview is cached, bound to the version of the subject (see
+        :mod:`consumption.cache`).
+        """
+        context = super().get_context_data(**kwargs)
+
+        since = period_start(self.dashboard_period)
+        context["resources"] = get_or_compute(
+            "dashboard",
+            "subject",
+            self.object.pk,
+            lambda: self.get_resources(since),
+            since.isoformat(),
+        )
+        context["period_start"] = since
+
+        return context
+
 
 class SubjectListView(generic.ListView):
-    """Provide a list of :class:`~consumption.models.subject.Subject` instances.
+    """Provide a paginated list of :class:`~consumption.models.subject.Subject` instances.
+
+    Every subject is annotated with the number of its resources
+    (``resource_count``), the total number of their records
+    (``record_total``, from the denormalized
+    :attr:`Resource.record_count <consumption.models.resource.Resource.record_count>`)
+    and the timestamp of its latest record (``last_activity``), all with one
+    single query per page.
+
+    The list may be filtered by a prefix of the name (GET parameter ``q``,
+    case-sensitive, so it is backed by the index of ``name``) and sorted by
+    one of :attr:`orderings` (GET parameter ``sort``).
 
     Uses the template ``templates/consumption/subject_list.html``.
     """
@@ -70,6 +161,81 @@ class SubjectListView(generic.ListView):
     context_object_name = "subject_list"
     """Provide a semantic name for the built-in context."""
 
+    paginate_by = 50
+    """The number of subjects per page."""
+
+    orderings = {
+        "name": ("name", "id"),
+        "-name": ("-name", "-id"),
+        "resources": ("resource_count", "id"),
+        "-resources": ("-resource_count", "id"),
+        "records": ("record_total", "id"),
+        "-records": ("-record_total", "id"),
+        "activity": (F("last_activity").asc(nulls_first=True), "id"),
+        "-activity": (F("last_activity").desc(nulls_last=True), "id"),
+    }
+    """The supported values of the ``sort`` GET parameter.
+
+    Only the orderings by name are backed by an index, the others have to
+    aggregate all (matching) subjects.
+    """
+
+    default_ordering = "name"
+    """The ordering, if no (or an unsupported) ``sort`` is provided."""
+
+    def get_search(self):
+        """Return the stripped ``q`` GET parameter."""
+        return self.request.GET.get("q", "").strip()
+
+    def get_ordering(self):
+        """Return the key of :attr:`orderings` as provided by the GET parameter ``sort``."""
+        ordering = self.request.GET.get("sort", self.default_ordering)
+        return ordering if ordering in self.orderings else self.default_ordering
+
+    def get_filtered_queryset(self):
+        """Return the subjects matching the search, without annotations."""
+        queryset = Subject.objects.all()
+        search = self.get_search()
+        if search:
+            # the range is backed by the index, startswith() ensures the prefix
+            queryset = queryset.filter(
+                name__gte=search,
+                name__lt=search + "\U0010ffff",
+                name__startswith=search,
+            )
+        return queryset
+
+    def get_queryset(self):
+        """Annotate and order the subjects."""
+        return (
+            self.get_filtered_queryset()
+            .annotate(
+                resource_count=Count("resource", distinct=True),
+                record_total=Coalesce(Sum("resource__record_count"), 0),
+                last_activity=Max("resource__last_timestamp"),
+            )
+            .order_by(*self.orderings[self.get_ordering()])
+        )
+
+    def get_paginator(self, queryset, *args, **kwargs):
+        """Count the subjects without the (expensive) annotations."""
+        paginator = super().get_paginator(queryset, *args, **kwargs)
+        paginator.count = self.get_filtered_queryset().count()
+        return paginator
+
+    def get_context_data(self, **kwargs):
+        """Add the search, the ordering and the query string for page links."""
+        context = super().get_context_data(**kwargs)
+
+        params = {"sort": self.get_ordering()}
+        if self.get_search():
+            params["q"] = self.get_search()
+        context["search"] = self.get_search()
+        context["ordering"] = params["sort"]
+        context["page_query"] = urlencode(params)
+
+        return context
+
 
 class SubjectUpdateView(LoginRequiredMixin, generic.UpdateView):
     """Generic class-based view to update :class:`~consumption.models.subject.Subject` objects.
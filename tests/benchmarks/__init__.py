@@ -0,0 +1,7 @@
+# SPDX-License-Identifier: MIT
+
+"""Contains benchmarks, that are not part of the regular test suite.
+
+The benchmarks are plain scripts, to be run as modules from the project's
+root directory, e.g. ``python -m tests.benchmarks.record_index``.
+"""
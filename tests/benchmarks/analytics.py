@@ -0,0 +1,169 @@
+#!/usr/bin/env python
+
+# SPDX-License-Identifier: MIT
+
+"""Benchmark :mod:`consumption.analytics` against a pure-Python baseline.
+
+The benchmark generates a synthetic series of readings (one reading every
+15 minutes) and times every calculation of the module against an equivalent
+implementation, that loops over the readings in Python.
+
+Usage::
+
+    python -m tests.benchmarks.analytics --points 1000000
+
+The results are written to stdout as JSON.
+"""
+
+# Python imports
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+# Django imports
+import django
+
+# external imports
+import numpy as np
+
+
+def python_deltas(readings):
+    """Provide the baseline of :func:`~consumption.analytics.deltas`."""
+    return [b - a for a, b in zip(readings, readings[1:])]
+
+
+def python_rates(timestamps, readings, per):
+    """Provide the baseline of :func:`~consumption.analytics.rates`."""
+    result = []
+    for i in range(1, len(readings)):
+        duration = timestamps[i] - timestamps[i - 1]
+        result.append(
+            (readings[i] - readings[i - 1]) / duration * per if duration else None
+        )
+    return result
+
+
+def python_rolling_mean(values, window):
+    """Provide the baseline of :func:`~consumption.analytics.rolling_mean`."""
+    result = []
+    total = sum(values[:window])
+    result.append(total / window)
+    for i in range(window, len(values)):
+        total += values[i] - values[i - window]
+        result.append(total / window)
+    return result
+
+
+def python_cumulative(values):
+    """Provide the baseline of :func:`~consumption.analytics.cumulative`."""
+    result = []
+    total = 0.0
+    for value in values:
+        total += value
+        result.append(total)
+    return result
+
+
+def python_period_totals(timestamps, readings, edges):
+    """Provide the baseline of :func:`~consumption.analytics.period_totals`."""
+    values = []
+    i = 0
+    for edge in edges:
+        while i < len(timestamps) - 1 and timestamps[i + 1] < edge:
+            i += 1
+        span = timestamps[i + 1] - timestamps[i]
+        values.append(
+            readings[i]
+            + (readings[i + 1] - readings[i]) * (edge - timestamps[i]) / span
+        )
+    return [b - a for a, b in zip(values, values[1:])]
+
+
+def measure(func, repeat):
+    """Return the best wall time of ``repeat`` runs of ``func`` in milliseconds."""
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - started) * 1000)
+    return round(min(timings), 3)
+
+
+def main(num_points, repeat):
+    """Run the benchmark and return the results."""
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "tests.util.settings_test")
+    django.setup()
+
+    # app imports
+    from consumption import analytics
+
+    rng = random.Random(42)
+    start = 946684800.0  # 2000-01-01
+    timestamps = [start + i * 900.0 for i in range(num_points)]
+    readings = []
+    reading = 0.0
+    for _ in range(num_points):
+        reading += rng.random()
+        readings.append(reading)
+    # monthly (30 days) edges, inside of the series
+    edges = [start + i * 30 * 86400.0 for i in range(1, int(num_points / 2880))]
+
+    ts_array = np.array(timestamps)
+    rd_array = np.array(readings)
+    deltas = python_deltas(readings)
+    delta_array = np.array(deltas)
+
+    cases = {
+        "deltas": (
+            lambda: python_deltas(readings),
+            lambda: analytics.deltas(rd_array),
+        ),
+        "rates_per_hour": (
+            lambda: python_rates(timestamps, readings, 3600),
+            lambda: analytics.rates(ts_array, rd_array, analytics.SECONDS_PER_HOUR),
+        ),
+        "rolling_mean_96": (
+            lambda: python_rolling_mean(deltas, 96),
+            lambda: analytics.rolling_mean(delta_array, 96),
+        ),
+        "cumulative": (
+            lambda: python_cumulative(deltas),
+            lambda: analytics.cumulative(delta_array),
+        ),
+        "period_totals": (
+            lambda: python_period_totals(timestamps, readings, edges),
+            lambda: analytics.period_totals(ts_array, rd_array, edges),
+        ),
+    }
+
+    results = {}
+    for name, (baseline, vectorized) in cases.items():
+        python_ms = measure(baseline, repeat)
+        numpy_ms = measure(vectorized, repeat)
+        results[name] = {
+            "python": python_ms,
+            "numpy": numpy_ms,
+            "speedup": round(python_ms / numpy_ms, 1) if numpy_ms else None,
+        }
+
+    return {
+        "benchmark": "analytics",
+        "points": num_points,
+        "unit": "ms",
+        "results": results,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Benchmark consumption.analytics against pure Python"
+    )
+    parser.add_argument("--points", default=1000000, type=int)
+    parser.add_argument("--repeat", default=3, type=int)
+    options = parser.parse_args()
+
+    json.dump(main(options.points, options.repeat), sys.stdout, indent=2)
+    sys.stdout.write("\n")
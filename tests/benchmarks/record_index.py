@@ -0,0 +1,177 @@
+#!/usr/bin/env python
+
+# SPDX-License-Identifier: MIT
+
+"""Benchmark the composite ``(resource, timestamp)`` index of ``Record``.
+
+The benchmark populates a temporary SQLite database with the schema as it
+was *before* the index was introduced, times the queries issued by
+:class:`~consumption.views.resource.ResourceDetailView` and some range
+queries, then applies the remaining migrations and repeats the timing.
+
+Usage::
+
+    python -m tests.benchmarks.record_index --records 1000000 --resources 10
+
+The results are written to stdout as JSON.
+"""
+
+# Python imports
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+# Django imports
+import django
+from django.conf import settings
+
+MIGRATION_BEFORE = "0004_alter_record_options"
+"""The last migration without the composite index."""
+
+
+def setup(db_name):
+    """Configure Django to use a dedicated SQLite database."""
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "tests.util.settings_test")
+    settings.DATABASES["default"]["NAME"] = db_name
+    django.setup()
+
+
+def populate(apps, num_records, num_resources, batch_size=10000):
+    """Create ``num_records`` records, evenly distributed over the resources.
+
+    Each resource gets one reading every 15 minutes. The historical models
+    of ``apps`` are used, as the schema is the one of
+    :data:`MIGRATION_BEFORE`, not the current one.
+
+    Returns the ``id`` of one resource and the time range of its records.
+    """
+    Record = apps.get_model("consumption", "Record")
+    Resource = apps.get_model("consumption", "Resource")
+    Subject = apps.get_model("consumption", "Subject")
+
+    subject = Subject.objects.create(name="Benchmark")
+    resources = Resource.objects.bulk_create(
+        [
+            Resource(name="Meter {}".format(i), subject=subject, unit="kWh")
+            for i in range(num_resources)
+        ]
+    )
+
+    per_resource = num_records // num_resources
+    start = datetime(2000, 1, 1)
+    step = timedelta(minutes=15)
+    for resource in resources:
+        for offset in range(0, per_resource, batch_size):
+            Record.objects.bulk_create(
+                [
+                    Record(
+                        resource=resource, reading=float(i), timestamp=start + i * step
+                    )
+                    for i in range(offset, min(offset + batch_size, per_resource))
+                ]
+            )
+
+    return resources[len(resources) // 2].pk, start, start + per_resource * step
+
+
+def measure(func, repeat):
+    """Return the best wall time of ``repeat`` runs of ``func`` in milliseconds."""
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - started) * 1000)
+    return round(min(timings), 3)
+
+
+def run_queries(apps, resource_id, first, last, repeat):
+    """Time the relevant queries for one resource."""
+    Record = apps.get_model("consumption", "Record")
+
+    records = Record.objects.filter(resource_id=resource_id)
+    middle = first + (last - first) / 2
+    one_month = timedelta(days=30)
+
+    return {
+        "latest_page": measure(
+            lambda: list(records.order_by("-timestamp", "-id")[:50]), repeat
+        ),
+        "deep_page": measure(
+            lambda: list(
+                records.filter(timestamp__lt=middle).order_by("-timestamp", "-id")[:50]
+            ),
+            repeat,
+        ),
+        "range_month": measure(
+            lambda: list(
+                records.filter(
+                    timestamp__range=(middle, middle + one_month)
+                ).values_list("timestamp", "reading")
+            ),
+            repeat,
+        ),
+        "range_month_count": measure(
+            lambda: records.filter(
+                timestamp__range=(middle, middle + one_month)
+            ).count(),
+            repeat,
+        ),
+    }
+
+
+def main(num_records, num_resources, repeat):
+    """Run the benchmark and return the results."""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        setup(os.path.join(tmp_dir, "benchmark.sqlite3"))
+
+        # Django imports
+        from django.apps import apps
+        from django.core.management import call_command
+        from django.db import connection
+        from django.db.migrations.loader import MigrationLoader
+
+        call_command("migrate", verbosity=0)
+        call_command("migrate", "consumption", MIGRATION_BEFORE, verbosity=0)
+        historical = (
+            MigrationLoader(connection)
+            .project_state(("consumption", MIGRATION_BEFORE))
+            .apps
+        )
+
+        started = time.perf_counter()
+        resource_id, first, last = populate(historical, num_records, num_resources)
+        populate_time = round(time.perf_counter() - started, 3)
+
+        before = run_queries(historical, resource_id, first, last, repeat)
+        call_command("migrate", "consumption", verbosity=0)
+        after = run_queries(apps, resource_id, first, last, repeat)
+
+    return {
+        "benchmark": "record_index",
+        "vendor": "sqlite",
+        "records": num_records,
+        "resources": num_resources,
+        "populate_s": populate_time,
+        "unit": "ms",
+        "before": before,
+        "after": after,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Benchmark the (resource, timestamp) index of Record"
+    )
+    parser.add_argument("--records", default=1000000, type=int)
+    parser.add_argument("--resources", default=10, type=int)
+    parser.add_argument("--repeat", default=5, type=int)
+    options = parser.parse_args()
+
+    json.dump(
+        main(options.records, options.resources, options.repeat), sys.stdout, indent=2
+    )
+    sys.stdout.write("\n")
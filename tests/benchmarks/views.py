@@ -0,0 +1,196 @@
+#!/usr/bin/env python
+
+# SPDX-License-Identifier: MIT
+
+"""Benchmark all views of :mod:`consumption.urls` at several data sizes.
+
+For every data size, a temporary SQLite database is populated with the
+``consumption_generate`` management command. Then every URL of the app is
+requested with ``GET`` by a logged in user, measuring the wall time and the
+number of database queries, once with an empty cache (``cold``) and
+repeatedly with a populated cache (``warm``, best of ``--repeat`` runs).
+
+Usage::
+
+    python -m tests.benchmarks.views --sizes 100,1000,10000
+
+The sizes are the number of records per resource. The results are written to
+stdout as JSON, keyed by data size and URL pattern, so they may be compared
+between releases.
+"""
+
+# Python imports
+import argparse
+import io
+import json
+import os
+import sys
+import tempfile
+import time
+
+# Django imports
+import django
+from django.conf import settings
+
+
+def setup(db_name):
+    """Configure Django to use a dedicated SQLite database."""
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "tests.util.settings_test")
+    settings.DATABASES["default"]["NAME"] = db_name
+    django.setup()
+
+    # Django imports
+    from django.test.utils import setup_test_environment
+
+    # provides the ``testserver`` host to the test client
+    setup_test_environment()
+
+
+def get_urls():
+    """Return the ``(pattern, url)`` of every view of :mod:`consumption.urls`.
+
+    The URL parameters are filled with objects from the middle of the
+    generated data.
+    """
+    # Django imports
+    from django.urls import reverse
+
+    # app imports
+    from consumption.models import Record, Resource, Subject
+    from consumption.urls import app_name, urlpatterns
+
+    subject = Subject.objects.order_by("id")[Subject.objects.count() // 2]
+    resource = Resource.objects.filter(subject=subject).order_by("id").first()
+    record = Record.objects.filter(resource=resource).order_by("-timestamp").first()
+    values = {
+        "subject_id": subject.id,
+        "resource_id": resource.id,
+        "record_id": record.id,
+        "export_format": "csv",
+    }
+
+    urls = []
+    for pattern in urlpatterns:
+        kwargs = {name: values[name] for name in pattern.pattern.converters}
+        urls.append(
+            (
+                str(pattern.pattern),
+                reverse("{}:{}".format(app_name, pattern.name), kwargs=kwargs),
+            )
+        )
+    return urls
+
+
+def request(client, url):
+    """Request ``url`` and return the status, the wall time and the queries.
+
+    Streaming responses are consumed completely.
+    """
+    # Django imports
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    with CaptureQueriesContext(connection) as queries:
+        started = time.perf_counter()
+        response = client.get(url)
+        if response.streaming:
+            for _ in response.streaming_content:
+                pass
+        duration = (time.perf_counter() - started) * 1000
+    return response.status_code, round(duration, 3), len(queries.captured_queries)
+
+
+def run_size(size, num_subjects, num_resources, repeat):
+    """Populate the database with ``size`` records per resource and time all views."""
+    # Django imports
+    from django.contrib.auth import get_user_model
+    from django.core.management import call_command
+    from django.test import Client
+
+    # app imports
+    from consumption.cache import get_cache
+
+    call_command("flush", interactive=False, verbosity=0)
+    started = time.perf_counter()
+    call_command(
+        "consumption_generate",
+        subjects=num_subjects,
+        resources=num_resources,
+        records=size,
+        stdout=io.StringIO(),
+    )
+    populate_time = round(time.perf_counter() - started, 3)
+
+    client = Client()
+    client.force_login(
+        get_user_model().objects.create_user("benchmark", password="benchmark")
+    )
+
+    views = {}
+    for pattern, url in get_urls():
+        get_cache().clear()
+        status, cold, cold_queries = request(client, url)
+        warm = [request(client, url) for _ in range(repeat)]
+        views[pattern] = {
+            "url": url,
+            "status": status,
+            "cold_ms": cold,
+            "cold_queries": cold_queries,
+            "warm_ms": min(duration for _, duration, _ in warm),
+            "warm_queries": max(queries for _, _, queries in warm),
+        }
+
+    return {"populate_s": populate_time, "views": views}
+
+
+def main(sizes, num_subjects, num_resources, repeat):
+    """Run the benchmark and return the results."""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        setup(os.path.join(tmp_dir, "benchmark.sqlite3"))
+
+        # Django imports
+        from django.core.management import call_command
+
+        call_command("migrate", verbosity=0)
+
+        results = {
+            str(size): run_size(size, num_subjects, num_resources, repeat)
+            for size in sizes
+        }
+
+    return {
+        "benchmark": "views",
+        "vendor": "sqlite",
+        "django": django.get_version(),
+        "subjects": num_subjects,
+        "resources_per_subject": num_resources,
+        "unit": "ms",
+        "sizes": results,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Benchmark all views of the app at several data sizes"
+    )
+    parser.add_argument(
+        "--sizes",
+        default="100,1000,10000",
+        help="Comma-separated numbers of records per resource.",
+    )
+    parser.add_argument("--subjects", default=5, type=int)
+    parser.add_argument("--resources", default=5, type=int)
+    parser.add_argument("--repeat", default=3, type=int)
+    options = parser.parse_args()
+
+    json.dump(
+        main(
+            [int(size) for size in options.sizes.split(",")],
+            options.subjects,
+            options.resources,
+            options.repeat,
+        ),
+        sys.stdout,
+        indent=2,
+    )
+    sys.stdout.write("\n")
@@ -0,0 +1,91 @@
+# SPDX-License-Identifier: MIT
+
+"""Verify the interpolation of readings of :mod:`consumption.analytics`."""
+
+# Python imports
+import tempfile
+from datetime import datetime, timedelta
+
+# Django imports
+from django.test import TestCase, override_settings
+
+# external imports
+import numpy as np
+
+# app imports
+from consumption import analytics, archive
+from consumption.models import Record, Resource, Subject
+
+START = datetime(2026, 1, 1)
+"""The timestamp of the first reading."""
+
+STEP = timedelta(hours=6)
+"""The interval between two readings."""
+
+
+class InterpolateReadingsTest(TestCase):
+    """Readings are interpolated between the bracketing records."""
+
+    @classmethod
+    def setUpTestData(cls):
+        subject = Subject.objects.create(name="Household")
+        cls.resources = Resource.objects.bulk_create(
+            [
+                Resource(name="Meter {}".format(index), subject=subject, unit="kWh")
+                for index in range(3)
+            ]
+        )
+        Record.objects.bulk_create(
+            [
+                Record(
+                    resource=resource,
+                    timestamp=START + index * STEP,
+                    reading=factor * index * 10.0,
+                )
+                for factor, resource in enumerate(cls.resources, start=1)
+                for index in range(400)
+            ]
+        )
+
+    def expected(self, targets):
+        """Interpolate with the complete series, as loaded by ``load_series()``."""
+        epochs = [analytics.to_epoch(target) for target in targets]
+        return np.array(
+            [
+                analytics.readings_at(*analytics.load_series(resource), epochs)
+                for resource in self.resources
+            ]
+        )
+
+    def test_many_targets(self):
+        """Thousands of targets do not exceed the columns of a query."""
+        targets = [
+            START - STEP + index * timedelta(minutes=37) for index in range(2000)
+        ]
+
+        resource_ids, readings = analytics.interpolate_readings(self.resources, targets)
+
+        self.assertEqual(resource_ids.tolist(), [r.pk for r in self.resources])
+        self.assertEqual(readings.shape, (3, 2000))
+        np.testing.assert_allclose(readings, self.expected(targets))
+        # targets before the first reading
+        self.assertTrue(np.isnan(readings[:, 0]).all())
+
+    def test_archived_records(self):
+        """Archived periods are interpolated from the archive."""
+        targets = [START + timedelta(days=days, hours=1) for days in (1, 30, 60, 99)]
+        expected = self.expected(targets)
+
+        with tempfile.TemporaryDirectory() as archive_dir:
+            with override_settings(CONSUMPTION_ARCHIVE_DIR=archive_dir):
+                for resource in self.resources:
+                    archive.archive(resource, START + timedelta(days=45))
+
+                _, readings = analytics.interpolate_readings(self.resources, targets)
+                # a billing period spanning archived and current records
+                _, consumed = analytics.consumption_between(
+                    self.resources, targets[1], targets[2]
+                )
+
+        np.testing.assert_allclose(readings, expected)
+        np.testing.assert_allclose(consumed, expected[:, 2] - expected[:, 1])
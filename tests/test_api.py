@@ -0,0 +1,181 @@
+# SPDX-License-Identifier: MIT
+
+"""Verify the app's JSON API."""
+
+# Python imports
+import json
+
+# Django imports
+from django.core.exceptions import ImproperlyConfigured
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+# app imports
+from consumption.api.ingest import (
+    _RESERVED,
+    IDEMPOTENCY_RESERVATION_TIMEOUT,
+    _idempotency_cache_key,
+)
+from consumption.cache import get_cache
+from consumption.models import Record, Resource, Subject
+
+
+@override_settings(CONSUMPTION_INGEST_TOKENS=["secret"])
+class IngestApiTest(TestCase):
+    """Push readings to ``consumption-api:ingest``."""
+
+    def setUp(self):
+        get_cache().clear()
+        self.resource = Resource.objects.create(
+            name="Electricity",
+            subject=Subject.objects.create(name="Household"),
+            unit="kWh",
+        )
+        self.url = reverse("consumption-api:ingest")
+
+    def post(self, body, token="secret", **headers):
+        """Post ``body`` (JSON encoded, unless it is a string)."""
+        if not isinstance(body, str):
+            body = json.dumps(body)
+        if token is not None:
+            headers["HTTP_AUTHORIZATION"] = "Bearer {}".format(token)
+        return self.client.post(
+            self.url, body, content_type="application/json", **headers
+        )
+
+    def readings(self, *readings):
+        """Return a body with ``readings`` of the resource."""
+        return {
+            "readings": [
+                [self.resource.pk, "2026-01-01T{:02d}:00:00".format(hour), reading]
+                for hour, reading in enumerate(readings)
+            ]
+        }
+
+    def test_valid(self):
+        """Valid readings are written."""
+        response = self.post(self.readings(1.5, 2.5))
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json(), {"received": 2, "accepted": 2})
+        self.assertEqual(Record.objects.count(), 2)
+
+    def test_invalid_token(self):
+        """Requests without a valid token are rejected."""
+        for token in (None, "", "wrong", "secre"):
+            with self.subTest(token=token):
+                response = self.post(self.readings(1.5), token=token)
+
+                self.assertEqual(response.status_code, 401)
+                self.assertEqual(response["WWW-Authenticate"], "Bearer")
+        self.assertFalse(Record.objects.exists())
+
+    @override_settings(CONSUMPTION_INGEST_TOKENS="secret")
+    def test_string_tokens(self):
+        """A string is not accepted as list of tokens."""
+        with self.assertRaises(ImproperlyConfigured):
+            self.post(self.readings(1.5), token="s")
+
+    def test_malformed_body(self):
+        """Bodies, that are not a JSON object with a list of readings, are
+        rejected."""
+        for body in ("{", "[]", '"readings"', "1", "{}", '{"readings": {}}'):
+            with self.subTest(body=body):
+                self.assertEqual(self.post(body).status_code, 400)
+
+    def test_non_finite_reading(self):
+        """Readings, that are not finite numbers, are rejected."""
+        for reading in ("NaN", "Infinity", "-Infinity"):
+            with self.subTest(reading=reading):
+                response = self.post(
+                    '{{"readings": [[{}, "2026-01-01T12:00:00", {}]]}}'.format(
+                        self.resource.pk, reading
+                    )
+                )
+
+                self.assertEqual(response.status_code, 400)
+                self.assertEqual(response.json()["errors"][0]["index"], 0)
+        self.assertFalse(Record.objects.exists())
+
+    @override_settings(DATA_UPLOAD_MAX_MEMORY_SIZE=100)
+    def test_body_too_large(self):
+        """Bodies larger than ``DATA_UPLOAD_MAX_MEMORY_SIZE`` are rejected."""
+        response = self.post(self.readings(*range(10)))
+
+        self.assertEqual(response.status_code, 413)
+        self.assertFalse(Record.objects.exists())
+
+    @override_settings(CONSUMPTION_INGEST_MAX_READINGS=2)
+    def test_too_many_readings(self):
+        """Requests with more than the maximum number of readings are
+        rejected."""
+        self.assertEqual(self.post(self.readings(1, 2, 3)).status_code, 413)
+
+    def test_idempotent_replay(self):
+        """Retries with the same ``Idempotency-Key`` return the stored
+        response."""
+        first = self.post(self.readings(1.5), HTTP_IDEMPOTENCY_KEY="batch-1")
+        Record.objects.all().delete()
+        replay = self.post(self.readings(1.5), HTTP_IDEMPOTENCY_KEY="batch-1")
+
+        self.assertEqual(replay.status_code, 201)
+        self.assertEqual(replay["Idempotent-Replayed"], "true")
+        self.assertEqual(replay.json(), first.json())
+        self.assertFalse(Record.objects.exists())
+
+        other = self.post(self.readings(1.5), HTTP_IDEMPOTENCY_KEY="batch-2")
+        self.assertFalse(other.has_header("Idempotent-Replayed"))
+        self.assertEqual(Record.objects.count(), 1)
+
+    def test_idempotency_key_in_progress(self):
+        """A request is rejected, while another one with the same key is
+        processed."""
+        get_cache().add(
+            _idempotency_cache_key(b"secret", "batch-1"),
+            _RESERVED,
+            IDEMPOTENCY_RESERVATION_TIMEOUT,
+        )
+
+        response = self.post(self.readings(1.5), HTTP_IDEMPOTENCY_KEY="batch-1")
+
+        self.assertEqual(response.status_code, 409)
+        self.assertFalse(Record.objects.exists())
+
+    def test_failed_request_releases_key(self):
+        """The ``Idempotency-Key`` of a rejected request may be used again."""
+        invalid = self.post(
+            {"readings": [[self.resource.pk + 1, "2026-01-01T12:00:00", 1.5]]},
+            HTTP_IDEMPOTENCY_KEY="batch-1",
+        )
+        retry = self.post(self.readings(1.5), HTTP_IDEMPOTENCY_KEY="batch-1")
+
+        self.assertEqual(invalid.status_code, 400)
+        self.assertEqual(retry.status_code, 201)
+        self.assertEqual(Record.objects.count(), 1)
+
+
+class FieldSelectionTest(TestCase):
+    """Select the fields of the API's responses with ``?fields=``."""
+
+    def setUp(self):
+        self.subject = Subject.objects.create(name="Household")
+        self.list_url = reverse("consumption-api:subject-list")
+        self.detail_url = reverse(
+            "consumption-api:subject-detail", args=[self.subject.pk]
+        )
+
+    def test_selected_fields(self):
+        """Only the selected fields are provided."""
+        response = self.client.get(self.detail_url, {"fields": "name"})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {"name": "Household"})
+
+    def test_empty_selection(self):
+        """Requests selecting no field at all are rejected."""
+        for url in (self.list_url, self.detail_url):
+            for fields in ("", ",", " , "):
+                with self.subTest(url=url, fields=fields):
+                    response = self.client.get(url, {"fields": fields})
+
+                    self.assertEqual(response.status_code, 400)
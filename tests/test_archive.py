@@ -0,0 +1,112 @@
+# SPDX-License-Identifier: MIT
+
+"""Verify the archive of records, see :mod:`consumption.archive`."""
+
+# Python imports
+import os
+import tempfile
+from datetime import datetime, timedelta
+from unittest import mock
+
+# Django imports
+from django.test import TestCase, override_settings
+
+# external imports
+import numpy as np
+
+# app imports
+from consumption import archive
+from consumption.analytics import load_series
+from consumption.bulk import write_records
+from consumption.models import Record, Resource, Subject
+
+START = datetime(2026, 1, 1)
+"""The timestamp of the first reading."""
+
+
+class ArchiveTest(TestCase):
+    """Archived records are moved out of the database, but not lost."""
+
+    def setUp(self):
+        self.subject = Subject.objects.create(name="Household")
+        self.resource = Resource.objects.create(
+            name="Electricity", subject=self.subject, unit="kWh"
+        )
+        # a cumulative meter, read every 15 minutes for 20 days
+        self.write(
+            (START + index * timedelta(minutes=15), index * 0.25)
+            for index in range(20 * 96)
+        )
+        archive_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(archive_dir.cleanup)
+        settings = override_settings(CONSUMPTION_ARCHIVE_DIR=archive_dir.name)
+        settings.enable()
+        self.addCleanup(settings.disable)
+
+    def write(self, readings):
+        """Write ``(timestamp, reading)`` tuples through the app."""
+        with self.captureOnCommitCallbacks(execute=True):
+            write_records(
+                [
+                    Record(resource=self.resource, timestamp=timestamp, reading=reading)
+                    for timestamp, reading in readings
+                ]
+            )
+
+    def archive(self, days):
+        """Archive the records of the first ``days`` days."""
+        with self.captureOnCommitCallbacks(execute=True):
+            return archive.archive(self.resource, START + timedelta(days=days))
+
+    def snapshot(self):
+        """Return everything, that should not be affected by archiving."""
+        self.resource.refresh_from_db()
+        return {
+            "series": [values.tolist() for values in load_series(self.resource)],
+            "consumption": list(Record.objects.consumption_by("day")),
+            "summary": Resource.objects.with_summary(START + timedelta(days=3))
+            .values("first_timestamp", "last_timestamp", "consumption")
+            .get(),
+        }
+
+    def test_archive(self):
+        """Only the skeleton of archived days remains in the database."""
+        expected = self.snapshot()
+
+        self.assertEqual(self.archive(5), 5 * 96)
+
+        self.assertEqual(
+            Record.objects.filter(timestamp__lt=START + timedelta(days=5)).count(),
+            5 * 2,
+        )
+        self.assertEqual(self.snapshot(), expected)
+        # archiving is idempotent
+        self.assertEqual(self.archive(5), 0)
+
+    def test_segments(self):
+        """Every run appends to the archive, instead of rewriting it."""
+        with mock.patch.object(archive, "ARCHIVE_SEGMENT_SIZE", 96 * 3):
+            self.archive(2)
+            self.archive(3)
+            self.archive(6)
+
+        directory = archive.resource_dir(self.resource.pk)
+        # the first segment was extended, then a new one was started
+        self.assertEqual(sorted(os.listdir(directory)), ["000002.npy", "000003.npy"])
+        self.assertEqual(len(archive.load(self.resource.pk)), 6 * 96)
+
+    def test_late_records(self):
+        """Records written after archiving their day are included."""
+        self.archive(5)
+        late = START + timedelta(days=2, minutes=5)
+        self.write([(late, 48.1)])
+        expected = self.snapshot()
+
+        timestamps, readings = load_series(self.resource)
+        self.assertEqual(
+            readings[np.searchsorted(timestamps, timestamps[0] + 2 * 86400 + 300)],
+            48.1,
+        )
+        self.assertEqual(self.archive(5), 1)
+        self.assertEqual(self.snapshot(), expected)
+        self.assertFalse(Record.objects.filter(timestamp=late).exists())
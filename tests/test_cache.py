@@ -0,0 +1,163 @@
+# SPDX-License-Identifier: MIT
+
+"""Verify that cached pages are never served stale."""
+
+# Python imports
+from datetime import datetime
+
+# Django imports
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+# app imports
+from consumption.bulk import ON_CONFLICT_UPDATE, write_records
+from consumption.cache import get_cache
+from consumption.models import Record, Resource, Subject
+from consumption.pagination import encode_cursor
+
+
+class CachedDetailViewsTest(TestCase):
+    """The cached parts of the detail views reflect every modification.
+
+    The cache versions are replaced once the modifying transaction is
+    committed, so the modifications are performed within
+    ``captureOnCommitCallbacks(execute=True)``.
+    """
+
+    def setUp(self):
+        get_cache().clear()
+        self.subject = Subject.objects.create(name="Household")
+        self.resource = Resource.objects.create(
+            name="Electricity", subject=self.subject, unit="kWh"
+        )
+        self.record = Record.objects.create(
+            resource=self.resource, timestamp=datetime(2026, 1, 1, 12), reading=100.5
+        )
+        Resource.objects.filter(pk=self.resource.pk).refresh_summary()
+        self.resource_url = reverse(
+            "consumption:resource-detail", args=[self.resource.pk]
+        )
+        self.subject_url = reverse("consumption:subject-detail", args=[self.subject.pk])
+
+    def test_new_record(self):
+        """Records written in bulk show up on both pages."""
+        self.assertNotContains(self.client.get(self.resource_url), "234.5")
+        self.assertNotContains(self.client.get(self.subject_url), "234.5")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            write_records(
+                [
+                    Record(
+                        resource=self.resource,
+                        timestamp=datetime(2026, 1, 2, 12),
+                        reading=234.5,
+                    )
+                ]
+            )
+
+        self.assertContains(self.client.get(self.resource_url), "234.5")
+        self.assertContains(self.client.get(self.subject_url), "234.5")
+
+    def test_updated_record(self):
+        """Records updated through the app show up on the resource's page."""
+        self.client.force_login(get_user_model().objects.create_user("user"))
+        self.assertContains(self.client.get(self.resource_url), "100.5")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                reverse("consumption:record-update", args=[self.record.pk]),
+                {
+                    "resource": self.resource.pk,
+                    "timestamp": "2026-01-01 12:00:00",
+                    "reading": "150.25",
+                },
+            )
+        self.assertEqual(response.status_code, 302)
+
+        response = self.client.get(self.resource_url)
+        self.assertContains(response, "150.25")
+        self.assertNotContains(response, "100.5")
+
+    def test_renamed_resource(self):
+        """A renamed resource shows up on its subject's page."""
+        self.assertContains(self.client.get(self.subject_url), "Electricity")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.resource.name = "Power"
+            self.resource.save()
+
+        response = self.client.get(self.subject_url)
+        self.assertContains(response, "Power")
+        self.assertNotContains(response, "Electricity")
+
+    def test_conditional_get(self):
+        """Conditional requests are answered by the ``ETag`` only."""
+        response = self.client.get(self.resource_url)
+        self.assertNotIn("Last-Modified", response)
+        etag = response["ETag"]
+        self.assertEqual(
+            self.client.get(self.resource_url, HTTP_IF_NONE_MATCH=etag).status_code,
+            304,
+        )
+
+        # a backfilled reading, older than the latest one
+        with self.captureOnCommitCallbacks(execute=True):
+            write_records(
+                [
+                    Record(
+                        resource=self.resource,
+                        timestamp=datetime(2025, 12, 31, 12),
+                        reading=80.75,
+                    )
+                ]
+            )
+
+        self.assertEqual(
+            self.client.get(self.resource_url, HTTP_IF_NONE_MATCH=etag).status_code,
+            200,
+        )
+        # the latest reading did not change
+        response = self.client.get(
+            self.resource_url, HTTP_IF_MODIFIED_SINCE="Fri, 02 Jan 2026 00:00:00 GMT"
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "80.75")
+
+    def test_empty_page(self):
+        """An empty page does not replace the cached first page."""
+        self.assertContains(self.client.get(self.resource_url), "100.5")
+
+        cursor = encode_cursor((self.record.timestamp, self.record.pk))
+        response = self.client.get(self.resource_url, {"after": cursor})
+        self.assertNotContains(response, "100.5")
+
+        self.assertContains(self.client.get(self.resource_url), "100.5")
+
+    @override_settings(
+        CACHES={"default": {"BACKEND": "django.core.cache.backends.dummy.DummyCache"}}
+    )
+    def test_etag_without_cache(self):
+        """The ``ETag`` reflects modifications, even without a (shared) cache."""
+        resource_etag = self.client.get(self.resource_url)["ETag"]
+        subject_etag = self.client.get(self.subject_url)["ETag"]
+        self.assertEqual(self.client.get(self.resource_url)["ETag"], resource_etag)
+
+        # an older reading is edited, the summary of records does not change
+        with self.captureOnCommitCallbacks(execute=True):
+            write_records(
+                [
+                    Record(
+                        resource=self.resource,
+                        timestamp=datetime(2026, 1, 1, 12),
+                        reading=99.5,
+                    )
+                ],
+                on_conflict=ON_CONFLICT_UPDATE,
+            )
+
+        response = self.client.get(self.resource_url, HTTP_IF_NONE_MATCH=resource_etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "99.5")
+        response = self.client.get(self.subject_url, HTTP_IF_NONE_MATCH=subject_etag)
+        self.assertEqual(response.status_code, 200)
@@ -0,0 +1,162 @@
+# SPDX-License-Identifier: MIT
+
+"""Verify the app's forms."""
+
+# Django imports
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+
+# app imports
+from consumption.cache import get_cache
+from consumption.models import Record, Resource, Subject
+from consumption.models.record import RecordForm
+from consumption.models.resource import ResourceForm
+
+
+class ResourceChoiceFieldTest(TestCase):
+    """The resource choices of ``RecordForm`` require (at most) one query."""
+
+    @classmethod
+    def setUpTestData(cls):
+        for subject_index in range(5):
+            subject = Subject.objects.create(name="Subject {}".format(subject_index))
+            Resource.objects.bulk_create(
+                [
+                    Resource(name="Meter {}".format(index), subject=subject, unit="kWh")
+                    for index in range(6)
+                ]
+            )
+
+    def setUp(self):
+        get_cache().clear()
+
+    def test_rendering_queries(self):
+        """The choices are fetched with one query and then cached."""
+        with self.assertNumQueries(1):
+            html = str(RecordForm())
+        self.assertEqual(html.count("<optgroup"), 5)
+        self.assertEqual(html.count("Meter 0 (kWh)"), 5)
+
+        with self.assertNumQueries(0):
+            self.assertHTMLEqual(str(RecordForm()), html)
+
+    def test_queries_independent_of_resources(self):
+        """The number of queries does not grow with the number of resources."""
+        subject = Subject.objects.create(name="Another Subject")
+        Resource.objects.bulk_create(
+            [Resource(name="Extra", subject=subject, unit="m3") for _ in range(20)]
+        )
+
+        with self.assertNumQueries(1):
+            str(RecordForm())
+
+    def test_narrowed_queryset(self):
+        """A form with a narrowed queryset only provides its own choices."""
+        str(RecordForm())
+
+        subject = Subject.objects.get(name="Subject 1")
+        form = RecordForm()
+        form.fields["resource"].queryset = Resource.objects.filter(subject=subject)
+        with self.assertNumQueries(1):
+            html = str(form)
+        self.assertEqual(html.count("<optgroup"), 1)
+        self.assertIn("Subject 1", html)
+        self.assertNotIn("Subject 2", html)
+
+        # the cached choices of all resources are not affected
+        with self.assertNumQueries(0):
+            self.assertEqual(str(RecordForm()).count("<optgroup"), 5)
+
+
+class ResourceFormTest(TestCase):
+    """``ResourceForm`` does not provide the retention policy."""
+
+    def test_retention_fields_excluded(self):
+        """The policy is not editable and not changed by the form."""
+        subject = Subject.objects.create(name="Household")
+        resource = Resource.objects.create(
+            name="Electricity", subject=subject, unit="kWh", retention_raw_days=90
+        )
+        form = ResourceForm(
+            {
+                "name": "Power",
+                "subject": subject.pk,
+                "unit": "kWh",
+                "retention_raw_days": "1",
+            },
+            instance=resource,
+        )
+
+        self.assertNotIn("retention_raw_days", form.fields)
+        self.assertNotIn("retention_hourly_days", form.fields)
+        self.assertTrue(form.is_valid(), form.errors)
+        form.save()
+        resource.refresh_from_db()
+        self.assertEqual(resource.retention_raw_days, 90)
+
+
+class RecordBulkEntryTest(TestCase):
+    """Readings of a bulk entry are assigned to their resources by ``id``."""
+
+    def setUp(self):
+        self.client.force_login(get_user_model().objects.create_user("user"))
+        self.subject = Subject.objects.create(name="Household")
+        self.electricity, self.gas, self.water = (
+            Resource.objects.create(name=name, subject=self.subject, unit="unit")
+            for name in ("Electricity", "Gas", "Water")
+        )
+        self.url = reverse("consumption:record-bulk-create", args=[self.subject.pk])
+
+    def post(self, readings):
+        """Submit the rendered formset, with ``readings`` by resource."""
+        formset = self.client.get(self.url).context["formset"]
+        data = {
+            "timestamp": "2026-01-01 12:00:00",
+            "form-TOTAL_FORMS": len(formset.forms),
+            "form-INITIAL_FORMS": 0,
+        }
+        for form in formset.forms:
+            data[form["resource"].html_name] = form.resource.pk
+            data[form["reading"].html_name] = readings.get(form.resource, "")
+        return data
+
+    def readings(self):
+        """Return the stored readings by the name of their resource."""
+        return dict(Record.objects.values_list("resource__name", "reading"))
+
+    def test_resources_modified(self):
+        """Resources renamed or added after rendering keep their readings."""
+        data = self.post({self.electricity: 1.5, self.water: 3.5})
+        Resource.objects.filter(pk=self.water.pk).update(name="A Water")
+        Resource.objects.create(name="Oil", subject=self.subject, unit="l")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(self.url, data)
+
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(self.readings(), {"Electricity": 1.5, "A Water": 3.5})
+
+    def test_resource_deleted(self):
+        """A reading of a deleted resource is rejected."""
+        data = self.post({self.electricity: 1.5, self.gas: 2.5})
+        self.gas.delete()
+
+        response = self.client.post(self.url, data)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "The resource is not available anymore")
+        self.assertEqual(self.readings(), {})
+
+    def test_unknown_resource(self):
+        """Resources of other subjects can not be submitted."""
+        other = Resource.objects.create(
+            name="Other", subject=Subject.objects.create(name="Other"), unit="unit"
+        )
+        data = self.post({self.electricity: 1.5})
+        data["form-0-resource"] = other.pk
+
+        response = self.client.post(self.url, data)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.readings(), {})
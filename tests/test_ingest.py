@@ -0,0 +1,105 @@
+# SPDX-License-Identifier: MIT
+
+"""Verify the ``consumption_ingest`` management command."""
+
+# Python imports
+import json
+import tempfile
+from io import StringIO
+
+# Django imports
+from django.core.management import call_command
+from django.test import TestCase
+
+# app imports
+from consumption.bulk import ResourceResolver, RowError, row_to_record
+from consumption.models import Record, Resource, Subject
+
+
+class IngestTest(TestCase):
+    """Ingest JSON lines from a file."""
+
+    def setUp(self):
+        self.subject = Subject.objects.create(name="Household")
+        self.resource = Resource.objects.create(
+            name="Electricity", subject=self.subject, unit="kWh"
+        )
+
+    def ingest(self, rows, **options):
+        """Ingest ``rows`` and return the output to stderr."""
+        with tempfile.NamedTemporaryFile("w", suffix=".jsonl") as source:
+            source.writelines(json.dumps(row) + "\n" for row in rows)
+            source.flush()
+            stderr = StringIO()
+            call_command(
+                "consumption_ingest",
+                source.name,
+                report_interval=0,
+                stdout=StringIO(),
+                stderr=stderr,
+                **options,
+            )
+        return stderr.getvalue()
+
+    def test_rejected_batch(self):
+        """A duplicate with ``--on-duplicate=error`` does not stall the worker."""
+        Record.objects.create(
+            resource=self.resource, timestamp="2026-01-01T00:00:00", reading=1
+        )
+        rows = [
+            {"resource": "Electricity", "timestamp": timestamp, "reading": 2}
+            for timestamp in ("2026-01-01T00:00:00", "2026-01-02T00:00:00")
+        ]
+        rows.append(
+            {
+                "resource": "Electricity",
+                "timestamp": "2026-01-03T00:00:00",
+                "reading": 3,
+            }
+        )
+
+        stderr = self.ingest(rows, batch_size=2, on_duplicate="error")
+
+        self.assertIn("Rejected 2 readings", stderr)
+        self.assertIn('"timestamp": "2026-01-02T00:00:00"', stderr)
+        self.assertEqual(
+            list(
+                Record.objects.order_by("timestamp").values_list("reading", flat=True)
+            ),
+            [1, 3],
+        )
+
+
+class ResourceResolverTest(TestCase):
+    """Resolve the resource of a row."""
+
+    def test_unknown_resource_expires(self):
+        """A resource created after an unknown lookup is resolved eventually."""
+        subject = Subject.objects.create(name="Household")
+        resolve = ResourceResolver("auto", miss_ttl=0)
+        with self.assertRaises(RowError):
+            resolve("Water")
+
+        resource = Resource.objects.create(name="Water", subject=subject, unit="m³")
+
+        self.assertEqual(resolve("Water"), resource.pk)
+        with self.assertNumQueries(0):
+            self.assertEqual(resolve("Water"), resource.pk)
+
+
+class RowToRecordTest(TestCase):
+    """Convert rows of the input into records."""
+
+    def test_non_finite_reading(self):
+        """Readings, that are not finite numbers, are rejected."""
+        for reading in ("nan", "inf", "-Infinity", float("nan"), float("inf")):
+            with self.subTest(reading=reading):
+                with self.assertRaises(RowError):
+                    row_to_record(
+                        {
+                            "resource": 1,
+                            "timestamp": "2026-01-01T00:00:00",
+                            "reading": reading,
+                        },
+                        lambda resource: resource,
+                    )
@@ -0,0 +1,88 @@
+# SPDX-License-Identifier: MIT
+
+"""Verify the metrics reported by the instrumentation middleware."""
+
+# Python imports
+from datetime import datetime
+
+# Django imports
+from django.conf import settings
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+# external imports
+from asgiref.sync import async_to_sync
+
+# app imports
+from consumption.middleware import instrumented
+from consumption.models import Record, Resource, Subject
+
+
+@override_settings(
+    MIDDLEWARE=["consumption.middleware.InstrumentationMiddleware"]
+    + settings.MIDDLEWARE,
+    CONSUMPTION_INSTRUMENTATION_SERVER_TIMING=True,
+)
+class InstrumentationMiddlewareTest(TestCase):
+    """The reported metrics match the queries of the request."""
+
+    def setUp(self):
+        self.subject = Subject.objects.create(name="Household")
+        for name in ("Electricity", "Gas"):
+            resource = Resource.objects.create(
+                name=name, subject=self.subject, unit="unit"
+            )
+            Record.objects.create(
+                resource=resource, timestamp=datetime(2026, 1, 1), reading=1.5
+            )
+        self.url = reverse("consumption:subject-detail", args=[self.subject.pk])
+
+    def assertMetrics(self, response, captured):
+        """Compare the reported metrics to the ``captured`` queries."""
+        statements = [query["sql"] for query in captured.captured_queries]
+        self.assertGreater(len(statements), 0)
+        self.assertIn(
+            '"{} queries, {} duplicates"'.format(
+                len(statements), len(statements) - len(set(statements))
+            ),
+            response["Server-Timing"],
+        )
+
+    def test_sync(self):
+        """The queries of a synchronous request are reported."""
+        with CaptureQueriesContext(connection) as captured:
+            response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertMetrics(response, captured)
+
+    async def async_get(self, path):
+        """Request ``path`` with the asynchronous test client."""
+        return await self.async_client.get(path)
+
+    def test_async(self):
+        """The queries of an asynchronous request are reported.
+
+        The middleware runs in the event loop, while the view is run in this
+        thread by ``sync_to_async()``.
+        """
+        with CaptureQueriesContext(connection) as captured:
+            response = async_to_sync(self.async_get)(self.url)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertMetrics(response, captured)
+
+    def test_duplicates(self):
+        """Queries with the same SQL are counted as duplicates."""
+        Resource.objects.create(
+            name="Water", subject=Subject.objects.create(name="Garden"), unit="unit"
+        )
+
+        with instrumented() as queries:
+            for resource in Resource.objects.order_by("name"):
+                resource.subject.name
+
+        self.assertEqual(queries.count, 4)
+        self.assertEqual(queries.duplicates, 2)
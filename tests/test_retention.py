@@ -0,0 +1,96 @@
+# SPDX-License-Identifier: MIT
+
+"""Verify the compaction of records by :mod:`consumption.retention`."""
+
+# Python imports
+from datetime import datetime, timedelta
+from io import StringIO
+
+# Django imports
+from django.core.management import call_command
+from django.test import TestCase
+
+# app imports
+from consumption.bulk import write_records
+from consumption.models import Record, Resource, Subject
+from consumption.retention import compact
+
+START = datetime(2026, 1, 1)
+"""The timestamp of the first reading."""
+
+DAYS = 10
+"""The number of days with readings."""
+
+
+class CompactTest(TestCase):
+    """Compacting reduces the records, keeping the consumption."""
+
+    def setUp(self):
+        subject = Subject.objects.create(name="Household")
+        self.resource = Resource.objects.create(
+            name="Electricity",
+            subject=subject,
+            unit="kWh",
+            retention_raw_days=2,
+            retention_hourly_days=6,
+        )
+        # a cumulative meter, read every 15 minutes
+        with self.captureOnCommitCallbacks(execute=True):
+            write_records(
+                [
+                    Record(
+                        resource=self.resource,
+                        timestamp=START + index * timedelta(minutes=15),
+                        reading=index * 0.25 + (index % 3) * 0.01,
+                    )
+                    for index in range(DAYS * 96)
+                ]
+            )
+
+    def consumption_per_day(self):
+        """Return the consumption per day of the resource."""
+        return [
+            (row["period"], row["consumption"])
+            for row in Record.objects.consumption_by("day")
+        ]
+
+    def test_compact(self):
+        """Hourly records keep one reading per hour, daily ones one per day."""
+        expected = self.consumption_per_day()
+        now = START + timedelta(days=DAYS)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            removed = compact(self.resource, now=now)
+
+        records = Record.objects.filter(resource=self.resource)
+        daily = records.filter(timestamp__lt=now - timedelta(days=6))
+        hourly = records.filter(
+            timestamp__gte=now - timedelta(days=6),
+            timestamp__lt=now - timedelta(days=2),
+        )
+        self.assertEqual(daily.count(), 4)
+        self.assertEqual(hourly.count(), 4 * 24)
+        self.assertEqual(records.count(), DAYS * 96 - removed)
+        self.assertEqual(self.consumption_per_day(), expected)
+
+        # idempotent
+        self.assertEqual(compact(self.resource, now=now), 0)
+
+    def test_command(self):
+        """``consumption_compact`` reports the removed and the kept records."""
+        other = Resource.objects.create(
+            name="Gas", subject=self.resource.subject, unit="m3"
+        )
+        Record.objects.create(resource=other, timestamp=START, reading=1.5)
+        stdout = StringIO()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command("consumption_compact", stdout=stdout)
+
+        kept = Record.objects.filter(resource=self.resource).count()
+        self.assertIn(
+            "Removed {} records of 1 resources ({} kept)".format(
+                DAYS * 96 - kept, kept
+            ),
+            stdout.getvalue(),
+        )
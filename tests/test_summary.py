@@ -0,0 +1,71 @@
+# SPDX-License-Identifier: MIT
+
+"""Verify the summary of records of :class:`~consumption.models.resource.Resource`."""
+
+# Python imports
+import tempfile
+from datetime import datetime, timedelta
+from io import StringIO
+
+# Django imports
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+# app imports
+from consumption import archive
+from consumption.bulk import write_records
+from consumption.models import Record, Resource, Subject
+from consumption.signals import records_changed
+
+
+class RecordCountTest(TestCase):
+    """The maintained ``record_count`` matches the exact count of records."""
+
+    def setUp(self):
+        subject = Subject.objects.create(name="Household")
+        self.resource = Resource.objects.create(
+            name="Electricity", subject=subject, unit="kWh"
+        )
+        with self.captureOnCommitCallbacks(execute=True):
+            write_records(
+                [
+                    Record(
+                        resource=self.resource,
+                        timestamp=datetime(2026, 1, 1) + index * timedelta(hours=8),
+                        reading=index * 2.5,
+                    )
+                    for index in range(30)
+                ]
+            )
+
+    def record_count(self):
+        """Return the current ``record_count`` of the resource."""
+        self.resource.refresh_from_db()
+        return self.resource.record_count
+
+    def test_maintained(self):
+        """Creating and deleting records updates the count."""
+        self.assertEqual(self.record_count(), 30)
+
+        records = Record.objects.filter(timestamp__lt=datetime(2026, 1, 3))
+        changes = set(records.values_list("resource_id", "timestamp"))
+        with self.captureOnCommitCallbacks(execute=True):
+            records.delete()
+            records_changed.send(sender=Record, changes=changes)
+
+        self.assertEqual(self.record_count(), 24)
+        call_command("consumption_refresh_summary", stdout=StringIO())
+        self.assertEqual(self.record_count(), 24)
+
+    def test_archived_records(self):
+        """The rollup and the exact count agree after archiving."""
+        with tempfile.TemporaryDirectory() as archive_dir:
+            with override_settings(CONSUMPTION_ARCHIVE_DIR=archive_dir):
+                with self.captureOnCommitCallbacks(execute=True):
+                    archive.archive(self.resource, datetime(2026, 1, 5))
+                # the first and the last record of the four archived days
+                self.assertEqual(Record.objects.count(), 4 * 2 + 18)
+                self.assertEqual(self.record_count(), 26)
+
+                call_command("consumption_refresh_summary", stdout=StringIO())
+                self.assertEqual(self.record_count(), 26)
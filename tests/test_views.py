@@ -0,0 +1,62 @@
+# SPDX-License-Identifier: MIT
+
+"""Verify the series views of :mod:`consumption.views.resource`."""
+
+# Python imports
+import struct
+from datetime import datetime, timedelta
+from unittest import mock
+
+# Django imports
+from django.test import TestCase
+from django.urls import reverse
+
+# app imports
+from consumption.models import Record, Resource, Subject
+from consumption.views.resource import (
+    SERIES_HEADER_FORMAT,
+    SERIES_HEADER_SIZE,
+    ResourceSeriesView,
+)
+
+
+class ResourceSeriesViewTest(TestCase):
+    """The binary series is always limited to ``max_points``."""
+
+    @classmethod
+    def setUpTestData(cls):
+        subject = Subject.objects.create(name="Household")
+        cls.resource = Resource.objects.create(
+            name="Electricity", subject=subject, unit="kWh"
+        )
+        Record.objects.bulk_create(
+            [
+                Record(
+                    resource=cls.resource,
+                    timestamp=datetime(2026, 1, 1) + index * timedelta(minutes=15),
+                    reading=index * 0.25,
+                )
+                for index in range(1000)
+            ]
+        )
+        cls.url = reverse("consumption:resource-series", args=[cls.resource.pk])
+
+    def points(self, response):
+        """Return the number of points of a binary payload."""
+        self.assertEqual(response.status_code, 200)
+        return struct.unpack(
+            SERIES_HEADER_FORMAT, response.content[:SERIES_HEADER_SIZE]
+        )[3]
+
+    def test_default_points(self):
+        """Without ``points``, the series is downsampled to ``default_points``."""
+        self.assertEqual(self.points(self.client.get(self.url)), 1000)
+
+        with mock.patch.object(ResourceSeriesView, "default_points", 100):
+            self.assertEqual(self.points(self.client.get(self.url)), 100)
+
+    def test_max_points(self):
+        """More than ``max_points`` can not be requested."""
+        response = self.client.get(self.url, {"points": 100001})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(self.points(self.client.get(self.url, {"points": 50})), 50)
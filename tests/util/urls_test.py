@@ -24,5 +24,6 @@ from django.urls import include, path
 
 urlpatterns = [
     path("admin/", admin.site.urls),
+    path("consumption/api/", include("consumption.api.urls")),
     path("consumption/", include("consumption.urls")),
 ]